@@ -0,0 +1,105 @@
+# File: callback_plugins/lab_events.py
+# ============================
+# CALLBACK: SATU BARIS JSON PER HASIL HOST x TASK
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: lab_events
+    type: stdout
+    short_description: Compact JSON-lines events for the Telegram bot
+    description:
+      - Emits one JSON object per line for every play, task and host result.
+      - Only status, changed flag, item label, rc and a truncated msg are kept,
+        so the bot can ingest results while the run is still going.
+      - Structured per-package results of lab_choco (C(packages)) and the
+        lab_fingerprint result (C(fingerprint)) are passed through as C(report),
+        so the bot does not have to parse module output.
+      - Enable with ANSIBLE_STDOUT_CALLBACK=lab_events (and
+        ANSIBLE_LOAD_CALLBACK_PLUGINS=1 for ad-hoc commands).
+'''
+
+import json
+import sys
+
+from ansible.plugins.callback import CallbackBase
+
+MAX_MSG = 300
+# Hasil terstruktur module lab_* yang diteruskan apa adanya ke bot
+REPORT_KEYS = ('packages', 'fingerprint')
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'stdout'
+    CALLBACK_NAME = 'lab_events'
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._task = None
+
+    def _emit(self, event, **data):
+        data['event'] = event
+        sys.stdout.write(json.dumps(data, separators=(',', ':'), default=str) + '\n')
+        sys.stdout.flush()
+
+    def _result(self, event, result, item=False):
+        res = result._result
+        data = {
+            'host': result._host.get_name(),
+            'task': result._task.get_name() or self._task,
+            'changed': bool(res.get('changed', False)),
+        }
+        if item:
+            data['item'] = str(res.get('_ansible_item_label', res.get('item', '')))
+        if 'rc' in res:
+            data['rc'] = res['rc']
+        for key in REPORT_KEYS:
+            if isinstance(res.get(key), dict):
+                data['report'] = res[key]
+        msg = res.get('msg') or res.get('stderr') or ''
+        if msg and event in ('failed', 'unreachable', 'item_failed'):
+            data['msg'] = str(msg)[:MAX_MSG]
+        self._emit(event, **data)
+
+    def v2_playbook_on_start(self, playbook):
+        self._emit('playbook_start', playbook=playbook._file_name)
+
+    def v2_playbook_on_play_start(self, play):
+        self._emit('play_start', play=play.get_name())
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task = task.get_name()
+        self._emit('task_start', task=self._task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._task = task.get_name()
+        self._emit('task_start', task=self._task, handler=True)
+
+    def v2_runner_on_ok(self, result):
+        self._result('ok', result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._result('ignored' if ignore_errors else 'failed', result)
+
+    def v2_runner_on_unreachable(self, result):
+        self._result('unreachable', result)
+
+    def v2_runner_on_skipped(self, result):
+        self._result('skipped', result)
+
+    def v2_runner_item_on_ok(self, result):
+        self._result('item_ok', result, item=True)
+
+    def v2_runner_item_on_failed(self, result):
+        self._result('item_failed', result, item=True)
+
+    def v2_runner_item_on_skipped(self, result):
+        self._result('item_skipped', result, item=True)
+
+    def v2_playbook_on_stats(self, stats):
+        summary = {}
+        for host in sorted(stats.processed.keys()):
+            summary[host] = stats.summarize(host)
+        self._emit('stats', hosts=summary)
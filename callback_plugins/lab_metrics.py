@@ -0,0 +1,72 @@
+# File: callback_plugins/lab_metrics.py
+# ============================
+# CALLBACK: SIMPAN METRIC PER HOST KE METRICS STORE
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: lab_metrics
+    type: notification
+    short_description: Store per-host metrics from playbook runs for /trend
+    description:
+      - A task can publish numbers with C(set_fact) of C(lab_metrics), a dict of
+        metric name to value (e.g. disk_percent, cpu_percent).
+      - Samples are buffered during the run and written in one transaction to
+        the SQLite metrics store (scripts/metrics_store.py) at the end.
+    options:
+      db:
+        description: Path of the metrics database (default data/metrics.db in the project root).
+        env:
+          - name: LAB_METRICS_DB
+        ini:
+          - section: callback_lab_metrics
+            key: db
+'''
+
+import os
+import sys
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+from metrics_store import MetricsStore  # noqa: E402
+
+METRICS_FACT = 'lab_metrics'
+DEFAULT_DB = os.path.join(PROJECT_ROOT, 'data', 'metrics.db')  # Sama dengan METRICS_DB_PATH di config.py
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'notification'
+    CALLBACK_NAME = 'lab_metrics'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self.samples = []
+
+    def v2_runner_on_ok(self, result):
+        metrics = result._result.get('ansible_facts', {}).get(METRICS_FACT)
+        if not isinstance(metrics, dict):
+            return
+        host = result._host.get_name()
+        now = int(time.time())
+        for name, value in metrics.items():
+            self.samples.append((host, name, value, now))
+
+    def v2_playbook_on_stats(self, stats):
+        if not self.samples:
+            return
+        path = self.get_option('db') or DEFAULT_DB
+        try:
+            store = MetricsStore(os.path.expanduser(path))
+            try:
+                store.record_many(self.samples)
+            finally:
+                store.close()
+        except Exception as e:
+            self._display.warning(f'lab_metrics: gagal menyimpan metric: {e}')
+        self.samples = []
@@ -0,0 +1,147 @@
+# File: callback_plugins/lab_profile.py
+# ============================
+# CALLBACK: PROFIL WAKTU PER TASK x HOST UNTUK /profile
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: lab_profile
+    type: notification
+    short_description: Per-task, per-host timing profile of every playbook run
+    description:
+      - Records for every task on every host the queueing delay (task start until
+        a fork slot is free, see C(forks)), the wall time of the worker and the
+        module runtime when the module reports it (C(delta)/C(elapsed)), so
+        connection/transport overhead can be separated from module runtime.
+      - At the end of the run the slowest tasks, slowest hosts and the
+        critical-path host are computed and the run is written as one JSON file
+        (scripts/run_profiles.py); the bot shows it with /profile.
+      - Only a timestamp and a dict insert per result during the run; the time
+        spent in the plugin itself is stored as C(profiler_seconds).
+    options:
+      dir:
+        description: Directory for the run profiles (default data/profiles in the project root).
+        env:
+          - name: LAB_PROFILE_DIR
+        ini:
+          - section: callback_lab_profile
+            key: dir
+'''
+
+import os
+import resource
+import sys
+import time
+
+from ansible import context
+from ansible.plugins.callback import CallbackBase
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+from run_profiles import module_runtime, save_profile, summarize  # noqa: E402
+
+DEFAULT_DIR = os.path.join(PROJECT_ROOT, 'data', 'profiles')  # Sama dengan PROFILE_DIR di config.py
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'notification'
+    CALLBACK_NAME = 'lab_profile'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self.playbook = None
+        self.started = time.time()
+        self.t0 = time.monotonic()
+        self.tasks = {}     # task uuid -> {name, action, start, hosts: {host: [antri, wall, runtime, status]}}
+        self.order = []
+        self.running = {}   # (task uuid, host) -> waktu worker mulai
+        self.self_time = 0.0
+
+    def _now(self):
+        return time.monotonic() - self.t0
+
+    def _task(self, task):
+        uuid = task._uuid
+        entry = self.tasks.get(uuid)
+        if entry is None:
+            entry = {'name': task.get_name(), 'action': task.action, 'start': self._now(), 'hosts': {}}
+            self.tasks[uuid] = entry
+            self.order.append(uuid)
+        return entry
+
+    # ---------- Event ----------
+    def v2_playbook_on_start(self, playbook):
+        self.playbook = os.path.basename(playbook._file_name)
+        self.started = time.time()
+        self.t0 = time.monotonic()
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._task(task)
+
+    def v2_runner_on_start(self, host, task):
+        # Dipanggil saat worker dapat slot fork: selisih dengan task start = antri
+        start = time.perf_counter()
+        self._task(task)
+        self.running[(task._uuid, host.get_name())] = self._now()
+        self.self_time += time.perf_counter() - start
+
+    def _finish(self, result, status):
+        start = time.perf_counter()
+        now = self._now()
+        task = self._task(result._task)
+        host = result._host.get_name()
+        began = self.running.pop((result._task._uuid, host), task['start'])
+        task['hosts'][host] = [round(began - task['start'], 4), round(now - began, 4),
+                               module_runtime(result._result), status]
+        self.self_time += time.perf_counter() - start
+
+    def v2_runner_on_ok(self, result):
+        self._finish(result, 'changed' if result._result.get('changed') else 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._finish(result, 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._finish(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self._finish(result, 'unreachable')
+
+    def v2_playbook_on_stats(self, stats):
+        start = time.perf_counter()
+        usage_self = resource.getrusage(resource.RUSAGE_SELF)
+        usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        stem = os.path.splitext(self.playbook or 'adhoc')[0]
+        # ID unik untuk run paralel: milidetik (tetap urut leksikal, lihat list_runs) + pid
+        millis = int(self.started * 1000) % 1000
+        run_id = f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(self.started))}{millis:03d}_{stem}_{os.getpid()}"
+        profile = {
+            'run': run_id,
+            'playbook': self.playbook or 'adhoc',
+            'started': int(self.started),
+            'duration': round(self._now(), 3),
+            'forks': context.CLIARGS.get('forks'),
+            'tasks': [self.tasks[uuid] for uuid in self.order],
+            # Control node: CPU proses ansible + semua worker fork, RSS maksimum (KB di Linux)
+            'controller': {
+                'cpu_user': round(usage_self.ru_utime + usage_children.ru_utime, 2),
+                'cpu_system': round(usage_self.ru_stime + usage_children.ru_stime, 2),
+                'max_rss_mb': round(max(usage_self.ru_maxrss, usage_children.ru_maxrss) / 1024, 1),
+            },
+        }
+        for task in profile['tasks']:
+            task['start'] = round(task['start'], 4)
+        try:
+            profile['summary'] = summarize(profile)
+            self.self_time += time.perf_counter() - start
+            profile['profiler_seconds'] = round(self.self_time, 4)
+            path = save_profile(os.path.expanduser(self.get_option('dir') or DEFAULT_DIR), profile)
+            self._display.vv(f'lab_profile: {path}')
+        except Exception as e:
+            self._display.warning(f'lab_profile: gagal menyimpan profil: {e}')
@@ -0,0 +1,212 @@
+# File: callback_plugins/telegram_digest.py
+# ============================
+# CALLBACK: DIGEST NOTIFIKASI TELEGRAM PER RUN
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: telegram_digest
+    type: notification
+    short_description: One Telegram digest per run instead of one message per host
+    description:
+      - Collects per-host results during the run and sends a start message plus
+        digest messages (max 4096 characters each) at the end of the playbook.
+      - A task can add a line for its host with C(set_fact) of C(telegram_note).
+      - Messages go through one keep-alive HTTP connection with a token-bucket
+        limiter and retry on HTTP 429 (scripts/telegram_gateway.py).
+      - Token and chat ID come from the environment or ansible.cfg (the bot exports
+        them from scripts/config.py). If neither is set, the legacy play vars
+        C(telegram_token)/C(chat_id) are used (extra vars, play vars or the vault
+        file in I(vars_file)). Disabled when no token or chat ID is found.
+      - The start message is sent on the playbook thread, so requests use a short
+        timeout and few retries; an unreachable Telegram delays a run by seconds, not minutes.
+    options:
+      token:
+        description: Bot API token.
+        env:
+          - name: TELEGRAM_TOKEN
+        ini:
+          - section: callback_telegram_digest
+            key: token
+      chat_id:
+        description: Chat ID that receives the digest.
+        env:
+          - name: TELEGRAM_CHAT_ID
+        ini:
+          - section: callback_telegram_digest
+            key: chat_id
+      api_url:
+        description: Bot API base URL (override for a local fake server).
+        default: https://api.telegram.org
+        env:
+          - name: TELEGRAM_API_URL
+        ini:
+          - section: callback_telegram_digest
+            key: api_url
+      rate:
+        description: Messages per second allowed by the token bucket.
+        type: float
+        default: 1.0
+        env:
+          - name: TELEGRAM_RATE
+        ini:
+          - section: callback_telegram_digest
+            key: rate
+      timeout:
+        description: Timeout per Bot API request (seconds).
+        type: float
+        default: 5
+        env:
+          - name: TELEGRAM_TIMEOUT
+        ini:
+          - section: callback_telegram_digest
+            key: timeout
+      max_retries:
+        description: Retries per message (429, 5xx, connection errors).
+        type: int
+        default: 1
+        env:
+          - name: TELEGRAM_MAX_RETRIES
+        ini:
+          - section: callback_telegram_digest
+            key: max_retries
+      vars_file:
+        description: >-
+          Vault vars file with C(telegram_token)/C(chat_id), relative to the playbook
+          directory; only read when token/chat_id are not configured.
+        default: ../../vars/telegram_vars.yml
+        env:
+          - name: TELEGRAM_VARS_FILE
+        ini:
+          - section: callback_telegram_digest
+            key: vars_file
+'''
+
+import os
+import sys
+import time
+
+from ansible.plugins.callback import CallbackBase
+from ansible.template import Templar
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from telegram_gateway import TelegramGateway  # noqa: E402
+
+NOTE_FACT = 'telegram_note'
+LEGACY_VARS = ('telegram_token', 'chat_id')  # Vars notifikasi playbook sebelum callback ini
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'notification'
+    CALLBACK_NAME = 'telegram_digest'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self.gateway = None
+        self.title = None
+        self.started = None
+        self.notes = {}   # host -> [baris dari telegram_note]
+        self.errors = {}  # host -> (status, pesan pertama)
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        # Tanpa token/chat_id: dicari lagi di vars play saat play pertama dimulai
+        self._connect(self.get_option('token'), self.get_option('chat_id'))
+
+    def _connect(self, token, chat_id):
+        if not token or not chat_id:
+            return False
+        self.gateway = TelegramGateway(str(token), str(chat_id), api_url=self.get_option('api_url'),
+                                       rate=float(self.get_option('rate')),
+                                       max_retries=int(self.get_option('max_retries')),
+                                       timeout=float(self.get_option('timeout')))
+        return True
+
+    def _legacy_credentials(self, play):
+        """telegram_token/chat_id dari vars play (-e, vars, vars_files) atau file vault lama"""
+        loader, manager = play.get_loader(), play.get_variable_manager()
+        variables = manager.get_vars(play=play) if manager else {}
+        found = {name: variables.get(name) for name in LEGACY_VARS}
+        if not all(found.values()) and loader is not None:
+            path = os.path.join(loader.get_basedir(), self.get_option('vars_file'))
+            if os.path.exists(path):
+                data = loader.load_from_file(path) or {}
+                found = {name: found[name] or data.get(name) for name in LEGACY_VARS}
+                variables = dict(variables, **data)
+        templar = Templar(loader=loader, variables=variables)
+        return [templar.template(found[name]) if found[name] else None for name in LEGACY_VARS]
+
+    def _send(self, text):
+        try:
+            self.gateway.send(text)
+        except Exception as e:
+            self._display.warning(f'telegram_digest: gagal kirim: {e}')
+
+    def v2_playbook_on_play_start(self, play):
+        if self.title is not None:
+            return
+        self.title = play.get_name()
+        self.started = time.time()
+        if self.gateway is None:
+            try:
+                connected = self._connect(*self._legacy_credentials(play))
+            except Exception as e:
+                self._display.warning(f'telegram_digest: gagal membaca telegram_token/chat_id: {e}')
+                connected = False
+            if not connected:
+                self._display.warning('telegram_digest: token/chat_id belum diset, notifikasi dimatikan')
+                self.disabled = True
+                return
+        self._send(f"▶️ Memulai {self.title}...")
+
+    def v2_runner_on_ok(self, result):
+        note = result._result.get('ansible_facts', {}).get(NOTE_FACT)
+        if note:
+            self.notes.setdefault(result._host.get_name(), []).append(' '.join(str(note).split()))
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        if not ignore_errors:
+            self._error(result, 'failed')
+
+    def v2_runner_on_unreachable(self, result):
+        self._error(result, 'unreachable')
+
+    def _error(self, result, status):
+        host = result._host.get_name()
+        if host not in self.errors:
+            msg = result._result.get('msg') or result._result.get('stderr') or ''
+            self.errors[host] = (status, f"{result._task.get_name()}: {' '.join(str(msg).split())[:200]}")
+
+    def v2_playbook_on_stats(self, stats):
+        if self.gateway is None:
+            return
+        hosts = sorted(stats.processed.keys())
+        lines = []
+        counts = {'ok': 0, 'failed': 0, 'unreachable': 0}
+        for host in hosts:
+            summary = stats.summarize(host)
+            if summary['unreachable']:
+                status, icon = 'unreachable', '🔴'
+            elif summary['failures']:
+                status, icon = 'failed', '❌'
+            else:
+                status, icon = 'ok', '✅'
+            counts[status] += 1
+
+            detail = ' | '.join(self.notes.get(host, []))
+            if host in self.errors:
+                detail = f"{detail} | {self.errors[host][1]}" if detail else self.errors[host][1]
+            lines.append(f"{icon} {host}" + (f": {detail}" if detail else ''))
+
+        duration = time.time() - (self.started or time.time())
+        header = (f"📊 {self.title or 'Playbook'} selesai ({duration:.0f}s)\n"
+                  f"✅ {counts['ok']} | ❌ {counts['failed']} | 🔴 {counts['unreachable']} dari {len(hosts)} host")
+        try:
+            self.gateway.send_digest(lines, header=header)
+        except Exception as e:
+            self._display.warning(f'telegram_digest: gagal kirim digest: {e}')
+        finally:
+            self.gateway.close()
@@ -0,0 +1,86 @@
+# File: connection_plugins/lab_stub.py
+# ============================
+# CONNECTION: EKSEKUSI LOKAL DENGAN LATENCY + KEGAGALAN SIMULASI
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: lab_stub
+    short_description: Local execution with simulated network latency and failures
+    description:
+      - Runs everything on the control node like the local connection, but each
+        connect, command and file transfer waits one simulated round trip, and
+        connection attempts can fail, so a fleet of fake hosts behaves like PCs
+        on a slow network (scripts/fleet_benchmark.py).
+      - Unlike C(ansible_connection=local) the host is treated as remote
+        (remote tmp dir, module transfer), so per-task overhead is realistic.
+    extends_documentation_fragment:
+      - connection_pipelining
+    options:
+      latency:
+        description: Simulated round trip per command/file transfer in seconds (connect costs 3 round trips).
+        type: float
+        default: 0.05
+        vars:
+          - name: lab_stub_latency
+      jitter:
+        description: Random extra delay per round trip, as a fraction of latency.
+        type: float
+        default: 0.2
+        vars:
+          - name: lab_stub_jitter
+      failure_rate:
+        description: Probability that a connection attempt fails (host reported unreachable).
+        type: float
+        default: 0.0
+        vars:
+          - name: lab_stub_failure_rate
+      offline:
+        description: Host is always unreachable.
+        type: bool
+        default: false
+        vars:
+          - name: lab_stub_offline
+'''
+
+import random
+import time
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.plugins.connection.local import Connection as LocalConnection
+
+CONNECT_ROUND_TRIPS = 3  # TCP + handshake transport + auth
+
+
+class Connection(LocalConnection):
+    ''' Local execution with simulated latency/failures '''
+
+    transport = 'lab_stub'
+
+    def _round_trip(self, count=1):
+        latency = self.get_option('latency')
+        if latency > 0:
+            jitter = self.get_option('jitter')
+            time.sleep(sum(latency * (1 + random.uniform(0, jitter)) for _ in range(count)))
+
+    def _connect(self):
+        if not self._connected:
+            self._round_trip(CONNECT_ROUND_TRIPS)
+            if self.get_option('offline') or random.random() < self.get_option('failure_rate'):
+                raise AnsibleConnectionFailure(
+                    f'lab_stub: koneksi ke {self._play_context.remote_addr} gagal (simulasi)')
+        return super(Connection, self)._connect()
+
+    def exec_command(self, cmd, in_data=None, sudoable=True):
+        self._connect()
+        self._round_trip()
+        return super(Connection, self).exec_command(cmd, in_data=in_data, sudoable=sudoable)
+
+    def put_file(self, in_path, out_path):
+        self._round_trip()
+        return super(Connection, self).put_file(in_path, out_path)
+
+    def fetch_file(self, in_path, out_path):
+        self._round_trip()
+        return super(Connection, self).fetch_file(in_path, out_path)
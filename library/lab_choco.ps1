@@ -0,0 +1,210 @@
+#!powershell
+# File: library/lab_choco.ps1
+# ============================
+# MODULE: STATE + INSTALL PAKET CHOCOLATEY SECARA BATCH
+# ============================
+# Satu `choco list` untuk semua paket lokal, satu `choco install` (packages.config)
+# untuk semua paket yang belum ada / versinya salah, lalu satu `choco list` lagi
+# untuk versi akhir. Hasil per paket dikembalikan terstruktur (lihat lab_choco.py).
+
+#AnsibleRequires -CSharpUtil Ansible.Basic
+
+$spec = @{
+    options = @{
+        packages = @{
+            type = 'list'
+            elements = 'dict'
+            required = $true
+            options = @{
+                package = @{ type = 'str'; required = $true }
+                name = @{ type = 'str' }
+                version = @{ type = 'str' }
+            }
+        }
+        source = @{ type = 'str' }
+        execution_timeout = @{ type = 'int'; default = 3600 }
+        executable = @{ type = 'path' }
+    }
+    supports_check_mode = $true
+}
+
+$module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
+
+$choco = $module.Params.executable
+if (-not $choco) {
+    $command = Get-Command -Name choco -CommandType Application -ErrorAction SilentlyContinue | Select-Object -First 1
+    if ($command) {
+        $choco = $command.Source
+    }
+    else {
+        $choco = Join-Path $env:ProgramData 'chocolatey\bin\choco.exe'
+    }
+}
+if (-not (Test-Path -LiteralPath $choco)) {
+    $module.FailJson("choco tidak ditemukan: $choco")
+}
+
+Function Get-LocalPackage {
+    <#
+    .SYNOPSIS
+    Semua paket lokal dalam satu panggilan: @{ id = versi } (key case-insensitive)
+    #>
+    param([String]$Choco)
+
+    # choco v2: `list` selalu lokal; v1 butuh --local-only
+    $listArgs = @('list', '--limit-output')
+    $productVersion = (Get-Item -LiteralPath $Choco).VersionInfo.ProductVersion
+    if ($productVersion -match '^(\d+)\.' -and [int]$Matches[1] -lt 2) {
+        $listArgs += '--local-only'
+    }
+
+    $output = & $Choco @listArgs 2>&1
+    if ($LASTEXITCODE -ne 0) {
+        $module.FailJson("choco list gagal (rc $LASTEXITCODE): $($output -join "`n")")
+    }
+
+    $installed = @{}
+    foreach ($line in $output) {
+        $parts = "$line".Split('|')
+        if ($parts.Count -ge 2 -and $parts[0]) {
+            $installed[$parts[0].Trim()] = $parts[1].Trim()
+        }
+    }
+    $installed
+}
+
+Function Get-FailureMessage {
+    <#
+    .SYNOPSIS
+    Baris output choco terakhir yang menyebut paket (ringkasan "Failures" choco)
+    #>
+    param([String[]]$Lines, [String]$Package)
+
+    $pattern = '(^|[\s-])' + [Regex]::Escape($Package) + '(\s|$|\b)'
+    $match = $Lines | Where-Object { $_ -match $pattern -and $_ -match 'fail|error|not installed|exited' } |
+        Select-Object -Last 1
+    if ($match) {
+        return $match.Trim()
+    }
+    'Paket tidak terpasang setelah choco install'
+}
+
+$installed = Get-LocalPackage -Choco $choco
+
+# ---------- Rencana: paket yang belum ada / versinya salah ----------
+$results = [Ordered]@{}
+$pending = [System.Collections.Generic.List[Object]]@()
+foreach ($pkg in $module.Params.packages) {
+    $id = $pkg.package
+    $label = $pkg.name
+    if (-not $label) {
+        $label = $id
+    }
+    $before = $installed[$id]
+
+    $status = 'present'
+    if (-not $before) {
+        $status = 'missing'
+    }
+    elseif ($pkg.version -and $before -ne $pkg.version) {
+        $status = 'wrong_version'
+    }
+
+    $results[$id] = [Ordered]@{
+        name = $label
+        package = $id
+        desired = $pkg.version
+        version_before = $before
+        version = $before
+        status = $status
+        msg = $null
+    }
+    if ($status -ne 'present') {
+        $pending.Add($pkg)
+    }
+}
+
+$module.Result.packages = $results
+$module.Result.present = @($results.Values | Where-Object { $_.status -eq 'present' } | ForEach-Object { $_.package })
+$module.Result.installed = @()
+$module.Result.failed_packages = @()
+$module.Result.reboot_required = $false
+
+if ($pending.Count -eq 0) {
+    $module.ExitJson()
+}
+
+$module.Result.changed = $true
+if ($module.CheckMode) {
+    $module.ExitJson()
+}
+
+# ---------- Satu `choco install` untuk semua paket via packages.config ----------
+# packages.config memungkinkan versi berbeda per paket dalam satu invocation
+$config = [System.Text.StringBuilder]::new()
+[void]$config.AppendLine('<?xml version="1.0" encoding="utf-8"?>')
+[void]$config.AppendLine('<packages>')
+foreach ($pkg in $pending) {
+    $entry = '  <package id="{0}"' -f [System.Security.SecurityElement]::Escape($pkg.package)
+    if ($pkg.version) {
+        $entry += ' version="{0}"' -f [System.Security.SecurityElement]::Escape($pkg.version)
+    }
+    if ($results[$pkg.package].status -eq 'wrong_version') {
+        # Paket sudah terpasang dengan versi lain: paksa pasang versi yang diminta
+        $entry += ' force="true"'
+    }
+    [void]$config.AppendLine($entry + ' />')
+}
+[void]$config.AppendLine('</packages>')
+
+$configPath = Join-Path ([System.IO.Path]::GetTempPath()) "lab_choco_$PID.packages.config"
+[System.IO.File]::WriteAllText($configPath, $config.ToString())
+
+$installArgs = @(
+    'install', $configPath, '-y', '--no-progress', '--limit-output', '--allow-downgrade',
+    '--execution-timeout', $module.Params.execution_timeout
+)
+if ($module.Params.source) {
+    $installArgs += @('--source', $module.Params.source)
+}
+
+try {
+    $output = @(& $choco @installArgs 2>&1 | ForEach-Object { "$_" })
+    $rc = $LASTEXITCODE
+}
+finally {
+    Remove-Item -LiteralPath $configPath -Force -ErrorAction SilentlyContinue
+}
+$module.Result.rc = $rc
+# 1641/3010: sukses, tapi butuh restart
+$module.Result.reboot_required = $rc -in @(1641, 3010)
+
+# ---------- Versi akhir dari satu `choco list` lagi ----------
+$installed = Get-LocalPackage -Choco $choco
+foreach ($pkg in $pending) {
+    $entry = $results[$pkg.package]
+    $after = $installed[$pkg.package]
+    $entry.version = $after
+
+    if ($after -and (-not $pkg.version -or $after -eq $pkg.version)) {
+        if ($entry.status -eq 'missing') {
+            $entry.status = 'installed'
+        }
+        else {
+            $entry.status = 'updated'
+        }
+        $module.Result.installed += $pkg.package
+    }
+    else {
+        $entry.status = 'failed'
+        $entry.msg = Get-FailureMessage -Lines $output -Package $pkg.package
+        $module.Result.failed_packages += $pkg.package
+    }
+}
+
+if ($module.Result.failed_packages.Count -gt 0) {
+    $module.Result.stdout_lines = $output
+    $module.FailJson("Gagal install: $($module.Result.failed_packages -join ', ')")
+}
+
+$module.ExitJson()
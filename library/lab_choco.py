@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# File: library/lab_choco.py
+# ============================
+# DOKUMENTASI MODULE WINDOWS lab_choco (implementasi: lab_choco.ps1)
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: lab_choco
+short_description: Batched Chocolatey package state and install for Windows hosts
+description:
+  - Lists all local packages with one C(choco list) call and computes the set of
+    missing packages and packages with the wrong version.
+  - Installs that whole set with one C(choco install) invocation (a generated
+    packages.config, so every package can be pinned to its own version) and
+    reads the final versions back with one more C(choco list).
+  - Returns structured per-package results, so callers do not have to parse
+    choco output. Fails when at least one package is still missing afterwards.
+  - Test locally with C(python scripts/choco_harness.py) (fake choco, needs pwsh).
+options:
+  packages:
+    description: Packages to ensure.
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      package:
+        description: Chocolatey package id.
+        type: str
+        required: true
+      name:
+        description: Display name used in results and reports.
+        type: str
+      version:
+        description: Required version; the installed version must match exactly.
+        type: str
+  source:
+    description: Chocolatey source/feed for the install.
+    type: str
+  execution_timeout:
+    description: Passed to C(choco install --execution-timeout), in seconds.
+    type: int
+    default: 3600
+  executable:
+    description: Path to choco; defaults to choco on PATH or the standard install path.
+    type: path
+'''
+
+RETURN = '''
+packages:
+  description: >-
+    Per package id: name, package, desired, version_before, version, status
+    (present, installed, updated, failed; missing/wrong_version in check mode) and msg.
+  returned: always
+  type: dict
+present:
+  description: Package ids that already had the right version.
+  returned: always
+  type: list
+installed:
+  description: Package ids installed or changed to the right version by this run.
+  returned: always
+  type: list
+failed_packages:
+  description: Package ids still missing or at the wrong version after install.
+  returned: always
+  type: list
+rc:
+  description: Exit code of the single choco install.
+  returned: when install ran
+  type: int
+reboot_required:
+  description: choco install returned 1641 or 3010.
+  returned: always
+  type: bool
+'''
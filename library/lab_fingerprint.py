@@ -0,0 +1,278 @@
+#!/usr/bin/python
+# File: library/lab_fingerprint.py
+# ============================
+# MODULE: FINGERPRINT DESIRED STATE (INPUT + STATE HOST) UNTUK SKIP HOST YANG TIDAK BERUBAH
+# ============================
+# Implementasi POSIX; host Windows memakai lab_win_fingerprint (option dan hasil sama).
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: lab_fingerprint
+short_description: Desired-state fingerprint to skip hosts that did not change since the last apply
+description:
+  - Combines a digest of the rendered inputs (computed on the controller and passed
+    as I(inputs_digest)) with a cheap digest of the host state (selected files,
+    directories and read-only commands) into one fingerprint.
+  - C(state=check) compares it with the fingerprint recorded after the last
+    successful apply and returns C(matched). Nothing is written.
+  - C(state=record) recomputes the host digest (after the apply) and stores it,
+    together with the apply duration, under I(store)/I(name).json.
+  - Files up to I(hash_limit) bytes are hashed by content; bigger files use
+    size + mtime. Directories are listed one level deep.
+  - Windows hosts use M(lab_win_fingerprint) with the same options and result.
+options:
+  name:
+    description: Name of the fingerprint (usually the playbook or section).
+    type: str
+    required: true
+  state:
+    type: str
+    choices: [check, record]
+    default: check
+  inputs_digest:
+    description: Digest of the rendered inputs (vars, templates, package lists).
+    type: str
+    default: ''
+  paths:
+    description: Files or directories whose state is part of the host digest.
+    type: list
+    elements: str
+    default: []
+  commands:
+    description: Cheap read-only commands; rc and stdout are part of the host digest.
+    type: list
+    elements: str
+    default: []
+  force:
+    description: Never report a match (C(state=check)).
+    type: bool
+    default: false
+  max_age:
+    description: Seconds after which a recorded fingerprint no longer matches (0 = never expires).
+    type: int
+    default: 0
+  started:
+    description: Epoch when the apply started (C(checked_at) of the check), used for the recorded duration.
+    type: float
+    default: 0
+  store:
+    description: Directory with the recorded fingerprints.
+    type: path
+    default: /var/lib/lab_fingerprint
+  hash_limit:
+    description: Files bigger than this (bytes) are not hashed by content.
+    type: int
+    default: 1048576
+'''
+
+EXAMPLES = '''
+- name: Check desired-state fingerprint
+  lab_fingerprint:
+    name: basic_config
+    inputs_digest: "{{ {'timezone': 'Asia/Jakarta'} | to_json | hash('sha256') }}"
+    paths: [/etc/ssh/sshd_config, /etc/localtime]
+    commands: ['ip route show']
+  register: fingerprint_result
+
+- name: Skip host when nothing changed
+  ansible.builtin.meta: end_host
+  when: fingerprint_result.fingerprint.matched
+'''
+
+RETURN = '''
+fingerprint:
+  description: Compact fingerprint result.
+  returned: always
+  type: dict
+  sample:
+    name: basic_config
+    matched: true
+    reason: match
+    fingerprint: 5f1c...
+    previous: 5f1c...
+    inputs_digest: 9ab0...
+    drift: []
+    checked_at: 1760770000.12
+    recorded_at: 1760683600.53
+    age: 86399.6
+    saved_seconds: 48.2
+    recorded: false
+'''
+
+import hashlib
+import json
+import os
+import stat
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode('utf-8', 'surrogateescape')).hexdigest()
+
+
+def file_digest(path, st, hash_limit):
+    """Isi file (sha256) jika kecil, selain itu size + mtime"""
+    meta = f"{stat.S_IMODE(st.st_mode):o}:{st.st_uid}:{st.st_gid}"
+    if st.st_size > hash_limit:
+        return f"file:{meta}:{st.st_size}:{st.st_mtime_ns}"
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return f"file:{meta}:{digest.hexdigest()}"
+
+
+def entry_digest(path, hash_limit, depth=0):
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return 'absent'
+    except OSError as e:
+        return f"error:{e.errno}"
+
+    if stat.S_ISLNK(st.st_mode):
+        return f"link:{os.readlink(path)}"
+    if stat.S_ISREG(st.st_mode):
+        try:
+            return file_digest(path, st, hash_limit)
+        except OSError as e:
+            return f"error:{e.errno}"
+    if stat.S_ISDIR(st.st_mode):
+        if depth:
+            # Subdirektori tidak ditelusuri (murah): cukup mtime
+            return f"dir:{st.st_mtime_ns}"
+        try:
+            names = sorted(os.listdir(path))
+        except OSError as e:
+            return f"error:{e.errno}"
+        children = [f"{name}={entry_digest(os.path.join(path, name), hash_limit, depth + 1)}" for name in names]
+        return 'dir:' + sha256_text('\n'.join(children))
+    return f"other:{stat.S_IFMT(st.st_mode)}"
+
+
+def host_state(module, paths, commands, hash_limit):
+    """{key: digest} per path / command; key command diberi prefix 'cmd:'"""
+    items = {}
+    for path in paths:
+        items[path] = entry_digest(path, hash_limit)
+    for command in commands:
+        rc, out, err = module.run_command(command)
+        items['cmd:' + command] = f"rc{rc}:{sha256_text(out)}"
+    return items
+
+
+def digest_items(items):
+    return sha256_text('\n'.join(f"{key}\t{value}" for key, value in sorted(items.items())))
+
+
+def load_record(path):
+    try:
+        with open(path) as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def write_record(path, record):
+    """Tulis atomik supaya run yang terputus tidak meninggalkan JSON rusak"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(record, f, sort_keys=True, indent=1)
+    os.replace(tmp, path)
+
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=dict(
+            name=dict(type='str', required=True),
+            state=dict(type='str', choices=['check', 'record'], default='check'),
+            inputs_digest=dict(type='str', default=''),
+            paths=dict(type='list', elements='str', default=[]),
+            commands=dict(type='list', elements='str', default=[]),
+            force=dict(type='bool', default=False),
+            max_age=dict(type='int', default=0),
+            started=dict(type='float', default=0),
+            store=dict(type='path', default='/var/lib/lab_fingerprint'),
+            hash_limit=dict(type='int', default=1048576),
+        ),
+        supports_check_mode=True,
+    )
+    p = module.params
+    if '/' in p['name'] or p['name'] in ('', '.', '..'):
+        module.fail_json(msg=f"Nama fingerprint tidak valid: {p['name']}")
+
+    now = time.time()
+    record_path = os.path.join(p['store'], p['name'] + '.json')
+    previous = load_record(record_path) or {}
+    items = host_state(module, p['paths'], p['commands'], p['hash_limit'])
+    host_digest = digest_items(items)
+    fingerprint = sha256_text(f"{p['inputs_digest']}\n{host_digest}")
+
+    result = {
+        'name': p['name'],
+        'fingerprint': fingerprint,
+        'previous': previous.get('fingerprint'),
+        'inputs_digest': p['inputs_digest'],
+        'host_digest': host_digest,
+        'checked_at': round(now, 3),
+        'recorded_at': previous.get('recorded_at'),
+        'age': round(now - previous['recorded_at'], 1) if previous.get('recorded_at') else None,
+        'matched': False,
+        'drift': [],
+        'saved_seconds': 0,
+        'recorded': False,
+    }
+
+    if p['state'] == 'record':
+        duration = round(now - p['started'], 1) if p['started'] else previous.get('duration', 0)
+        changed = fingerprint != result['previous']
+        if not module.check_mode:
+            try:
+                os.makedirs(p['store'], mode=0o700, exist_ok=True)
+                write_record(record_path, {
+                    'fingerprint': fingerprint,
+                    'inputs': p['inputs_digest'],
+                    'host': host_digest,
+                    'items': items,
+                    'recorded_at': round(now, 3),
+                    'duration': duration,
+                })
+            except OSError as e:
+                module.fail_json(msg=f"Gagal menyimpan fingerprint {record_path}: {e}", fingerprint=result)
+            result['recorded'] = True
+        result.update(reason='recorded', duration=duration)
+        module.exit_json(changed=changed, fingerprint=result)
+
+    # state=check: alasan pertama yang membuat host harus di-apply
+    if p['force']:
+        reason = 'forced'
+    elif not previous.get('fingerprint'):
+        reason = 'new'
+    elif previous.get('inputs') != p['inputs_digest']:
+        reason = 'inputs'
+    elif previous.get('host') != host_digest:
+        reason = 'host_state'
+        old_items = previous.get('items') or {}
+        result['drift'] = sorted(key for key in set(items) | set(old_items) if items.get(key) != old_items.get(key))
+    elif p['max_age'] and result['age'] is not None and result['age'] > p['max_age']:
+        reason = 'expired'
+    else:
+        reason = 'match'
+
+    result['reason'] = reason
+    if reason == 'match':
+        result['matched'] = True
+        result['saved_seconds'] = previous.get('duration', 0)
+    module.exit_json(changed=False, fingerprint=result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
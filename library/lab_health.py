@@ -0,0 +1,245 @@
+#!/usr/bin/python
+# File: library/lab_health.py
+# ============================
+# MODULE: HEALTH CHECK SEKALI JALAN (DISK + CPU + MEM + SERVICE)
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: lab_health
+short_description: Single-pass health probe for Linux lab nodes
+description:
+  - Reads /proc/loadavg, /proc/meminfo, statvfs of the given mounts and the
+    state of the given systemd units in one module run.
+  - Thresholds are evaluated on the node; only a compact result is returned.
+  - A unit with ActiveState C(active) is C(running), including oneshot units
+    such as ufw (SubState C(exited)); the SubState is returned as C(sub_state).
+  - Replaces full gather_facts + setup (mounts) + setup (cpu/mem) + service_facts.
+options:
+  mounts:
+    description: Mount points to check with statvfs.
+    type: list
+    elements: str
+    default: ['/']
+  services:
+    description: systemd units to check (".service" is optional).
+    type: list
+    elements: str
+    default: []
+  ignore_missing:
+    description: Units that are not installed are reported but do not raise an alert.
+    type: bool
+    default: true
+  disk_warn:
+    type: float
+    default: 80
+  disk_crit:
+    type: float
+    default: 90
+  cpu_warn:
+    type: float
+    default: 70
+  cpu_crit:
+    type: float
+    default: 90
+  mem_warn:
+    type: float
+    default: 80
+  mem_crit:
+    type: float
+    default: 95
+  fail_on_critical:
+    description: Fail the task when any metric is critical.
+    type: bool
+    default: false
+'''
+
+EXAMPLES = '''
+- name: Health check
+  lab_health:
+    mounts: [/, /var]
+    services: [ssh, nginx]
+  register: health
+'''
+
+RETURN = '''
+health:
+  description: Compact health result.
+  returned: always
+  type: dict
+  sample:
+    status: warning
+    alerts: ["Disk /: 84.1% (warn 80%)"]
+    disk: {"/": {"percent": 84.1, "total_mb": 40960, "free_mb": 6512, "status": "warning"}}
+    cpu: {"load": [0.4, 0.3, 0.2], "vcpus": 2, "percent": 20.0, "status": "ok"}
+    mem: {"total_mb": 3936, "available_mb": 2510, "percent": 36.2, "status": "ok"}
+    services: {"ssh": {"state": "running", "sub_state": "running", "status": "ok"},
+               "ufw": {"state": "running", "sub_state": "exited", "status": "ok"}}
+'''
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+
+STATUS_RANK = {'ok': 0, 'warning': 1, 'critical': 2}
+
+
+def level(value, warn, crit):
+    if value > crit:
+        return 'critical'
+    if value > warn:
+        return 'warning'
+    return 'ok'
+
+
+def read_loadavg():
+    with open('/proc/loadavg') as f:
+        return [float(v) for v in f.read().split()[:3]]
+
+
+def read_meminfo():
+    """{'MemTotal': kB, ...} hanya field yang dibutuhkan"""
+    wanted = ('MemTotal', 'MemFree', 'MemAvailable', 'Buffers', 'Cached')
+    info = {}
+    with open('/proc/meminfo') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in wanted:
+                info[key] = int(rest.split()[0])
+                if len(info) == len(wanted):
+                    break
+    return info
+
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def disk_usage(mount):
+    st = os.statvfs(mount)
+    total = st.f_blocks * st.f_frsize
+    free = st.f_bavail * st.f_frsize
+    # Sama dengan hitungan lama: (size_total - size_available) / size_total
+    percent = round((total - free) / total * 100, 2) if total else 0.0
+    return {'total_mb': total // 1048576, 'free_mb': free // 1048576, 'percent': percent}
+
+
+def unit_states(module, services):
+    """Satu panggilan `systemctl show` untuk semua unit"""
+    units = [s if '.' in s else s + '.service' for s in services]
+    systemctl = module.get_bin_path('systemctl')
+    if not systemctl:
+        return {name: {'state': 'unknown'} for name in services}
+
+    rc, out, err = module.run_command(
+        [systemctl, 'show', '--property=Id,LoadState,ActiveState,SubState'] + units)
+    if rc != 0:
+        return {name: {'state': 'unknown', 'error': err.strip()} for name in services}
+
+    # Output per unit dipisah baris kosong, urutan sama dengan argumen
+    blocks = [b for b in out.strip().split('\n\n') if b.strip()]
+    states = {}
+    for name, block in zip(services, blocks):
+        props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+        if props.get('LoadState') == 'not-found':
+            state = 'not-found'
+        elif props.get('ActiveState') == 'active':
+            # Unit oneshot (mis. ufw: active/exited) tetap dihitung jalan; SubState hanya detail
+            state = 'running'
+        else:
+            state = props.get('ActiveState') or 'unknown'
+        states[name] = {'state': state}
+        if props.get('SubState'):
+            states[name]['sub_state'] = props['SubState']
+    return states
+
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=dict(
+            mounts=dict(type='list', elements='str', default=['/']),
+            services=dict(type='list', elements='str', default=[]),
+            ignore_missing=dict(type='bool', default=True),
+            disk_warn=dict(type='float', default=80),
+            disk_crit=dict(type='float', default=90),
+            cpu_warn=dict(type='float', default=70),
+            cpu_crit=dict(type='float', default=90),
+            mem_warn=dict(type='float', default=80),
+            mem_crit=dict(type='float', default=95),
+            fail_on_critical=dict(type='bool', default=False),
+        ),
+        supports_check_mode=True,
+    )
+    p = module.params
+    alerts = []
+
+    # 1. Disk
+    disk = {}
+    for mount in p['mounts']:
+        try:
+            usage = disk_usage(mount)
+        except OSError as e:
+            disk[mount] = {'status': 'critical', 'error': str(e)}
+            alerts.append(f"Disk {mount}: {e}")
+            continue
+        usage['status'] = level(usage['percent'], p['disk_warn'], p['disk_crit'])
+        if usage['status'] != 'ok':
+            alerts.append(f"Disk {mount}: {usage['percent']}% (warn {p['disk_warn']:g}%)")
+        disk[mount] = usage
+
+    # 2. CPU (estimasi dari load average 1 menit / jumlah vCPU)
+    load = read_loadavg()
+    vcpus = cpu_count()
+    cpu_percent = round(load[0] / vcpus * 100, 2)
+    cpu = {'load': load, 'vcpus': vcpus, 'percent': cpu_percent,
+           'status': level(cpu_percent, p['cpu_warn'], p['cpu_crit'])}
+    if cpu['status'] != 'ok':
+        alerts.append(f"CPU: {cpu_percent}% (warn {p['cpu_warn']:g}%)")
+
+    # 3. Memory (MemAvailable; fallback untuk kernel lama)
+    meminfo = read_meminfo()
+    total = meminfo.get('MemTotal', 0)
+    available = meminfo.get('MemAvailable',
+                            meminfo.get('MemFree', 0) + meminfo.get('Buffers', 0) + meminfo.get('Cached', 0))
+    mem_percent = round((total - available) / total * 100, 2) if total else 0.0
+    mem = {'total_mb': total // 1024, 'available_mb': available // 1024, 'percent': mem_percent,
+           'status': level(mem_percent, p['mem_warn'], p['mem_crit'])}
+    if mem['status'] != 'ok':
+        alerts.append(f"Mem: {mem_percent}% (warn {p['mem_warn']:g}%)")
+
+    # 4. Service
+    services = unit_states(module, p['services']) if p['services'] else {}
+    for name, info in services.items():
+        if info['state'] == 'running':
+            info['status'] = 'ok'
+        elif info['state'] == 'not-found' and p['ignore_missing']:
+            info['status'] = 'ok'
+        elif info['state'] == 'unknown':
+            # systemctl tidak ada/gagal: status tidak bisa dipastikan
+            info['status'] = 'warning'
+            alerts.append(f"Service {name}: unknown")
+        else:
+            info['status'] = 'critical'
+            alerts.append(f"Service {name}: {info['state']}")
+
+    statuses = [d['status'] for d in disk.values()] + [cpu['status'], mem['status']]
+    statuses += [s['status'] for s in services.values()]
+    status = max(statuses, key=STATUS_RANK.get, default='ok')
+
+    health = {'status': status, 'alerts': alerts, 'disk': disk, 'cpu': cpu, 'mem': mem,
+              'services': services}
+    if status == 'critical' and p['fail_on_critical']:
+        module.fail_json(msg='; '.join(alerts), health=health)
+    module.exit_json(changed=False, health=health)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# File: library/lab_inventory.py
+# ============================
+# MODULE: INVENTARIS RINGKAS UNTUK COMPLIANCE ENGINE
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: lab_inventory
+short_description: Compact package/config/service inventory for the compliance engine
+description:
+  - Returns installed packages (name -> version), the digest and content of the
+    given config files and the active/enabled state of the given systemd units.
+  - Data whose digest is already known by the control node (C(known)) is not
+    sent again; only the digest is returned, so unchanged hosts send a few bytes.
+options:
+  files:
+    description: Config files evaluated by file rules.
+    type: list
+    elements: path
+    default: []
+  services:
+    description: systemd units evaluated by service rules.
+    type: list
+    elements: str
+    default: []
+  known:
+    description: Digests from the previous run (C(packages) and C(files) per path).
+    type: dict
+    default: {}
+  max_file_size:
+    description:
+      - Files larger than this are reported by digest only, with C(too_large=true).
+      - The compliance engine reports every rule on such a file as a violation.
+    type: int
+    default: 1048576
+'''
+
+RETURN = '''
+inventory:
+  description: packages (or null if unchanged), packages_digest, files, services.
+  returned: always
+  type: dict
+'''
+
+import hashlib
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+
+PACKAGE_COMMANDS = (
+    ('dpkg-query', ['-W', '-f', '${db:Status-Abbrev}\\t${Package}\\t${Version}\\n']),
+    ('rpm', ['-qa', '--qf', '%{NAME}\\t%{VERSION}-%{RELEASE}\\n']),
+)
+
+
+def list_packages(module):
+    for binary, args in PACKAGE_COMMANDS:
+        path = module.get_bin_path(binary)
+        if path:
+            rc, out, err = module.run_command([path] + args)
+            if rc == 0:
+                return out
+            module.fail_json(msg=f"{binary} gagal: {err.strip()}")
+    return ''
+
+
+def parse_packages(output):
+    packages = {}
+    for line in output.splitlines():
+        fields = line.split('\t')
+        if len(fields) == 3:
+            # dpkg: hanya status "ii" (terpasang), bukan "rc" (sisa config)
+            if not fields[0].startswith('ii'):
+                continue
+            fields = fields[1:]
+        if len(fields) == 2 and fields[0]:
+            packages[fields[0]] = fields[1]
+    return packages
+
+
+def service_states(module, services):
+    """Satu panggilan `systemctl show` untuk semua unit"""
+    systemctl = module.get_bin_path('systemctl')
+    if not systemctl or not services:
+        return {name: {'active': 'unknown', 'enabled': 'unknown'} for name in services}
+    units = [s if '.' in s else s + '.service' for s in services]
+    rc, out, err = module.run_command(
+        [systemctl, 'show', '--property=Id,LoadState,ActiveState,UnitFileState'] + units)
+    if rc != 0:
+        return {name: {'active': 'unknown', 'enabled': 'unknown'} for name in services}
+
+    states = {}
+    blocks = [b for b in out.strip().split('\n\n') if b.strip()]
+    for name, block in zip(services, blocks):
+        props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+        if props.get('LoadState') == 'not-found':
+            states[name] = {'active': 'not-found', 'enabled': 'not-found'}
+        else:
+            states[name] = {'active': props.get('ActiveState', 'unknown'),
+                            'enabled': props.get('UnitFileState') or 'unknown'}
+    return states
+
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=dict(
+            files=dict(type='list', elements='path', default=[]),
+            services=dict(type='list', elements='str', default=[]),
+            known=dict(type='dict', default={}),
+            max_file_size=dict(type='int', default=1048576),
+        ),
+        supports_check_mode=True,
+    )
+    p = module.params
+    known = p['known'] or {}
+    known_files = known.get('files') or {}
+
+    output = list_packages(module)
+    packages_digest = hashlib.sha1(output.encode()).hexdigest()
+    packages = None if packages_digest == known.get('packages') else parse_packages(output)
+
+    files = {}
+    for path in p['files']:
+        try:
+            if os.path.getsize(path) > p['max_file_size']:
+                with open(path, 'rb') as f:
+                    files[path] = {'digest': hashlib.sha1(f.read()).hexdigest(), 'content': None, 'too_large': True}
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            files[path] = {'digest': None, 'content': None}
+            continue
+        digest = hashlib.sha1(data).hexdigest()
+        content = None if digest == known_files.get(path) else data.decode('utf-8', errors='replace')
+        files[path] = {'digest': digest, 'content': content}
+
+    inventory = {
+        'packages_digest': packages_digest,
+        'packages': packages,
+        'files': files,
+        'services': service_states(module, p['services']),
+    }
+    module.exit_json(changed=False, inventory=inventory)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+#!/usr/bin/python
+# File: library/lab_snapshot.py
+# ============================
+# MODULE: SNAPSHOT INKREMENTAL (DEDUP CHUNK + MANIFEST)
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: lab_snapshot
+short_description: Incremental, deduplicated file snapshots with manifest-based restore
+description:
+  - Files are split into fixed-size chunks, stored once by SHA-256 in
+    C(store)/objects and compressed with zlib in parallel.
+  - Every snapshot writes a manifest (path, metadata, chunk list) and appends
+    to C(store)/manifests/<name>/index.json. Files whose size and mtime are
+    unchanged since the previous snapshot reuse its chunk list without being read.
+  - Restore resolves C(latest), a snapshot ID or an epoch (newest snapshot at or
+    before that time) through the index.
+options:
+  store:
+    description: Snapshot store directory.
+    type: path
+    required: true
+  name:
+    description: Snapshot set name (usually inventory_hostname).
+    type: str
+    required: true
+  state:
+    description: C(present) creates a snapshot, C(restored) restores one.
+    type: str
+    choices: [present, restored]
+    default: present
+  paths:
+    description: Paths to snapshot, or to restore (filter) when state=restored.
+    type: list
+    elements: path
+    default: ['/']
+  exclude:
+    description: Path prefixes that are skipped (the store itself is always skipped).
+    type: list
+    elements: path
+    default: ['/proc', '/sys', '/dev', '/run', '/tmp']
+  snapshot:
+    description: Snapshot to restore, C(latest), a snapshot ID or an epoch.
+    type: str
+    default: latest
+  dest:
+    description: Restore root; files are written to dest + original path.
+    type: path
+    default: /
+  keep:
+    description: Keep only the newest N snapshots and remove unreferenced chunks (0 keeps all).
+    type: int
+    default: 0
+  workers:
+    description: Parallel hashing/compression workers.
+    type: int
+    default: 4
+  chunk_size:
+    description: Chunk size in bytes.
+    type: int
+    default: 4194304
+'''
+
+EXAMPLES = '''
+- name: Snapshot
+  lab_snapshot:
+    store: /backup/store
+    name: "{{ inventory_hostname }}"
+    paths: [/etc, /home]
+
+- name: Restore /etc from the snapshot at or before an epoch
+  lab_snapshot:
+    store: /backup/store
+    name: "{{ inventory_hostname }}"
+    state: restored
+    snapshot: "1735689600"
+    paths: [/etc]
+'''
+
+RETURN = '''
+snapshot:
+  description: Snapshot ID that was created or restored.
+  returned: always
+  type: str
+stats:
+  description: Files, reused files, new chunks and bytes written.
+  returned: always
+  type: dict
+'''
+
+import gzip
+import hashlib
+import json
+import os
+import stat
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import AnsibleModule
+
+CHUNK_SIZE = 4 * 1024 * 1024
+MAX_ERRORS = 20
+
+# Entry manifest: [type, mode, uid, gid, mtime_ns, size, chunks|target]
+FILE, DIR, LINK = 'f', 'd', 'l'
+
+
+def atomic_write(path, data):
+    # Nama tmp unik per thread: chunk yang sama bisa ditulis dua worker sekaligus
+    tmp = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    """Content-addressed store: objects/<sha[:2]>/<sha[2:]> + manifest per snapshot"""
+
+    def __init__(self, root, name, chunk_size=CHUNK_SIZE, workers=4):
+        self.root = root
+        self.name = name
+        self.chunk_size = chunk_size
+        self.workers = max(1, workers)
+        self.objects = os.path.join(root, 'objects')
+        self.manifests = os.path.join(root, 'manifests', name)
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.manifests, exist_ok=True)
+
+    # ---------- Index + manifest ----------
+    def index(self):
+        path = os.path.join(self.manifests, 'index.json')
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_index(self, entries):
+        atomic_write(os.path.join(self.manifests, 'index.json'), json.dumps(entries, indent=1).encode())
+
+    def load_manifest(self, snapshot_id):
+        with gzip.open(os.path.join(self.manifests, f'{snapshot_id}.json.gz'), 'rt') as f:
+            return json.load(f)
+
+    def resolve(self, snapshot='latest'):
+        """'latest', ID snapshot, atau epoch -> entry index (snapshot terbaru <= epoch)"""
+        entries = self.index()
+        if not entries:
+            return None
+        snapshot = str(snapshot or 'latest')
+        if snapshot == 'latest':
+            return entries[-1]
+        for entry in entries:
+            if entry['id'] == snapshot:
+                return entry
+        if snapshot.isdigit():
+            older = [e for e in entries if e['created'] <= int(snapshot)]
+            return older[-1] if older else None
+        return None
+
+    # ---------- Chunk ----------
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def _store_chunk(self, data, stats):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            compressed = zlib.compress(data, 6)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, compressed)
+            stats['new_chunks'] += 1
+            stats['written_bytes'] += len(compressed)
+        return digest
+
+    def read_chunk(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def _store_file(self, path, stats):
+        chunks = []
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                stats['read_bytes'] += len(data)
+                chunks.append(self._store_chunk(data, stats))
+        return chunks
+
+    # ---------- Snapshot ----------
+    def walk(self, paths, exclude, errors):
+        """Yield (path, lstat) untuk semua entry; tidak mengikuti symlink"""
+        skip = tuple(os.path.normpath(p) for p in exclude)
+
+        def excluded(path):
+            return any(path == p or path.startswith(p.rstrip('/') + '/') for p in skip)
+
+        stack = [os.path.normpath(p) for p in reversed(paths)]
+        while stack:
+            path = stack.pop()
+            if excluded(path):
+                continue
+            try:
+                st = os.lstat(path)
+            except OSError as e:
+                errors.append(f"{path}: {e.strerror}")
+                continue
+            yield path, st
+            if stat.S_ISDIR(st.st_mode):
+                try:
+                    children = sorted(os.listdir(path), reverse=True)
+                except OSError as e:
+                    errors.append(f"{path}: {e.strerror}")
+                    continue
+                stack.extend(os.path.join(path, child) for child in children)
+
+    def create(self, paths, exclude=()):
+        started = time.time()
+        entries = self.index()
+        previous = self.load_manifest(entries[-1]['id'])['files'] if entries else {}
+
+        stats = {'files': 0, 'reused_files': 0, 'changed_files': 0, 'new_chunks': 0,
+                 'read_bytes': 0, 'written_bytes': 0, 'logical_bytes': 0}
+        errors = []
+        files = {}
+        changed = []  # path yang harus dibaca (baru/berubah)
+
+        for path, st in self.walk(paths, list(exclude) + [self.root], errors):
+            meta = [stat.S_IMODE(st.st_mode), st.st_uid, st.st_gid, st.st_mtime_ns]
+            if stat.S_ISDIR(st.st_mode):
+                files[path] = [DIR] + meta + [0, None]
+            elif stat.S_ISLNK(st.st_mode):
+                files[path] = [LINK] + meta + [0, os.readlink(path)]
+            elif stat.S_ISREG(st.st_mode):
+                stats['files'] += 1
+                stats['logical_bytes'] += st.st_size
+                old = previous.get(path)
+                # Ukuran + mtime sama: pakai ulang daftar chunk tanpa membaca file
+                if old and old[0] == FILE and old[4] == st.st_mtime_ns and old[5] == st.st_size:
+                    files[path] = [FILE] + meta + [st.st_size, old[6]]
+                    stats['reused_files'] += 1
+                else:
+                    files[path] = [FILE] + meta + [st.st_size, None]
+                    changed.append(path)
+
+        # Hash + kompres file yang berubah secara paralel (zlib/hashlib melepas GIL)
+        def work(path):
+            part = {'new_chunks': 0, 'read_bytes': 0, 'written_bytes': 0}
+            try:
+                return path, self._store_file(path, part), part, None
+            except OSError as e:
+                return path, None, part, f"{path}: {e.strerror}"
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            for path, chunks, part, error in pool.map(work, changed):
+                for key, value in part.items():
+                    stats[key] += value
+                if error:
+                    errors.append(error)
+                    del files[path]
+                    continue
+                files[path][6] = chunks
+                stats['changed_files'] += 1
+
+        snapshot_id = time.strftime('%Y%m%dT%H%M%S', time.gmtime(started))
+        if any(e['id'] == snapshot_id for e in entries):
+            snapshot_id += f"-{len(entries)}"
+        manifest = {'id': snapshot_id, 'created': int(started), 'paths': list(paths), 'files': files}
+        data = gzip.compress(json.dumps(manifest, separators=(',', ':')).encode(), 6)
+        atomic_write(os.path.join(self.manifests, f'{snapshot_id}.json.gz'), data)
+
+        stats['manifest_bytes'] = len(data)
+        stats['errors'] = len(errors)
+        stats['duration'] = round(time.time() - started, 3)
+        entries.append({'id': snapshot_id, 'created': int(started), 'files': stats['files'],
+                        'logical_bytes': stats['logical_bytes'], 'written_bytes': stats['written_bytes']})
+        self._write_index(entries)
+        return snapshot_id, stats, errors[:MAX_ERRORS]
+
+    # ---------- Restore ----------
+    def restore(self, snapshot='latest', paths=('/',), dest='/'):
+        entry = self.resolve(snapshot)
+        if entry is None:
+            raise ValueError(f"Snapshot '{snapshot}' tidak ditemukan untuk {self.name}")
+        files = self.load_manifest(entry['id'])['files']
+        wanted = tuple(os.path.normpath(p) for p in paths)
+
+        def selected(path):
+            return any(path == p or p == '/' or path.startswith(p + '/') for p in wanted)
+
+        is_root = os.geteuid() == 0
+        stats = {'files': 0, 'restored_bytes': 0, 'dirs': 0, 'links': 0}
+        dirs = []
+        for path in sorted(files):
+            if not selected(path):
+                continue
+            kind, mode, uid, gid, mtime_ns, size, extra = files[path]
+            target = os.path.join(dest, path.lstrip('/'))
+            if kind == DIR:
+                os.makedirs(target, exist_ok=True)
+                dirs.append((target, mode, uid, gid, mtime_ns))
+                stats['dirs'] += 1
+                continue
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if kind == LINK:
+                if os.path.lexists(target):
+                    os.remove(target)
+                os.symlink(extra, target)
+                if is_root:
+                    os.lchown(target, uid, gid)
+                stats['links'] += 1
+                continue
+
+            tmp = f"{target}.restore{os.getpid()}"
+            with open(tmp, 'wb') as f:
+                for digest in extra:
+                    f.write(self.read_chunk(digest))
+            os.chmod(tmp, mode)
+            if is_root:
+                os.chown(tmp, uid, gid)
+            os.utime(tmp, ns=(mtime_ns, mtime_ns))
+            os.replace(tmp, target)
+            stats['files'] += 1
+            stats['restored_bytes'] += size
+
+        # mtime/permission direktori di-set terakhir (menulis file mengubah mtime dir)
+        for target, mode, uid, gid, mtime_ns in reversed(dirs):
+            os.chmod(target, mode)
+            if is_root:
+                os.chown(target, uid, gid)
+            os.utime(target, ns=(mtime_ns, mtime_ns))
+        return entry['id'], stats
+
+    # ---------- Retention ----------
+    def prune(self, keep):
+        """Simpan `keep` snapshot terbaru, hapus chunk yang tidak direferensikan snapshot mana pun"""
+        entries = self.index()
+        if keep <= 0 or len(entries) <= keep:
+            return {'removed_snapshots': 0, 'removed_chunks': 0}
+        removed, entries = entries[:-keep], entries[-keep:]
+        for entry in removed:
+            os.remove(os.path.join(self.manifests, f"{entry['id']}.json.gz"))
+        self._write_index(entries)
+
+        # Chunk dipakai bersama antar host: kumpulkan referensi dari semua set snapshot
+        referenced = set()
+        manifests_root = os.path.dirname(self.manifests)
+        for name in os.listdir(manifests_root):
+            other = SnapshotStore(self.root, name) if name != self.name else self
+            for entry in other.index():
+                for item in other.load_manifest(entry['id'])['files'].values():
+                    if item[0] == FILE:
+                        referenced.update(item[6])
+
+        removed_chunks = 0
+        for prefix in os.listdir(self.objects):
+            directory = os.path.join(self.objects, prefix)
+            for rest in os.listdir(directory):
+                if prefix + rest not in referenced:
+                    os.remove(os.path.join(directory, rest))
+                    removed_chunks += 1
+        return {'removed_snapshots': len(removed), 'removed_chunks': removed_chunks}
+
+
+def run_module():
+    module = AnsibleModule(
+        argument_spec=dict(
+            store=dict(type='path', required=True),
+            name=dict(type='str', required=True),
+            state=dict(type='str', choices=['present', 'restored'], default='present'),
+            paths=dict(type='list', elements='path', default=['/']),
+            exclude=dict(type='list', elements='path', default=['/proc', '/sys', '/dev', '/run', '/tmp']),
+            snapshot=dict(type='str', default='latest'),
+            dest=dict(type='path', default='/'),
+            keep=dict(type='int', default=0),
+            workers=dict(type='int', default=4),
+            chunk_size=dict(type='int', default=CHUNK_SIZE),
+        ),
+        supports_check_mode=False,
+    )
+    p = module.params
+    store = SnapshotStore(p['store'], p['name'], chunk_size=p['chunk_size'], workers=p['workers'])
+
+    if p['state'] == 'restored':
+        try:
+            snapshot_id, stats = store.restore(p['snapshot'], p['paths'], p['dest'])
+        except (ValueError, OSError) as e:
+            module.fail_json(msg=str(e))
+        module.exit_json(changed=stats['files'] > 0, snapshot=snapshot_id, stats=stats)
+
+    snapshot_id, stats, errors = store.create(p['paths'], p['exclude'])
+    if p['keep']:
+        stats.update(store.prune(p['keep']))
+    if errors:
+        module.warn(f"{stats['errors']} path dilewati (mis. {errors[0]})")
+    module.exit_json(changed=True, snapshot=snapshot_id, stats=stats, errors=errors)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
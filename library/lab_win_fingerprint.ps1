@@ -0,0 +1,210 @@
+#!powershell
+# File: library/lab_win_fingerprint.ps1
+# ============================
+# MODULE: FINGERPRINT DESIRED STATE UNTUK HOST WINDOWS
+# ============================
+# Versi Windows dari lab_fingerprint.py; option dan hasil sama (lihat lab_win_fingerprint.py).
+# `commands` di sini adalah ekspresi PowerShell; output-nya ikut di-hash.
+
+#AnsibleRequires -CSharpUtil Ansible.Basic
+
+$spec = @{
+    options = @{
+        name = @{ type = 'str'; required = $true }
+        state = @{ type = 'str'; choices = @('check', 'record'); default = 'check' }
+        inputs_digest = @{ type = 'str'; default = '' }
+        paths = @{ type = 'list'; elements = 'str'; default = @() }
+        commands = @{ type = 'list'; elements = 'str'; default = @() }
+        force = @{ type = 'bool'; default = $false }
+        max_age = @{ type = 'int'; default = 0 }
+        started = @{ type = 'float'; default = 0 }
+        store = @{ type = 'path'; default = 'C:\ProgramData\LabFingerprint' }
+        hash_limit = @{ type = 'int'; default = 1048576 }
+    }
+    supports_check_mode = $true
+}
+
+$module = [Ansible.Basic.AnsibleModule]::Create($args, $spec)
+$p = $module.Params
+
+if ($p.name -match '[\\/:]' -or $p.name -in @('', '.', '..')) {
+    $module.FailJson("Nama fingerprint tidak valid: $($p.name)")
+}
+
+Function Get-TextDigest {
+    param([String]$Text)
+
+    $sha = [System.Security.Cryptography.SHA256]::Create()
+    try {
+        $bytes = $sha.ComputeHash([System.Text.Encoding]::UTF8.GetBytes($Text))
+    }
+    finally {
+        $sha.Dispose()
+    }
+    -join ($bytes | ForEach-Object { $_.ToString('x2') })
+}
+
+Function Get-EntryDigest {
+    <#
+    .SYNOPSIS
+    Isi file (sha256) jika kecil, selain itu size + mtime; direktori satu level
+    #>
+    param([String]$Path, [Int64]$HashLimit, [Int]$Depth = 0)
+
+    try {
+        $item = Get-Item -LiteralPath $Path -Force -ErrorAction Stop
+    }
+    catch [System.Management.Automation.ItemNotFoundException] {
+        return 'absent'
+    }
+    catch {
+        return "error:$($_.Exception.GetType().Name)"
+    }
+
+    if (-not $item.PSIsContainer) {
+        if ($item.Length -gt $HashLimit) {
+            return "file:$($item.Length):$($item.LastWriteTimeUtc.Ticks)"
+        }
+        try {
+            return 'file:' + (Get-FileHash -LiteralPath $item.FullName -Algorithm SHA256 -ErrorAction Stop).Hash.ToLower()
+        }
+        catch {
+            return "error:$($_.Exception.GetType().Name)"
+        }
+    }
+    if ($Depth -gt 0) {
+        # Subdirektori tidak ditelusuri (murah): cukup mtime
+        return "dir:$($item.LastWriteTimeUtc.Ticks)"
+    }
+    $children = Get-ChildItem -LiteralPath $item.FullName -Force -ErrorAction SilentlyContinue |
+        Sort-Object -Property Name |
+        ForEach-Object { '{0}={1}' -f $_.Name, (Get-EntryDigest -Path $_.FullName -HashLimit $HashLimit -Depth ($Depth + 1)) }
+    'dir:' + (Get-TextDigest -Text (@($children) -join "`n"))
+}
+
+$now = [DateTimeOffset]::UtcNow.ToUnixTimeMilliseconds() / 1000
+$recordPath = Join-Path $p.store "$($p.name).json"
+$previous = @{}
+if (Test-Path -LiteralPath $recordPath) {
+    try {
+        $json = ConvertFrom-Json -InputObject ([System.IO.File]::ReadAllText($recordPath))
+        foreach ($prop in $json.PSObject.Properties) {
+            $previous[$prop.Name] = $prop.Value
+        }
+    }
+    catch {
+        # Record rusak diperlakukan seperti belum ada
+        $previous = @{}
+    }
+}
+
+# ---------- Digest state host ----------
+$items = @{}
+foreach ($path in $p.paths) {
+    $items[$path] = Get-EntryDigest -Path $path -HashLimit $p.hash_limit
+}
+foreach ($command in $p.commands) {
+    try {
+        $output = & ([ScriptBlock]::Create($command)) 2>&1 | Out-String
+        $items["cmd:$command"] = 'ok:' + (Get-TextDigest -Text $output)
+    }
+    catch {
+        $items["cmd:$command"] = "error:$($_.Exception.GetType().Name)"
+    }
+}
+$hostDigest = Get-TextDigest -Text ((@($items.Keys | Sort-Object -CaseSensitive) | ForEach-Object { "$_`t$($items[$_])" }) -join "`n")
+$fingerprint = Get-TextDigest -Text "$($p.inputs_digest)`n$hostDigest"
+
+$result = [Ordered]@{
+    name = $p.name
+    fingerprint = $fingerprint
+    previous = $previous.fingerprint
+    inputs_digest = $p.inputs_digest
+    host_digest = $hostDigest
+    checked_at = [Math]::Round($now, 3)
+    recorded_at = $previous.recorded_at
+    age = $null
+    matched = $false
+    drift = @()
+    saved_seconds = 0
+    recorded = $false
+}
+if ($previous.recorded_at) {
+    $result.age = [Math]::Round($now - $previous.recorded_at, 1)
+}
+$module.Result.fingerprint = $result
+
+if ($p.state -eq 'record') {
+    $duration = $previous.duration
+    if ($p.started) {
+        $duration = [Math]::Round($now - $p.started, 1)
+    }
+    if (-not $duration) {
+        $duration = 0
+    }
+    $module.Result.changed = $fingerprint -ne $previous.fingerprint
+    if (-not $module.CheckMode) {
+        try {
+            if (-not (Test-Path -LiteralPath $p.store)) {
+                New-Item -Path $p.store -ItemType Directory -Force | Out-Null
+            }
+            $record = [Ordered]@{
+                fingerprint = $fingerprint
+                inputs = $p.inputs_digest
+                host = $hostDigest
+                items = $items
+                recorded_at = [Math]::Round($now, 3)
+                duration = $duration
+            }
+            # Tulis ke file sementara lalu ganti, supaya run yang terputus tidak meninggalkan JSON rusak
+            $tmp = "$recordPath.$PID.tmp"
+            [System.IO.File]::WriteAllText($tmp, (ConvertTo-Json -InputObject $record -Depth 3))
+            Move-Item -LiteralPath $tmp -Destination $recordPath -Force
+        }
+        catch {
+            $module.FailJson("Gagal menyimpan fingerprint ${recordPath}: $($_.Exception.Message)", $_)
+        }
+        $result.recorded = $true
+    }
+    $result.reason = 'recorded'
+    $result.duration = $duration
+    $module.ExitJson()
+}
+
+# ---------- state=check: alasan pertama yang membuat host harus di-apply ----------
+if ($p.force) {
+    $reason = 'forced'
+}
+elseif (-not $previous.fingerprint) {
+    $reason = 'new'
+}
+elseif ($previous.inputs -ne $p.inputs_digest) {
+    $reason = 'inputs'
+}
+elseif ($previous.host -ne $hostDigest) {
+    $reason = 'host_state'
+    $oldItems = @{}
+    if ($previous.items) {
+        foreach ($prop in $previous.items.PSObject.Properties) {
+            $oldItems[$prop.Name] = $prop.Value
+        }
+    }
+    $keys = @($items.Keys) + @($oldItems.Keys) | Sort-Object -Unique
+    $result.drift = @($keys | Where-Object { $items[$_] -ne $oldItems[$_] })
+}
+elseif ($p.max_age -and $null -ne $result.age -and $result.age -gt $p.max_age) {
+    $reason = 'expired'
+}
+else {
+    $reason = 'match'
+}
+
+$result.reason = $reason
+if ($reason -eq 'match') {
+    $result.matched = $true
+    $result.saved_seconds = $previous.duration
+    if (-not $result.saved_seconds) {
+        $result.saved_seconds = 0
+    }
+}
+$module.ExitJson()
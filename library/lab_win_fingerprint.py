@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# File: library/lab_win_fingerprint.py
+# ============================
+# DOKUMENTASI MODULE WINDOWS lab_win_fingerprint (implementasi: lab_win_fingerprint.ps1)
+# ============================
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: lab_win_fingerprint
+short_description: Desired-state fingerprint for Windows hosts
+description:
+  - Windows version of M(lab_fingerprint); options, check/record behaviour and
+    the returned C(fingerprint) dict are the same.
+  - Files are hashed with Get-FileHash (SHA256); directories are listed one level deep.
+options:
+  name:
+    description: Name of the fingerprint (usually the playbook or section).
+    type: str
+    required: true
+  state:
+    type: str
+    choices: [check, record]
+    default: check
+  inputs_digest:
+    description: Digest of the rendered inputs (vars, templates, package lists).
+    type: str
+    default: ''
+  paths:
+    description: Files or directories whose state is part of the host digest.
+    type: list
+    elements: str
+    default: []
+  commands:
+    description: Cheap read-only PowerShell expressions; their output is part of the host digest.
+    type: list
+    elements: str
+    default: []
+  force:
+    description: Never report a match (C(state=check)).
+    type: bool
+    default: false
+  max_age:
+    description: Seconds after which a recorded fingerprint no longer matches (0 = never expires).
+    type: int
+    default: 0
+  started:
+    description: Epoch when the apply started (C(checked_at) of the check), used for the recorded duration.
+    type: float
+    default: 0
+  store:
+    description: Directory with the recorded fingerprints.
+    type: path
+    default: C:\\ProgramData\\LabFingerprint
+  hash_limit:
+    description: Files bigger than this (bytes) are not hashed by content.
+    type: int
+    default: 1048576
+'''
+
+RETURN = '''
+fingerprint:
+  description: >-
+    name, matched, reason (match, new, inputs, host_state, expired, forced; recorded
+    for state=record), fingerprint, previous, inputs_digest, host_digest, drift,
+    checked_at, recorded_at, age, saved_seconds and recorded.
+  returned: always
+  type: dict
+'''
@@ -0,0 +1,319 @@
+# File: scripts/ansible_worker.py
+# ============================
+# WORKER ANSIBLE PERSISTEN (TANPA FORK CLI PER COMMAND)
+# ============================
+# Worker ini dijalankan sekali oleh bot sebagai subprocess. ansible-core di-import
+# sekali dan inventory dimuat sekali, lalu request ad-hoc/playbook diterima lewat
+# stdin (JSON per baris) dan event hasil dikirim balik per baris, formatnya sama
+# dengan callback lab_events sehingga bisa langsung di-feed ke PlaybookResult.
+#
+# Request : {"id": 1, "type": "adhoc", "pattern": "windows_lab", "module": "win_ping", "args": "", "timeout": 30}
+#           {"id": 2, "type": "playbook", "playbook": "/path/play.yml", "limit": "pc01,pc02", "extra_vars": {}}
+# Response: {"id": 1, "event": {...}} ... lalu {"id": 1, "done": true, "rc": 0}
+import asyncio
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Return code mengikuti CLI ansible: 0 OK, 2 ada host gagal, 4 ada host unreachable
+RC_OK = 0
+RC_FAILED = 2
+RC_UNREACHABLE = 4
+RC_ERROR = 250
+
+
+# ============================
+# SISI WORKER (PROSES ANSIBLE)
+# ============================
+class AnsibleRuntime:
+    """Objek ansible-core yang dipertahankan selama worker hidup"""
+
+    def __init__(self, inventory_path, forks=10):
+        from ansible import context
+        from ansible.module_utils.common.collections import ImmutableDict
+        from ansible.parsing.dataloader import DataLoader
+        from ansible.inventory.manager import InventoryManager
+        from ansible.vars.manager import VariableManager
+        from ansible.plugins.loader import init_plugin_loader
+
+        init_plugin_loader()
+        context.CLIARGS = ImmutableDict(
+            connection='smart', forks=forks, module_path=None, become=None,
+            become_method=None, become_user=None, check=False, diff=False,
+            verbosity=0, syntax=None, start_at_task=None, listhosts=None,
+            listtasks=None, listtags=None, subset=None, tags=('all',), skip_tags=(),
+        )
+
+        self.inventory_path = inventory_path
+        self.forks = forks
+        self.loader = DataLoader()
+        self.inventory = InventoryManager(loader=self.loader, sources=[inventory_path])
+        self.variable_manager = VariableManager(loader=self.loader, inventory=self.inventory)
+        self._mtime = os.stat(inventory_path).st_mtime_ns
+
+    def refresh(self):
+        # Muat ulang inventory hanya jika file berubah
+        mtime = os.stat(self.inventory_path).st_mtime_ns
+        if mtime != self._mtime:
+            self.inventory.refresh_inventory()
+            self._mtime = mtime
+
+    def callback(self, emit):
+        sys.path.insert(0, os.path.join(PROJECT_ROOT, 'callback_plugins'))
+        from lab_events import CallbackModule
+
+        class WorkerEvents(CallbackModule):
+            def _emit(self, event, **data):
+                data['event'] = event
+                emit(data)
+
+        return WorkerEvents()
+
+    def run_adhoc(self, pattern, module, args, timeout, emit):
+        from ansible.executor.task_queue_manager import TaskQueueManager
+        from ansible.playbook.play import Play
+
+        self.refresh()
+        task = {'action': {'module': module, 'args': args or {}}}
+        if timeout:
+            task['timeout'] = int(timeout)
+        play = Play().load(
+            {'name': 'Ansible Ad-Hoc', 'hosts': pattern, 'gather_facts': 'no', 'tasks': [task]},
+            variable_manager=self.variable_manager,
+            loader=self.loader,
+        )
+        tqm = TaskQueueManager(
+            inventory=self.inventory,
+            variable_manager=self.variable_manager,
+            loader=self.loader,
+            passwords={},
+            stdout_callback=self.callback(emit),
+            forks=self.forks,
+            # Tanpa callbacks_enabled ansible.cfg: ping tidak boleh memicu digest Telegram/profil
+            run_additional_callbacks=False,
+        )
+        try:
+            tqm.run(play)
+            return self._rc(tqm._stats)
+        finally:
+            tqm.cleanup()
+            self.loader.cleanup_all_tmp_files()
+
+    def run_playbook(self, playbook, limit, extra_vars, emit):
+        from ansible.executor.playbook_executor import PlaybookExecutor
+
+        self.refresh()
+        self.variable_manager._extra_vars = extra_vars or {}
+        self.inventory.subset(limit)
+        try:
+            executor = PlaybookExecutor(
+                playbooks=[playbook],
+                inventory=self.inventory,
+                variable_manager=self.variable_manager,
+                loader=self.loader,
+                passwords={},
+            )
+            executor._tqm._stdout_callback = self.callback(emit)
+            executor.run()
+            return self._rc(executor._tqm._stats)
+        finally:
+            # Reset --limit dan batch serial supaya request berikutnya melihat semua host
+            self.inventory.subset(None)
+            self.inventory.remove_restriction()
+            self.inventory.clear_pattern_cache()
+            self.variable_manager._extra_vars = {}
+            self.loader.cleanup_all_tmp_files()
+
+    @staticmethod
+    def _rc(stats):
+        if stats.dark:
+            return RC_UNREACHABLE
+        if stats.failures:
+            return RC_FAILED
+        return RC_OK
+
+
+def worker_main(inventory_path, forks=10):
+    """Loop worker: baca request dari stdin, tulis event ke stdout asli"""
+    # ansible menulis warning/display ke stdout; pindahkan ke stderr supaya
+    # kanal protokol (fd stdout asli) hanya berisi JSON
+    protocol = os.fdopen(os.dup(1), 'w', buffering=1)
+    os.dup2(2, 1)
+
+    def send(payload):
+        protocol.write(json.dumps(payload, separators=(',', ':'), default=str) + '\n')
+
+    try:
+        runtime = AnsibleRuntime(inventory_path, forks=forks)
+    except Exception as e:
+        send({'id': 0, 'ready': False, 'error': str(e)})
+        return 1
+    send({'id': 0, 'ready': True})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        request_id = request.get('id')
+
+        def emit(event, request_id=request_id):
+            send({'id': request_id, 'event': event})
+
+        try:
+            if request.get('type') == 'playbook':
+                rc = runtime.run_playbook(request['playbook'], request.get('limit'),
+                                          request.get('extra_vars'), emit)
+            else:
+                rc = runtime.run_adhoc(request['pattern'], request['module'], request.get('args'),
+                                       request.get('timeout'), emit)
+            send({'id': request_id, 'done': True, 'rc': rc})
+        except Exception as e:
+            send({'id': request_id, 'done': True, 'rc': RC_ERROR, 'error': str(e)})
+    return 0
+
+
+# ============================
+# SISI BOT (CLIENT ASYNC)
+# ============================
+class AnsibleWorker:
+    """Client async untuk worker; request dijalankan berurutan (satu worker, satu runtime)"""
+
+    def __init__(self, inventory_path, cwd=None, forks=10, python=None, env=None):
+        self.inventory_path = inventory_path
+        self.cwd = cwd
+        self.forks = forks
+        self.python = python or sys.executable
+        self.env = env
+        self.process = None
+        self._ids = 0
+        self._lock = None
+
+    async def start(self):
+        """Start worker dan tunggu sampai ansible-core selesai di-import"""
+        self.process = await asyncio.create_subprocess_exec(
+            self.python, os.path.abspath(__file__), '--worker', self.inventory_path, '--forks', str(self.forks),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=self.cwd,
+            env=self.env,
+            limit=1024 * 1024,
+        )
+        ready = json.loads(await self.process.stdout.readline() or b'{}')
+        if not ready.get('ready'):
+            await self.stop()
+            raise RuntimeError(f"Worker ansible gagal start: {ready.get('error', 'proses berhenti')}")
+
+    async def stop(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+        self.process = None
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.returncode is None
+
+    async def _request(self, payload, result, timeout):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not self.alive:
+                await self.start()
+
+            self._ids += 1
+            payload['id'] = self._ids
+            self.process.stdin.write((json.dumps(payload) + '\n').encode())
+            await self.process.stdin.drain()
+
+            async def collect():
+                while True:
+                    line = await self.process.stdout.readline()
+                    if not line:
+                        raise RuntimeError("Worker ansible berhenti")
+                    message = json.loads(line)
+                    if message.get('id') != payload['id']:
+                        continue
+                    if message.get('done'):
+                        if message.get('error'):
+                            raise RuntimeError(message['error'])
+                        return message['rc']
+                    if result is not None:
+                        result.feed_event(message['event'])
+
+            try:
+                return await asyncio.wait_for(collect(), timeout)
+            except (asyncio.TimeoutError, RuntimeError):
+                # Worker yang macet/berhenti dibuang; request berikutnya start worker baru
+                await self.stop()
+                raise
+
+    async def adhoc(self, pattern, module, args=None, result=None, timeout=60):
+        """Jalankan modul ad-hoc (mis. win_ping) lewat worker; return rc ala CLI"""
+        payload = {'type': 'adhoc', 'pattern': pattern, 'module': module, 'args': args or {},
+                   'timeout': timeout}
+        return await self._request(payload, result, timeout)
+
+    async def playbook(self, playbook, limit=None, extra_vars=None, result=None, timeout=3600):
+        payload = {'type': 'playbook', 'playbook': playbook, 'limit': limit, 'extra_vars': extra_vars or {}}
+        return await self._request(payload, result, timeout)
+
+
+# ============================
+# BENCHMARK: CLI vs WORKER
+# ============================
+async def run_benchmark(hosts=10, rounds=5):
+    """Bandingkan latency `ansible -m ping` (fork CLI) vs worker untuk host local-connection"""
+    import tempfile
+
+    workdir = tempfile.mkdtemp()
+    inventory_path = os.path.join(workdir, 'hosts.ini')
+    with open(inventory_path, 'w') as f:
+        f.write(f"[bench]\nlocal[01:{hosts:02d}]\n\n[bench:vars]\n")
+        f.write(f"ansible_connection=local\nansible_python_interpreter={sys.executable}\n")
+
+    cli = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            'ansible', 'bench', '-i', inventory_path, '-m', 'ping',
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL, cwd=workdir,
+        )
+        await proc.wait()
+        cli.append(time.perf_counter() - start)
+
+    worker = AnsibleWorker(inventory_path, cwd=workdir)
+    start = time.perf_counter()
+    await worker.start()
+    startup = time.perf_counter() - start
+
+    warm = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await worker.adhoc('bench', 'ping')
+        warm.append(time.perf_counter() - start)
+    await worker.stop()
+
+    print(f"Host local     : {hosts} | Ulangan: {rounds}")
+    print(f"CLI ansible    : rata-rata {sum(cli) / len(cli) * 1000:.0f} ms")
+    print(f"Worker (start) : {startup * 1000:.0f} ms (sekali saja)")
+    print(f"Worker (warm)  : rata-rata {sum(warm) / len(warm) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Worker ansible persisten untuk bot")
+    parser.add_argument('--worker', metavar='INVENTORY', help="Jalankan mode worker dengan inventory ini")
+    parser.add_argument('--forks', type=int, default=10)
+    parser.add_argument('--bench-hosts', type=int, default=10)
+    parser.add_argument('--bench-rounds', type=int, default=5)
+    cli_args = parser.parse_args()
+
+    if cli_args.worker:
+        sys.exit(worker_main(cli_args.worker, forks=cli_args.forks))
+    asyncio.run(run_benchmark(cli_args.bench_hosts, cli_args.bench_rounds))
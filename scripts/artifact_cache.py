@@ -0,0 +1,469 @@
+# File: scripts/artifact_cache.py
+# ============================
+# ARTIFACT CACHE + FEED CHOCOLATEY DI CONTROL NODE
+# ============================
+# Installer (nginx zip, Node.js MSI) dan paket Chocolatey di-download sekali dari
+# upstream, diverifikasi checksum-nya, lalu dilayani ke PC lab lewat HTTP (dengan
+# Range, jadi download yang terputus bisa dilanjutkan).
+#
+#   /mirror/<nama>/<path>          artifact dari MIRRORS[nama] + /<path>
+#   /mirror/<nama>/<path>?sha256=  sha256 yang di-pin (wajib untuk mirror tanpa file checksum, mis. nginx)
+#   /mirror/<nama>/<path>.sha256   "<sha256>  <file>" untuk win_get_url checksum_url
+#   /choco/<path>                  feed NuGet v2 (community.chocolatey.org/api/v2)
+#   /stats                         statistik hit/miss dan byte upstream (JSON)
+#
+# Artifact dan .nupkg berversi tidak pernah berubah: disimpan permanen
+# (content-addressed per SHA-256). Metadata feed di-cache METADATA_TTL detik dan
+# URL upstream di dalamnya ditulis ulang ke cache ini. Tidak ada artifact yang
+# di-cache tanpa verifikasi: file checksum upstream, hash feed, atau sha256 yang di-pin.
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# nama: (base URL upstream, file checksum di direktori yang sama atau None)
+MIRRORS = {
+    "nginx": ("http://nginx.org", None),
+    "nodejs": ("https://nodejs.org", "SHASUMS256.txt"),
+}
+FEED_UPSTREAM = "https://community.chocolatey.org/api/v2"
+
+METADATA_TTL = 3600
+CHUNK_SIZE = 1024 * 1024
+
+# Download paket berversi di feed NuGet v2: package/<id>/<version>
+PACKAGE_PATH = re.compile(r"^package/([^/]+)/([^/?]+)$")
+FEED_ENTRY = re.compile(r"<entry\b.*?</entry>", re.S)
+FEED_FIELD = r"<d:{0}\b[^>]*>([^<]*)</d:{0}>"
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UpstreamError(Exception):
+    """Upstream gagal / checksum tidak cocok; status = kode HTTP untuk client"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_range(header, size):
+    """Header Range (satu range) -> (start, end) inklusif, None = seluruh file.
+
+    ValueError kalau range tidak bisa dipenuhi (416).
+    """
+    if not header:
+        return None
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None  # Format lain / multi-range: kirim seluruh file
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def parse_package_hashes(xml):
+    """{(id, versi): (algoritma, hash base64)} dari entry feed NuGet v2"""
+    hashes = {}
+    for entry in FEED_ENTRY.findall(xml):
+        fields = {}
+        for name in ("Id", "Version", "PackageHash", "PackageHashAlgorithm"):
+            match = re.search(FEED_FIELD.format(name), entry)
+            fields[name] = match.group(1).strip() if match else ""
+        if not fields["Id"]:
+            # Beberapa feed hanya menaruh Id di <title>
+            title = re.search(r"<title\b[^>]*>([^<]*)</title>", entry)
+            fields["Id"] = title.group(1).strip() if title else ""
+        if fields["Id"] and fields["Version"] and fields["PackageHash"]:
+            algorithm = (fields["PackageHashAlgorithm"] or "SHA512").lower()
+            hashes[(fields["Id"].lower(), fields["Version"].lower())] = (algorithm, fields["PackageHash"])
+    return hashes
+
+
+class ArtifactCache:
+    """Store content-addressed + index path -> blob, dengan single-flight per path.
+
+    PC yang meminta artifact yang sama bersamaan menunggu satu download upstream,
+    jadi satu rollout ke N PC hanya menarik setiap artifact sekali.
+    """
+
+    def __init__(self, root, mirrors=None, feed_upstream=FEED_UPSTREAM, metadata_ttl=METADATA_TTL, timeout=60):
+        self.root = root
+        self.mirrors = MIRRORS if mirrors is None else mirrors
+        self.feed_upstream = feed_upstream.rstrip("/")
+        self.metadata_ttl = metadata_ttl
+        self.timeout = timeout
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(root, "tmp"), exist_ok=True)
+
+        self._index_path = os.path.join(root, "index.json")
+        try:
+            with open(self._index_path) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        self.package_hashes = {}
+        self.stats = {"hits": 0, "misses": 0, "upstream_requests": 0, "upstream_bytes": 0,
+                      "served_bytes": 0, "verify_failures": 0}
+        self._lock = threading.Lock()
+        self._key_locks = {}  # key -> [lock, jumlah request yang memakai]
+
+    # ---------- Store ----------
+    def blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def _save_index(self):
+        tmp = f"{self._index_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, separators=(",", ":"))
+        os.replace(tmp, self._index_path)
+
+    @contextlib.contextmanager
+    def _key_lock(self, key):
+        """Lock single-flight per key; dihapus setelah request terakhir untuk key selesai"""
+        with self._lock:
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if not slot[1]:
+                    del self._key_locks[key]
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.stats[name] += value
+
+    def _fresh(self, entry):
+        return (entry is not None and os.path.exists(self.blob_path(entry["sha256"]))
+                and (entry.get("expires") is None or entry["expires"] > time.time()))
+
+    def get(self, key, url, immutable=True, verify=None):
+        """Entry index untuk key; download dari url kalau belum ada / kadaluarsa.
+
+        verify(hashes) dipanggil dengan {algoritma: hasher} setelah download dan
+        harus raise UpstreamError kalau checksum tidak cocok.
+        """
+        entry = self.index.get(key)
+        if self._fresh(entry):
+            self._count("hits")
+            return entry
+
+        with self._key_lock(key):
+            # Request lain mungkin sudah selesai download selama kita menunggu
+            entry = self.index.get(key)
+            if self._fresh(entry):
+                self._count("hits")
+                return entry
+            self._count("misses")
+            try:
+                entry = self._fetch(url, immutable, verify)
+            except UpstreamError:
+                # Uplink putus: metadata lama lebih baik daripada gagal
+                stale = self.index.get(key)
+                if stale is not None and os.path.exists(self.blob_path(stale["sha256"])):
+                    return stale
+                raise
+            with self._lock:
+                self.index[key] = entry
+                self._save_index()
+            return entry
+
+    def _fetch(self, url, immutable, verify):
+        self._count("upstream_requests")
+        request = urllib.request.Request(url, headers={"User-Agent": "lab-artifact-cache"})
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            raise UpstreamError(404 if e.code == 404 else 502, f"upstream {url}: HTTP {e.code}")
+        except (urllib.error.URLError, OSError) as e:
+            raise UpstreamError(502, f"upstream {url}: {e}")
+
+        hashes = {"sha256": hashlib.sha256(), "sha512": hashlib.sha512()}
+        tmp = os.path.join(self.root, "tmp", f"{threading.get_ident()}.part")
+        size = 0
+        try:
+            with response, open(tmp, "wb") as f:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    for hasher in hashes.values():
+                        hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            self._count("upstream_bytes", size)
+            if verify:
+                verify(hashes)
+            digest = hashes["sha256"].hexdigest()
+            path = self.blob_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+        except UpstreamError:
+            self._count("verify_failures")
+            raise
+        except OSError as e:
+            raise UpstreamError(502, f"upstream {url}: {e}")
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        return {
+            "sha256": digest,
+            "size": size,
+            "content_type": response.headers.get("Content-Type", "application/octet-stream"),
+            "fetched": int(time.time()),
+            "expires": None if immutable else time.time() + self.metadata_ttl,
+            "verified": verify is not None,
+        }
+
+    def read(self, entry):
+        with open(self.blob_path(entry["sha256"]), "rb") as f:
+            return f.read()
+
+    # ---------- Mirror artifact ----------
+    def mirror(self, name, path, expected=None):
+        """Artifact /mirror/<name>/<path>, diverifikasi file checksum upstream dan/atau
+        `expected` (sha256 yang di-pin di vars playbook).
+
+        Mirror tanpa file checksum (nginx.org hanya punya tanda tangan PGP) tidak pernah
+        mempercayai download pertama: tanpa pin hanya entry yang dulu sudah diverifikasi dilayani.
+        """
+        if name not in self.mirrors:
+            raise UpstreamError(404, f"mirror tidak dikenal: {name}")
+        base, checksum_file = self.mirrors[name]
+        url = f"{base}/{path}"
+        key = f"mirror/{name}/{path}"
+
+        verify = None
+        directory, filename = os.path.split(path)
+        if checksum_file and filename != checksum_file:
+            sums_path = f"{directory}/{checksum_file}" if directory else checksum_file
+            sums = self.read(self.mirror(name, sums_path)).decode("utf-8", "replace")
+            expected = None
+            for line in sums.splitlines():
+                parts = line.split()
+                if len(parts) == 2 and parts[1].lstrip("*") == filename:
+                    expected = parts[0].lower()
+            if expected is None:
+                raise UpstreamError(502, f"{filename} tidak ada di {checksum_file}")
+
+            def verify(hashes, expected=expected):
+                if hashes["sha256"].hexdigest() != expected:
+                    raise UpstreamError(502, f"checksum {filename} tidak cocok dengan {checksum_file}")
+
+        if expected:
+            expected = expected.lower()
+            if not SHA256_HEX.match(expected):
+                raise UpstreamError(400, f"sha256 pin tidak valid: {expected}")
+            upstream_verify = verify
+
+            def verify(hashes, expected=expected):
+                if hashes["sha256"].hexdigest() != expected:
+                    raise UpstreamError(502, f"checksum {filename} tidak cocok dengan sha256 yang di-pin")
+                if upstream_verify:
+                    upstream_verify(hashes)
+
+            # Blob dengan hash lain (mis. di-cache sebelum pin) tidak pernah dilayani untuk pin ini
+            with self._lock:
+                entry = self.index.get(key)
+                if entry is not None and entry["sha256"] != expected:
+                    del self.index[key]
+                    self._save_index()
+        elif checksum_file is None:
+            entry = self.index.get(key)
+            if not (entry and entry.get("verified") and self._fresh(entry)):
+                raise UpstreamError(403, f"mirror {name} tanpa file checksum: pin sha256 ({filename}?sha256=<hex>)")
+
+        return self.get(key, url, immutable=True, verify=verify)
+
+    # ---------- Feed NuGet v2 / Chocolatey ----------
+    def feed(self, path_query):
+        """(entry, is_metadata) untuk /choco/<path_query>"""
+        url = f"{self.feed_upstream}/{path_query}"
+        match = PACKAGE_PATH.match(path_query)
+        if match:
+            package_id, version = match.group(1).lower(), match.group(2).lower()
+            verify = self._package_verifier(package_id, version)
+            return self.get(f"choco/package/{package_id}/{version}", url, immutable=True, verify=verify), False
+
+        entry = self.get(f"choco/{path_query}", url, immutable=False)
+        if "xml" in entry["content_type"] or "atom" in entry["content_type"]:
+            found = parse_package_hashes(self.read(entry).decode("utf-8", "replace"))
+            with self._lock:
+                self.package_hashes.update(found)
+        return entry, True
+
+    def _package_verifier(self, package_id, version):
+        known = self.package_hashes.get((package_id, version))
+        if known is None:
+            # Download tanpa query metadata sebelumnya: ambil hash dari feed dulu
+            self.feed(f"Packages(Id='{package_id}',Version='{version}')")
+            known = self.package_hashes.get((package_id, version))
+        if known is None:
+            raise UpstreamError(502, f"hash paket {package_id} {version} tidak ada di feed")
+        algorithm, expected = known
+
+        def verify(hashes):
+            hasher = hashes.get(algorithm)
+            if hasher is None or base64.b64encode(hasher.digest()).decode() != expected:
+                raise UpstreamError(502, f"hash paket {package_id} {version} tidak cocok")
+        return verify
+
+    def rewrite_feed(self, data, base_url):
+        """URL upstream di metadata feed -> URL cache, supaya .nupkg juga lewat cache"""
+        text = data.decode("utf-8")
+        upstream = self.feed_upstream
+        for variant in (upstream, upstream.replace("https://", "http://", 1)):
+            text = text.replace(variant, base_url)
+        return text.encode("utf-8")
+
+
+# ============================
+# HTTP SERVER
+# ============================
+class CacheHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "LabArtifactCache/1.0"
+    cache = None  # Diisi make_server
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_HEAD(self):
+        self.handle_request(head=True)
+
+    def do_GET(self):
+        self.handle_request(head=False)
+
+    def handle_request(self, head):
+        path = urlsplit(self.path)
+        parts = unquote(path.path).lstrip("/").split("/", 2)
+        try:
+            if parts[0] == "stats":
+                self.send_bytes(json.dumps(self.cache.stats).encode(), "application/json", head)
+            elif parts[0] == "mirror" and len(parts) == 3 and ".." not in parts[2].split("/"):
+                expected = parse_qs(path.query).get("sha256", [None])[0]
+                if parts[2].endswith(".sha256"):
+                    artifact = parts[2][:-len(".sha256")]
+                    entry = self.cache.mirror(parts[1], artifact, expected)
+                    line = f"{entry['sha256']}  {os.path.basename(artifact)}\n"
+                    self.send_bytes(line.encode(), "text/plain", head)
+                else:
+                    self.send_entry(self.cache.mirror(parts[1], parts[2], expected), head)
+            elif parts[0] == "choco":
+                rest = self.path.split("/choco", 1)[1].lstrip("/")
+                entry, is_metadata = self.cache.feed(rest)
+                if is_metadata:
+                    base_url = f"http://{self.headers.get('Host', self.server.server_address[0])}/choco"
+                    body = self.cache.rewrite_feed(self.cache.read(entry), base_url)
+                    self.send_bytes(body, entry["content_type"], head)
+                else:
+                    self.send_entry(entry, head)
+            else:
+                self.send_error(404)
+        except UpstreamError as e:
+            self.send_error(e.status, str(e))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_bytes(self, body, content_type, head):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+            self.cache._count("served_bytes", len(body))
+
+    def send_entry(self, entry, head):
+        size = entry["size"]
+        try:
+            byte_range = parse_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1 if size else 0
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", entry["content_type"])
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", f'"{entry["sha256"]}"')
+        self.send_header("X-Checksum-Sha256", entry["sha256"])
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+
+        with open(self.cache.blob_path(entry["sha256"]), "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+        self.cache._count("served_bytes", length - remaining)
+
+
+def make_server(cache, host="0.0.0.0", port=8081, verbose=False):
+    handler = type("BoundCacheHandler", (CacheHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def serve_in_thread(root, host="0.0.0.0", port=8081):
+    """Jalankan cache di thread daemon (dipakai bot); return server (shutdown() untuk berhenti)"""
+    server = make_server(ArtifactCache(root), host, port)
+    threading.Thread(target=server.serve_forever, name="artifact-cache", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Artifact cache + feed Chocolatey untuk PC lab")
+    parser.add_argument("--root", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                       "data", "artifacts"))
+    parser.add_argument("--bind", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--verbose", action="store_true")
+    options = parser.parse_args()
+
+    server = make_server(ArtifactCache(options.root), options.bind, options.port, options.verbose)
+    print(f"📦 Artifact cache di http://{options.bind}:{options.port} (store: {options.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+        sys.exit(0)
@@ -0,0 +1,243 @@
+# File: scripts/artifact_cache_benchmark.py
+# ============================
+# BENCHMARK: ROLLOUT N PC LANGSUNG KE UPSTREAM vs LEWAT artifact_cache
+# ============================
+# Upstream tiruan lokal melayani nginx zip, Node.js MSI (+ SHASUMS256.txt) dan
+# feed NuGet v2 mini (FindPackagesById + package/<id>/<versi>), lalu menghitung
+# total byte yang keluar dari upstream. Setiap "PC" men-download installer dan
+# semua paket Chocolatey seperti playbook; sebagian download nginx diputus di
+# tengah lalu dilanjutkan dengan Range. nginx.org tidak punya file checksum: download
+# nginx membawa sha256 yang di-pin (?sha256=, seperti nginx_sha256 di install_nginx.yml).
+#
+#   python scripts/artifact_cache_benchmark.py [jumlah_pc] [concurrency]
+import base64
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from artifact_cache import ArtifactCache, make_server, parse_range
+
+NGINX = "download/nginx-1.26.2.zip"
+NODE = "dist/v20.11.1/node-v20.11.1-x64.msi"
+PACKAGES = {"googlechrome": "131.0.6778.86", "vscode": "1.95.3", "python": "3.13.0",
+            "notepadplusplus": "8.7.1", "git": "2.47.0"}
+
+
+# ============================
+# UPSTREAM TIRUAN
+# ============================
+class Upstream:
+    """Isi file upstream + penghitung byte yang dikirim"""
+
+    def __init__(self, seed=1, installer_mb=(2, 26), nupkg_kb=200):
+        rng = random.Random(seed)
+        self.files = {
+            f"/nginx/{NGINX}": rng.randbytes(installer_mb[0] * 1048576),
+            f"/nodejs/{NODE}": rng.randbytes(installer_mb[1] * 1048576),
+        }
+        node = self.files[f"/nodejs/{NODE}"]
+        self.files["/nodejs/dist/v20.11.1/SHASUMS256.txt"] = (
+            f"{hashlib.sha256(b'other').hexdigest()}  node-v20.11.1.pkg\n"
+            f"{hashlib.sha256(node).hexdigest()}  node-v20.11.1-x64.msi\n").encode()
+        for package_id, version in PACKAGES.items():
+            self.files[f"/feed/package/{package_id}/{version}"] = rng.randbytes(nupkg_kb * 1024)
+        self.bytes_sent = 0
+        self.requests = 0
+        self.base_url = None
+        self._lock = threading.Lock()
+
+    def feed_xml(self, package_id):
+        version = PACKAGES[package_id]
+        nupkg = self.files[f"/feed/package/{package_id}/{version}"]
+        digest = base64.b64encode(hashlib.sha512(nupkg).digest()).decode()
+        base = f"{self.base_url}/feed"
+        return (f'<?xml version="1.0" encoding="utf-8"?>\n'
+                f'<feed xml:base="{base}/" xmlns="http://www.w3.org/2005/Atom" '
+                f'xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices" '
+                f'xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata">\n'
+                f'<entry><id>{base}/Packages(Id=\'{package_id}\',Version=\'{version}\')</id>'
+                f'<title type="text">{package_id}</title>'
+                f'<content type="application/zip" src="{base}/package/{package_id}/{version}" />'
+                f'<m:properties><d:Version>{version}</d:Version>'
+                f'<d:PackageHash>{digest}</d:PackageHash>'
+                f'<d:PackageHashAlgorithm>SHA512</d:PackageHashAlgorithm></m:properties>'
+                f'</entry>\n</feed>\n').encode()
+
+    def body(self, path, query):
+        if path in ("/feed/FindPackagesById()", "/feed/Packages()"):
+            package_id = query.split("id=", 1)[-1].split("&")[0].strip("'%27").lower()
+            return self.feed_xml(package_id) if package_id in PACKAGES else None, "application/atom+xml"
+        if path.startswith("/feed/Packages(Id="):
+            package_id = path.split("'")[1]
+            return self.feed_xml(package_id) if package_id in PACKAGES else None, "application/atom+xml"
+        return self.files.get(path), "application/octet-stream"
+
+    def count(self, size):
+        with self._lock:
+            self.bytes_sent += size
+            self.requests += 1
+
+
+def start_upstream(upstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            body, content_type = upstream.body(url.path, url.query)
+            if body is None:
+                self.send_error(404)
+                return
+            # Upstream asli (nginx.org, nodejs.org) juga mendukung Range
+            byte_range = parse_range(self.headers.get("Range"), len(body))
+            if byte_range:
+                body = body[byte_range[0]:byte_range[1] + 1]
+            self.send_response(206 if byte_range else 200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            upstream.count(len(body))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    upstream.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    return server
+
+
+# ============================
+# CLIENT "PC LAB"
+# ============================
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return response.status, response.headers, response.read()
+
+
+def download_resumable(url, cut_at=None):
+    """Download penuh, atau putus di cut_at lalu lanjut dengan Range (seperti BITS)"""
+    if cut_at is None:
+        return fetch(url)[2]
+    with urllib.request.urlopen(url, timeout=120) as response:
+        head = response.read(cut_at)
+    status, headers, tail = fetch(url, {"Range": f"bytes={len(head)}-"})
+    assert status == 206, f"Range tidak didukung: {status}"
+    return head + tail
+
+
+def host_rollout(base, feed_base, resume, pin=""):
+    """Satu PC: installer nginx + Node.js, lalu metadata + nupkg semua paket choco"""
+    data = {}
+    data["nginx"] = download_resumable(f"{base}/{NGINX}{pin}", cut_at=300_000 if resume else None)
+    data["node"] = fetch(f"{base.replace('/nginx', '/nodejs')}/{NODE}")[2]
+    for package_id in PACKAGES:
+        xml = fetch(f"{feed_base}/FindPackagesById()?id='{package_id}'")[2].decode()
+        src = xml.split('src="', 1)[1].split('"', 1)[0]
+        assert src.startswith(feed_base), f"URL paket tidak lewat feed yang dipakai: {src}"
+        data[package_id] = fetch(src)[2]
+    return data
+
+
+def rollout(upstream, base, feed_base, hosts, concurrency):
+    pin = f"?sha256={hashlib.sha256(upstream.files[f'/nginx/{NGINX}']).hexdigest()}"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda i: host_rollout(base, feed_base, resume=i % 5 == 0, pin=pin),
+                                range(hosts)))
+    elapsed = time.perf_counter() - start
+
+    # Semua PC harus menerima byte yang identik dengan upstream
+    expected = {"nginx": upstream.files[f"/nginx/{NGINX}"], "node": upstream.files[f"/nodejs/{NODE}"]}
+    for package_id, version in PACKAGES.items():
+        expected[package_id] = upstream.files[f"/feed/package/{package_id}/{version}"]
+    corrupt = sum(1 for data in results for name, body in data.items() if body != expected[name])
+    return elapsed, corrupt
+
+
+def run_benchmark(hosts=40, concurrency=10):
+    upstream = Upstream()
+    upstream_server = start_upstream(upstream)
+    root = tempfile.mkdtemp()
+    mb = 1048576
+    per_host = sum(len(body) for path, body in upstream.files.items() if not path.endswith(".txt"))
+
+    # 1. Langsung ke upstream (cara playbook lama)
+    direct_time, direct_corrupt = rollout(upstream, f"{upstream.base_url}/nginx", f"{upstream.base_url}/feed",
+                                          hosts, concurrency)
+    direct_bytes, direct_requests = upstream.bytes_sent, upstream.requests
+
+    # 2. Lewat artifact cache
+    upstream.bytes_sent = upstream.requests = 0
+    cache = ArtifactCache(root, mirrors={"nginx": (f"{upstream.base_url}/nginx", None),
+                                         "nodejs": (f"{upstream.base_url}/nodejs", "SHASUMS256.txt")},
+                          feed_upstream=f"{upstream.base_url}/feed")
+    server = make_server(cache, "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache_url = f"http://127.0.0.1:{server.server_address[1]}"
+    cache_time, cache_corrupt = rollout(upstream, f"{cache_url}/mirror/nginx", f"{cache_url}/choco",
+                                        hosts, concurrency)
+    cache_bytes, cache_requests = upstream.bytes_sent, upstream.requests
+    locks_left = len(cache._key_locks)
+
+    # 3. Checksum: installer yang berubah di upstream harus ditolak, bukan di-cache
+    upstream.files[f"/nodejs/{NODE}"] = b"tampered" + upstream.files[f"/nodejs/{NODE}"][8:]
+    cache.index.pop(f"mirror/nodejs/{NODE}")
+    try:
+        fetch(f"{cache_url}/mirror/nodejs/{NODE}")
+        rejected = False
+    except urllib.error.HTTPError as e:
+        rejected = e.code == 502
+    sha_line = fetch(f"{cache_url}/mirror/nginx/{NGINX}.sha256")[2].decode().strip()
+
+    # 4. Mirror tanpa file checksum: download pertama tanpa pin ditolak, pin yang tidak cocok
+    #    (mirror diubah) ditolak dan tidak masuk cache
+    tampered = "download/nginx-1.27.0.zip"
+    original = upstream.files[f"/nginx/{NGINX}"]
+    upstream.files[f"/nginx/{tampered}"] = b"tampered" + original[8:]
+    pin_codes = []
+    for query in ("", f"?sha256={hashlib.sha256(original).hexdigest()}"):
+        try:
+            fetch(f"{cache_url}/mirror/nginx/{tampered}{query}")
+            pin_codes.append(200)
+        except urllib.error.HTTPError as e:
+            pin_codes.append(e.code)
+    pinned = pin_codes == [403, 502] and f"mirror/nginx/{tampered}" not in cache.index
+
+    print(f"Rollout        : {hosts} PC, concurrency {concurrency}, {per_host / mb:.1f} MB per PC "
+          f"(nginx + Node.js MSI + {len(PACKAGES)} nupkg), 1 dari 5 download nginx di-resume")
+    print(f"Langsung       : {direct_bytes / mb:8.1f} MB dari upstream, {direct_requests} request, "
+          f"{direct_time:.2f}s, {direct_corrupt} file rusak")
+    print(f"Lewat cache    : {cache_bytes / mb:8.1f} MB dari upstream, {cache_requests} request, "
+          f"{cache_time:.2f}s, {cache_corrupt} file rusak")
+    print(f"Hemat uplink   : {direct_bytes / max(cache_bytes, 1):.0f}x "
+          f"(hit {cache.stats['hits']}, miss {cache.stats['misses']}, "
+          f"dilayani {cache.stats['served_bytes'] / mb:.1f} MB)")
+    print(f"Checksum       : MSI yang diubah upstream {'ditolak' if rejected else 'TIDAK ditolak'}, "
+          f"verify gagal {cache.stats['verify_failures']}, {sha_line[:16]}... untuk checksum_url")
+    print(f"Pin nginx      : tanpa pin HTTP {pin_codes[0]}, pin tidak cocok HTTP {pin_codes[1]} "
+          f"({'ditolak, tidak di-cache' if pinned else 'TIDAK ditolak'}); lock key tersisa {locks_left}")
+
+    server.shutdown()
+    upstream_server.shutdown()
+    shutil.rmtree(root)
+    ok = (direct_corrupt, cache_corrupt, rejected, pinned, locks_left) == (0, 0, True, True, 0)
+    return 0 if ok and cache_bytes < per_host * 1.1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+                           int(sys.argv[2]) if len(sys.argv) > 2 else 10))
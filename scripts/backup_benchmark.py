@@ -0,0 +1,131 @@
+# File: scripts/backup_benchmark.py
+# ============================
+# BENCHMARK: BACKUP LAMA (FULL COPY + TAR.GZ) vs lab_snapshot
+# ============================
+# Tree direktori sintetis di-backup dua kali (run kedua setelah ~2% file diubah).
+# Cara lama meniru backup_recovery.yml sebelumnya: rsync / ke direktori snapshot
+# baru tiap run + tar.gz penuh setiap home user + salinan config bertimestamp.
+import os
+import random
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'library'))
+from lab_snapshot import SnapshotStore  # noqa: E402
+
+WORDS = ("server config lab network user home ansible backup data log "
+         "install nginx node windows linux report service").split()
+
+
+def generate_tree(root, files=3000, seed=1):
+    """etc/ (config kecil), home/<user>/ (dokumen + binary), var/log/ (log besar)"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        kind = i % 10
+        if kind < 4:
+            path = os.path.join(root, 'etc', f'app{i % 40}', f'conf{i}.cfg')
+            data = "\n".join(f"{rng.choice(WORDS)} = {rng.randint(0, 999)}" for _ in range(40)).encode()
+        elif kind < 8:
+            path = os.path.join(root, 'home', f'user{i % 5}', f'doc{i}.txt')
+            data = " ".join(rng.choice(WORDS) for _ in range(rng.randint(200, 4000))).encode()
+        elif kind < 9:
+            path = os.path.join(root, 'home', f'user{i % 5}', 'bin', f'blob{i}.bin')
+            data = rng.randbytes(rng.randint(10_000, 200_000))
+        else:
+            path = os.path.join(root, 'var', 'log', f'app{i}.log')
+            data = "\n".join(f"2025-01-01 INFO {rng.choice(WORDS)} {n}" for n in range(5000)).encode()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def modify_tree(paths, fraction=0.02, seed=2):
+    rng = random.Random(seed)
+    for path in rng.sample(paths, int(len(paths) * fraction)):
+        with open(path, 'ab') as f:
+            f.write(b"\nchanged %d\n" % rng.randint(0, 10**6))
+
+
+def disk_usage(root):
+    """Byte yang benar-benar dipakai (blok disk, hard link dihitung sekali)"""
+    seen = set()
+    total = 0
+    for base, dirs, names in os.walk(root):
+        for name in names:
+            st = os.lstat(os.path.join(base, name))
+            if st.st_ino not in seen:
+                seen.add(st.st_ino)
+                total += st.st_blocks * 512
+    return total
+
+
+def old_backup(source, backup_dir, run):
+    """Full copy ke snapshot/<run>/ + tar.gz tiap home + config bertimestamp"""
+    shutil.copytree(source, os.path.join(backup_dir, 'snapshot', f'host_{run}'), symlinks=True)
+    home = os.path.join(source, 'home')
+    os.makedirs(os.path.join(backup_dir, 'user_data'), exist_ok=True)
+    for user in sorted(os.listdir(home)):
+        with tarfile.open(os.path.join(backup_dir, 'user_data', f'host_{run}_{user}.tar.gz'), 'w:gz') as tar:
+            tar.add(os.path.join(home, user), arcname=user)
+    os.makedirs(os.path.join(backup_dir, 'configs'), exist_ok=True)
+    for app in sorted(os.listdir(os.path.join(source, 'etc')))[:3]:
+        shutil.copytree(os.path.join(source, 'etc', app), os.path.join(backup_dir, 'configs', f'host_{run}_{app}'))
+
+
+def run_benchmark(files=3000, workers=4):
+    workdir = tempfile.mkdtemp()
+    source = os.path.join(workdir, 'source')
+    paths = generate_tree(source, files)
+    size = sum(os.path.getsize(p) for p in paths)
+
+    results = {}
+    for name in ('old', 'new'):
+        # Tree yang sama untuk kedua cara
+        shutil.rmtree(source)
+        generate_tree(source, files)
+        backup_dir = os.path.join(workdir, f'backup_{name}')
+        store = SnapshotStore(os.path.join(backup_dir, 'store'), 'host', workers=workers)
+        timings, usage = [], []
+        for run in range(2):
+            if run == 1:
+                modify_tree(paths)
+            start = time.perf_counter()
+            if name == 'old':
+                old_backup(source, backup_dir, run)
+            else:
+                store.create([source])
+            timings.append(time.perf_counter() - start)
+            usage.append(disk_usage(backup_dir))
+        results[name] = (timings, usage)
+
+    # Restore latest dari manifest dan cocokkan dengan source
+    restore_root = os.path.join(workdir, 'restore')
+    start = time.perf_counter()
+    snapshot_id, stats = store.restore('latest', [source], restore_root)
+    restore_time = time.perf_counter() - start
+    mismatch = 0
+    for path in paths:
+        with open(path, 'rb') as a, open(os.path.join(restore_root, path.lstrip('/')), 'rb') as b:
+            mismatch += a.read() != b.read()
+
+    mb = 1048576
+    print(f"Tree           : {files} file, {size / mb:.1f} MB (run 2: {int(files * 0.02)} file diubah)")
+    for name, label in (('old', 'Lama (copy+tgz)'), ('new', 'lab_snapshot')):
+        timings, usage = results[name]
+        print(f"{label:15}: run1 {timings[0]:.2f}s, run2 {timings[1]:.2f}s | "
+              f"disk setelah run1 {usage[0] / mb:.1f} MB, run2 {usage[1] / mb:.1f} MB "
+              f"(+{(usage[1] - usage[0]) / mb:.1f} MB)")
+    print(f"Restore latest : {snapshot_id} {stats['files']} file dalam {restore_time:.2f}s, {mismatch} beda")
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3000,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else 4)
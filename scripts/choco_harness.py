@@ -0,0 +1,249 @@
+# File: scripts/choco_harness.py
+# ============================
+# HARNESS: lab_choco MELAWAN FAKE `choco`
+# ============================
+# Fake choco menyimpan paket "terpasang" di file JSON dan mencatat setiap
+# invocation, jadi bisa dicek bahwa lab_choco hanya memanggil satu
+# `choco install` per run. Module dijalankan langsung lewat pwsh
+# (Ansible.Basic di-load dari ansible-core yang terinstall).
+#
+#   python scripts/choco_harness.py              # semua skenario
+#   python scripts/choco_harness.py --fake-choco list --limit-output
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE_PATH = os.path.join(PROJECT_ROOT, 'library', 'lab_choco.ps1')
+
+# Paket sama dengan software_list di install_common_software_fixed.yml
+SOFTWARE = [
+    {"name": "Google Chrome", "package": "googlechrome"},
+    {"name": "Visual Studio Code", "package": "vscode"},
+    {"name": "Python 3", "package": "python"},
+    {"name": "Notepad++", "package": "notepadplusplus"},
+    {"name": "Git", "package": "git"},
+]
+
+# Versi "terbaru" di feed palsu
+FEED = {"googlechrome": "131.0.6778.86", "vscode": "1.95.3", "python": "3.13.0",
+        "notepadplusplus": "8.7.1", "git": "2.47.0", "7zip": "24.8.0"}
+
+
+# ============================
+# FAKE CHOCO
+# ============================
+def fake_choco(argv):
+    """Subset perilaku choco: --version, list, install <id...|file.config>"""
+    state_path = os.environ["FAKE_CHOCO_STATE"]
+    with open(state_path) as f:
+        state = json.load(f)
+    with open(os.environ["FAKE_CHOCO_LOG"], "a") as f:
+        f.write(json.dumps(argv) + "\n")
+
+    if not argv or argv[0] == "--version":
+        print("2.2.2")
+        return 0
+
+    command, rest = argv[0], argv[1:]
+    if command == "list":
+        for name, version in sorted(state["installed"].items()):
+            print(f"{name}|{version}")
+        return 0
+
+    if command != "install":
+        print(f"Perintah tidak didukung fake choco: {command}")
+        return 1
+
+    # Target: paket dari argumen atau dari packages.config
+    requested = []
+    for arg in rest:
+        if arg.startswith("-"):
+            continue
+        if arg.endswith(".config"):
+            for node in ET.parse(arg).getroot().iter("package"):
+                requested.append((node.get("id"), node.get("version"), node.get("force") == "true"))
+        elif not re.fullmatch(r"\d+", arg):
+            requested.append((arg, None, "--force" in rest))
+
+    failures = []
+    for name, version, force in requested:
+        current = state["installed"].get(name)
+        if name in state.get("fail", []) or name not in FEED:
+            print(f"{name} not installed. The package was not found with the source(s) listed.")
+            failures.append(f" - {name} (exited 1) - {name} not installed. Error while running install.")
+            continue
+        if current and not force and (version is None or version == current):
+            print(f"{name} v{current} already installed.")
+            continue
+        state["installed"][name] = version or FEED[name]
+        print(f"{name} v{state['installed'][name]} installed.")
+
+    with open(state_path, "w") as f:
+        json.dump(state, f)
+
+    print(f"Chocolatey installed {len(requested) - len(failures)}/{len(requested)} packages.")
+    if failures:
+        print("Failures")
+        for line in failures:
+            print(line)
+        return 1
+    return 0
+
+
+def write_fake_choco(workdir):
+    """Executable `choco` (sh) / `choco.cmd` yang memanggil harness ini"""
+    script = os.path.abspath(__file__)
+    if os.name == "nt":
+        path = os.path.join(workdir, "choco.cmd")
+        with open(path, "w") as f:
+            f.write(f'@"{sys.executable}" "{script}" --fake-choco %*\r\n')
+    else:
+        path = os.path.join(workdir, "choco")
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" --fake-choco "$@"\n')
+        os.chmod(path, 0o755)
+    return path
+
+
+# ============================
+# MENJALANKAN MODULE LEWAT PWSH
+# ============================
+def find_pwsh():
+    return shutil.which("pwsh") or shutil.which("powershell")
+
+
+def module_utils_paths():
+    import ansible.module_utils
+    base = os.path.dirname(ansible.module_utils.__file__)
+    return (os.path.join(base, "powershell", "Ansible.ModuleUtils.AddType.psm1"),
+            os.path.join(base, "csharp", "Ansible.Basic.cs"))
+
+
+def ps_quote(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def run_module(pwsh, workdir, args, check_mode=False):
+    module_args = dict(args)
+    if check_mode:
+        module_args["_ansible_check_mode"] = True
+    args_path = os.path.join(workdir, "args.json")
+    with open(args_path, "w") as f:
+        json.dump({"ANSIBLE_MODULE_ARGS": module_args}, f)
+
+    add_type, basic = module_utils_paths()
+    bootstrap = os.path.join(workdir, "bootstrap.ps1")
+    with open(bootstrap, "w") as f:
+        f.write("$ErrorActionPreference = 'Stop'\n"
+                f"Import-Module {ps_quote(add_type)}\n"
+                f"Add-CSharpType -References @(Get-Content -Raw -LiteralPath {ps_quote(basic)})\n"
+                f"& {ps_quote(MODULE_PATH)} {ps_quote(args_path)}\n")
+
+    proc = subprocess.run([pwsh, "-NoProfile", "-NonInteractive", "-File", bootstrap],
+                          capture_output=True, text=True, timeout=300)
+    try:
+        return json.loads(proc.stdout[proc.stdout.index("{"):])
+    except ValueError:
+        raise RuntimeError(f"Output module bukan JSON (rc {proc.returncode}):\n{proc.stdout}\n{proc.stderr}")
+
+
+# ============================
+# SKENARIO
+# ============================
+def install_calls(log_path):
+    with open(log_path) as f:
+        calls = [json.loads(line) for line in f]
+    return sum(1 for argv in calls if argv and argv[0] == "install"), len(calls)
+
+
+def run_harness():
+    pwsh = find_pwsh()
+    if not pwsh:
+        print("pwsh tidak ditemukan: harness butuh PowerShell (pwsh) untuk menjalankan lab_choco.ps1")
+        return 2
+
+    workdir = tempfile.mkdtemp()
+    choco = write_fake_choco(workdir)
+    state_path = os.path.join(workdir, "state.json")
+    log_path = os.path.join(workdir, "calls.jsonl")
+    os.environ["FAKE_CHOCO_STATE"] = state_path
+    os.environ["FAKE_CHOCO_LOG"] = log_path
+
+    def reset(installed, fail=()):
+        with open(state_path, "w") as f:
+            json.dump({"installed": installed, "fail": list(fail)}, f)
+        open(log_path, "w").close()
+
+    failures = []
+
+    def check(label, condition):
+        print(f"  {'OK  ' if condition else 'GAGAL'} {label}")
+        if not condition:
+            failures.append(label)
+
+    # 1. PC baru: sebagian sudah ada, sisanya dipasang dalam satu install
+    print("Skenario 1: PC baru (git sudah terpasang)")
+    reset({"git": "2.47.0", "7zip": "24.8.0"})
+    result = run_module(pwsh, workdir, {"packages": SOFTWARE, "executable": choco})
+    packages = result.get("packages", {})
+    installs, calls = install_calls(log_path)
+    check("changed dan tidak gagal", result.get("changed") and not result.get("failed"))
+    check("satu choco install, tiga panggilan total", (installs, calls) == (1, 3))
+    check("git present, sisanya installed",
+          packages.get("git", {}).get("status") == "present"
+          and all(packages[p["package"]]["status"] == "installed" for p in SOFTWARE if p["package"] != "git"))
+    check("versi akhir dari feed", packages.get("vscode", {}).get("version") == FEED["vscode"])
+
+    # 2. Run ulang: idempotent, hanya satu `choco list`
+    print("Skenario 2: run ulang")
+    open(log_path, "w").close()
+    result = run_module(pwsh, workdir, {"packages": SOFTWARE, "executable": choco})
+    installs, calls = install_calls(log_path)
+    check("tidak changed", not result.get("changed"))
+    check("tanpa choco install, satu panggilan", (installs, calls) == (0, 1))
+    check("semua present", sorted(result.get("present", [])) == sorted(p["package"] for p in SOFTWARE))
+
+    # 3. Versi salah + paket gagal: tetap satu install, hasil per paket
+    print("Skenario 3: versi salah + paket gagal")
+    reset({"vscode": "1.95.3"}, fail=["brokenpkg"])
+    wanted = [{"package": "vscode", "version": "1.90.0"}, {"package": "7zip"}, {"package": "brokenpkg", "name": "Broken"}]
+    result = run_module(pwsh, workdir, {"packages": wanted, "executable": choco})
+    packages = result.get("packages", {})
+    installs, calls = install_calls(log_path)
+    check("module gagal", result.get("failed"))
+    check("satu choco install", installs == 1)
+    check("vscode updated ke 1.90.0",
+          packages.get("vscode", {}).get("status") == "updated" and packages["vscode"]["version"] == "1.90.0"
+          and packages["vscode"]["version_before"] == "1.95.3")
+    check("7zip installed", packages.get("7zip", {}).get("status") == "installed")
+    check("brokenpkg failed dengan pesan",
+          packages.get("brokenpkg", {}).get("status") == "failed" and "brokenpkg" in (packages["brokenpkg"]["msg"] or ""))
+    check("failed_packages", result.get("failed_packages") == ["brokenpkg"])
+
+    # 4. Check mode: rencana saja
+    print("Skenario 4: check mode")
+    reset({"python": "3.12.0"})
+    wanted = [{"package": "python", "version": "3.13.0"}, {"package": "git"}]
+    result = run_module(pwsh, workdir, {"packages": wanted, "executable": choco}, check_mode=True)
+    packages = result.get("packages", {})
+    installs, calls = install_calls(log_path)
+    check("changed tanpa install", result.get("changed") and installs == 0)
+    check("status wrong_version / missing",
+          packages.get("python", {}).get("status") == "wrong_version"
+          and packages.get("git", {}).get("status") == "missing")
+
+    shutil.rmtree(workdir)
+    print(f"\n{'Semua skenario lulus' if not failures else f'{len(failures)} cek gagal'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == "--fake-choco":
+        sys.exit(fake_choco(sys.argv[2:]))
+    sys.exit(run_harness())
@@ -0,0 +1,408 @@
+# File: scripts/compliance_engine.py
+# ============================
+# COMPLIANCE ENGINE (CONTROL NODE, EVALUASI DELTA)
+# ============================
+# Rule (allow/deny list paket, regex file config, state service) di-compile sekali.
+# Inventaris ringkas dari module lab_inventory di-ingest per host; snapshot host
+# sebelumnya disimpan di state_dir sehingga run berikutnya hanya mengevaluasi
+# paket yang ditambah/dihapus, file yang digest-nya berubah dan state service.
+# Hasilnya satu laporan gabungan untuk seluruh fleet.
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+MAX_HOST_VIOLATIONS = 10  # Violation per host yang dikirim balik ke playbook
+
+
+def compile_patterns(patterns):
+    """Nama persis -> set (O(1)); glob -> satu regex gabungan"""
+    exact = {p for p in patterns if not any(c in p for c in '*?[')}
+    globs = [fnmatch.translate(p) for p in patterns if p not in exact]
+    return exact, re.compile('|'.join(globs)) if globs else None
+
+
+class ComplianceRules:
+    """Rule yang sudah di-compile; `digest` berubah jika rule berubah"""
+
+    def __init__(self, rules):
+        self.allowed = rules.get('allowed_packages') or []
+        self.denied = rules.get('denied_packages') or []
+        self.allow_exact, self.allow_regex = compile_patterns(self.allowed)
+        self.deny_exact, self.deny_regex = compile_patterns(self.denied)
+
+        self.file_rules = {}     # path -> [(rule_id, regex, present, desc)]
+        self.service_rules = []  # [(rule_id, service, state, desc)]
+        for index, check in enumerate(rules.get('checks') or []):
+            desc = check.get('desc') or check.get('file') or check.get('service')
+            if check.get('file'):
+                self.file_rules.setdefault(check['file'], []).append(
+                    (str(index), re.compile(check['rule'], re.M), check.get('present', True), desc))
+            elif check.get('service'):
+                self.service_rules.append((str(index), check['service'], check.get('state', 'running'), desc))
+
+        canonical = json.dumps(rules, sort_keys=True, separators=(',', ':'))
+        self.digest = hashlib.sha1(canonical.encode()).hexdigest()
+
+    def package_violation(self, name):
+        if name in self.deny_exact or (self.deny_regex and self.deny_regex.match(name)):
+            return 'denied'
+        if not self.allowed:
+            return None
+        if name in self.allow_exact or (self.allow_regex and self.allow_regex.match(name)):
+            return None
+        return 'not-allowed'
+
+    def evaluate_file(self, path, content):
+        """{rule_id: (lulus, desc)}; content None = file tidak ada"""
+        results = {}
+        for rule_id, regex, present, desc in self.file_rules.get(path, ()):
+            found = content is not None and regex.search(content) is not None
+            results[rule_id] = [found == present, desc]
+        return results
+
+    def unreadable_file(self, path, reason):
+        """Isi file tidak tersedia (mis. > max_file_size): semua rule file ini dianggap gagal"""
+        return {rule_id: [False, f"{desc} ({path} {reason})"]
+                for rule_id, regex, present, desc in self.file_rules.get(path, ())}
+
+    def evaluate_services(self, services):
+        results = {}
+        for rule_id, service, state, desc in self.service_rules:
+            info = services.get(service) or {}
+            if state in ('enabled', 'disabled'):
+                ok = info.get('enabled') == state
+            elif state == 'running':
+                ok = info.get('active') == 'active'
+            elif state == 'stopped':
+                ok = info.get('active') in ('inactive', 'failed', 'not-found')
+            else:
+                ok = info.get('active') == state
+            results[rule_id] = [ok, desc]
+        return results
+
+
+class ComplianceEngine:
+    """Evaluasi compliance per host dengan snapshot di state_dir/hosts/<host>.json"""
+
+    def __init__(self, state_dir, rules):
+        self.state_dir = state_dir
+        self.rules = rules if isinstance(rules, ComplianceRules) else ComplianceRules(rules)
+        self.hosts_dir = os.path.join(state_dir, 'hosts')
+        self.known_dir = os.path.join(state_dir, 'known')
+        os.makedirs(self.hosts_dir, exist_ok=True)
+        os.makedirs(self.known_dir, exist_ok=True)
+        self.stats = {'hosts': 0, 'full': 0, 'delta': 0, 'unchanged': 0, 'stale': 0,
+                      'packages_evaluated': 0, 'files_evaluated': 0}
+
+    # ---------- State ----------
+    def _load(self, host):
+        try:
+            with open(os.path.join(self.hosts_dir, f'{host}.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, host, state):
+        path = os.path.join(self.hosts_dir, f'{host}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+
+        # Digest yang diteruskan ke lab_inventory run berikutnya (data sama tidak dikirim ulang)
+        known = {'packages': state['packages_digest'],
+                 'files': {path: info['digest'] for path, info in state['files'].items()
+                           if not info.get('too_large')}}
+        with open(os.path.join(self.known_dir, f'{host}.json'), 'w') as f:
+            json.dump(known, f)
+
+    def _forget(self, host):
+        # Snapshot hilang/rusak: host harus mengirim inventaris lengkap di run berikutnya
+        for directory in (self.hosts_dir, self.known_dir):
+            try:
+                os.remove(os.path.join(directory, f'{host}.json'))
+            except OSError:
+                pass
+
+    # ---------- Ingest ----------
+    def ingest(self, host, inventory):
+        """Evaluasi satu host; return {'compliant', 'violations', 'mode'}"""
+        self.stats['hosts'] += 1
+        rules = self.rules
+        previous = self._load(host)
+        same_rules = previous is not None and previous.get('rules_digest') == rules.digest
+        dirty = not same_rules
+
+        # 1. Paket
+        packages = inventory.get('packages')
+        if packages is None:
+            if previous is None or previous.get('packages_digest') != inventory.get('packages_digest'):
+                self._forget(host)
+                self.stats['stale'] += 1
+                return {'compliant': None, 'violations': ['Snapshot tidak lengkap, dievaluasi ulang di run berikutnya'],
+                        'mode': 'stale'}
+            packages = previous['packages']
+            violations = previous['package_violations'] if same_rules else None
+        else:
+            dirty = True
+            violations = None
+            if same_rules:
+                # Delta: hanya paket yang ditambah yang perlu dicek, yang dihapus dibuang
+                old = previous['packages']
+                violations = {name: reason for name, reason in previous['package_violations'].items()
+                              if name in packages}
+                for name in packages.keys() - old.keys():
+                    self.stats['packages_evaluated'] += 1
+                    reason = rules.package_violation(name)
+                    if reason:
+                        violations[name] = reason
+        if violations is None:
+            self.stats['packages_evaluated'] += len(packages)
+            violations = {}
+            for name in packages:
+                reason = rules.package_violation(name)
+                if reason:
+                    violations[name] = reason
+
+        # 2. File config (isi disimpan di state supaya rule baru bisa dievaluasi tanpa kirim ulang)
+        files = {}
+        old_files = previous['files'] if previous else {}
+        for path in rules.file_rules:
+            reported = (inventory.get('files') or {}).get(path, {})
+            digest = reported.get('digest')
+            old = old_files.get(path)
+            content = reported.get('content')
+            if reported.get('too_large'):
+                # Isi tidak pernah dikirim: violation, disimpan per digest seperti file biasa
+                if old is not None and old['digest'] == digest and old.get('too_large') and same_rules:
+                    files[path] = old
+                    continue
+                dirty = True
+                self.stats['files_evaluated'] += 1
+                files[path] = {'digest': digest, 'content': None, 'too_large': True,
+                               'results': rules.unreadable_file(path, 'melebihi max_file_size, tidak dievaluasi')}
+                continue
+            if content is None and digest is not None:
+                if old is None or old['digest'] != digest or old.get('too_large'):
+                    self._forget(host)
+                    self.stats['stale'] += 1
+                    return {'compliant': None, 'violations': [f'Isi {path} tidak diterima, dievaluasi ulang di run berikutnya'],
+                            'mode': 'stale'}
+                content = old['content']
+            if old is not None and old['digest'] == digest and not old.get('too_large') and same_rules:
+                files[path] = old
+                continue
+            dirty = True
+            self.stats['files_evaluated'] += 1
+            files[path] = {'digest': digest, 'content': content, 'results': rules.evaluate_file(path, content)}
+
+        # 3. Service (murah, selalu dievaluasi)
+        services = inventory.get('services') or {}
+        service_results = rules.evaluate_services(services)
+        if previous is None or previous.get('service_results') != service_results:
+            dirty = True
+
+        state = {
+            'rules_digest': rules.digest,
+            'packages_digest': inventory.get('packages_digest'),
+            'packages': packages,
+            'package_violations': violations,
+            'files': files,
+            'service_results': service_results,
+            'updated': int(time.time()),
+        }
+        if dirty:
+            self._save(host, state)
+            self.stats['full' if not same_rules else 'delta'] += 1
+        else:
+            self.stats['unchanged'] += 1
+
+        messages = [f"Paket {reason}: {name}" for name, reason in sorted(violations.items())]
+        for info in files.values():
+            messages.extend(f"Config: {desc}" for ok, desc in info['results'].values() if not ok)
+        messages.extend(f"Service: {desc}" for ok, desc in service_results.values() if not ok)
+        return {'compliant': not messages, 'violations': messages,
+                'mode': 'unchanged' if not dirty else ('full' if not same_rules else 'delta')}
+
+    def audit(self, inventories):
+        """{host: inventory} -> laporan fleet"""
+        started = time.perf_counter()
+        hosts = {}
+        for host in sorted(inventories):
+            inventory = inventories[host]
+            if not inventory:
+                hosts[host] = {'compliant': None, 'violations': ['Inventaris tidak tersedia'], 'mode': 'missing'}
+                continue
+            hosts[host] = self.ingest(host, inventory)
+
+        package_hosts = {}
+        for host, result in hosts.items():
+            for message in result['violations']:
+                package_hosts[message] = package_hosts.get(message, 0) + 1
+
+        summary = {
+            'hosts': len(hosts),
+            'compliant': sum(1 for r in hosts.values() if r['compliant']),
+            'non_compliant': sum(1 for r in hosts.values() if r['compliant'] is False),
+            'unknown': sum(1 for r in hosts.values() if r['compliant'] is None),
+            'duration': round(time.perf_counter() - started, 3),
+            'stats': dict(self.stats),
+        }
+        top = sorted(package_hosts.items(), key=lambda kv: (-kv[1], kv[0]))[:20]
+        return {'summary': summary, 'top_violations': top, 'hosts': hosts,
+                'generated': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+
+def write_report(report, report_dir):
+    """Satu laporan fleet per run (teks) + fleet_compliance.json terbaru"""
+    os.makedirs(report_dir, exist_ok=True)
+    summary = report['summary']
+    lines = [
+        f"Fleet Compliance Report - {report['generated']}",
+        "=" * 50,
+        f"Host: {summary['hosts']} | Compliant: {summary['compliant']} | "
+        f"Non-compliant: {summary['non_compliant']} | Unknown: {summary['unknown']}",
+        f"Evaluasi: {summary['stats']['full']} full, {summary['stats']['delta']} delta, "
+        f"{summary['stats']['unchanged']} tidak berubah ({summary['duration']}s)",
+        "",
+        "Violation terbanyak (jumlah host):",
+    ]
+    lines += [f"- {message}: {count}" for message, count in report['top_violations']] or ["- (tidak ada)"]
+    lines += ["", "Per host:"]
+    for host, result in report['hosts'].items():
+        if result['compliant']:
+            continue
+        shown = result['violations'][:25]
+        more = len(result['violations']) - len(shown)
+        label = f"{host} (belum dievaluasi)" if result['compliant'] is None else host
+        lines.append(f"{label}: " + "; ".join(shown) + (f" (+{more})" if more > 0 else ""))
+
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    with open(os.path.join(report_dir, f'fleet_compliance_{stamp}.txt'), 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    with open(os.path.join(report_dir, 'fleet_compliance.json'), 'w') as f:
+        json.dump(report, f, indent=1)
+
+
+def playbook_output(report):
+    """Ringkasan kecil untuk stdout (di-parse playbook dengan from_json)"""
+    hosts = {}
+    for host, result in report['hosts'].items():
+        hosts[host] = {'compliant': result['compliant'], 'mode': result['mode'],
+                       'violation_count': len(result['violations']),
+                       'violations': result['violations'][:MAX_HOST_VIOLATIONS]}
+    return {'summary': report['summary'], 'hosts': hosts}
+
+
+# ============================
+# BENCHMARK: 500 HOST x 2000 PAKET
+# ============================
+def synthetic_inventories(hosts=500, packages=2000, universe=3000, seed=1):
+    import random
+
+    rng = random.Random(seed)
+    names = [f"lib{rng.choice(['ssl', 'xml', 'gtk', 'py', 'perl', 'x11'])}-{i}" for i in range(universe)]
+    config_ok = "Port 22\nPermitRootLogin no\nPasswordAuthentication no\n" + "# padding\n" * 100
+    config_bad = config_ok.replace("PermitRootLogin no", "PermitRootLogin yes")
+    inventories = {}
+    for h in range(hosts):
+        chosen = rng.sample(names, packages)
+        inventories[f"pc{h:03d}"] = {
+            'packages': {name: f"1.{rng.randint(0, 9)}" for name in chosen},
+            'files': {'/etc/ssh/sshd_config': {'content': config_bad if h % 25 == 0 else config_ok}},
+            'services': {'ufw': {'active': 'active', 'enabled': 'enabled' if h % 10 else 'disabled'}},
+        }
+    return names, inventories
+
+
+def finalize(inventory, known):
+    """Tiru lab_inventory: hitung digest, kosongkan data yang digest-nya sudah diketahui"""
+    result = {'files': {}, 'services': inventory['services']}
+    text = "\n".join(f"{k}\t{v}" for k, v in sorted(inventory['packages'].items()))
+    result['packages_digest'] = hashlib.sha1(text.encode()).hexdigest()
+    result['packages'] = None if result['packages_digest'] == known.get('packages') else inventory['packages']
+    for path, info in inventory['files'].items():
+        digest = hashlib.sha1(info['content'].encode()).hexdigest()
+        same = digest == (known.get('files') or {}).get(path)
+        result['files'][path] = {'digest': digest, 'content': None if same else info['content']}
+    return result
+
+
+def run_benchmark(hosts=500, packages=2000):
+    import random
+    import shutil
+    import tempfile
+
+    rules = {
+        'allowed_packages': ['libssl-*', 'libxml-*', 'libgtk-*', 'libpy-*', 'libperl-*', 'libx11-*'],
+        'denied_packages': ['*-7', '*-42'],
+        'checks': [
+            {'file': '/etc/ssh/sshd_config', 'rule': r'^\s*PermitRootLogin\s+no', 'desc': 'Root login disabled'},
+            {'service': 'ufw', 'state': 'enabled', 'desc': 'Firewall active'},
+        ],
+    }
+    names, raw = synthetic_inventories(hosts, packages)
+    state_dir = tempfile.mkdtemp()
+
+    def known_for(host):
+        try:
+            with open(os.path.join(state_dir, 'known', f'{host}.json')) as f:
+                return json.load(f)
+        except OSError:
+            return {}
+
+    def run(label, rule_set):
+        inventories = {host: finalize(inv, known_for(host)) for host, inv in raw.items()}
+        payload = len(json.dumps(inventories))
+        start = time.perf_counter()
+        report = ComplianceEngine(state_dir, rule_set).audit(inventories)
+        write_report(report, os.path.join(state_dir, 'reports'))
+        elapsed = time.perf_counter() - start
+        s = report['summary']
+        print(f"{label:24}: {elapsed:6.2f}s | payload {payload / 1048576:6.1f} MB | "
+              f"{s['stats']['full']} full, {s['stats']['delta']} delta, {s['stats']['unchanged']} sama | "
+              f"{s['stats']['packages_evaluated']:,} paket dicek | non-compliant {s['non_compliant']}")
+
+    print(f"Fleet: {hosts} host x {packages} paket")
+    run("Run 1 (tanpa snapshot)", rules)
+    run("Run 2 (tidak berubah)", rules)
+
+    # 5% host upgrade/install/hapus 20 paket
+    rng = random.Random(3)
+    for host in rng.sample(sorted(raw), hosts // 20):
+        pkgs = raw[host]['packages']
+        for name in rng.sample(sorted(pkgs), 10):
+            del pkgs[name]
+        for name in rng.sample(names, 10):
+            pkgs[name] = "2.0"
+    run("Run 3 (5% host berubah)", rules)
+
+    changed_rules = dict(rules, denied_packages=['*-7', '*-42', '*-99'])
+    run("Run 4 (rule berubah)", changed_rules)
+    shutil.rmtree(state_dir)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compliance engine untuk compliance_audit.yml")
+    parser.add_argument('--input', help="JSON {rules, hosts} dari playbook")
+    parser.add_argument('--state-dir', help="Direktori snapshot per host")
+    parser.add_argument('--report-dir', help="Direktori laporan fleet")
+    parser.add_argument('--bench-hosts', type=int, default=500)
+    parser.add_argument('--bench-packages', type=int, default=2000)
+    args = parser.parse_args()
+
+    if not args.input:
+        run_benchmark(args.bench_hosts, args.bench_packages)
+        sys.exit(0)
+
+    with open(args.input) as f:
+        data = json.load(f)
+    engine = ComplianceEngine(args.state_dir, data['rules'])
+    fleet = engine.audit(data['hosts'])
+    write_report(fleet, args.report_dir)
+    print(json.dumps(playbook_output(fleet), separators=(',', ':')))
@@ -17,3 +17,48 @@ PROJECT_PATH = "/home/controlnode/network-automation-ansible-lab"
 PLAYBOOK_PATH = f"{PROJECT_PATH}/Playbooks/install_nginx.yml"
 REMOVE_PLAYBOOK_PATH = f"{PROJECT_PATH}/Playbooks/remove_nginx.yml"
 INVENTORY_PATH = f"{PROJECT_PATH}/Inventory/hosts.ini"
+
+# ============================
+# KONFIGURASI WINDOWS LAB
+# ============================
+WINDOWS_INVENTORY_PATH = INVENTORY_PATH
+WINDOWS_GROUP = "windows_lab"  # Group inventory berisi PC lab
+WINDOWS_SOFTWARE_PLAYBOOK = f"{PROJECT_PATH}/Playbooks/install_common_software_fixed.yml"
+
+# Probe status PC (/lab_status)
+PROBE_CONCURRENCY = 20  # Maksimal probe yang berjalan bersamaan
+PROBE_TIMEOUT = 10      # Deadline per PC (detik)
+PROBE_FULL_CHECK = True  # Jalankan win_ping setelah port WinRM/SSH terbuka
+
+# Worker ansible persisten untuk /windows_ping dan cek online sebelum install
+ANSIBLE_WORKER = True
+
+# Job playbook (/jobs, /job, /cancel)
+JOB_MAX_CONCURRENT = 3      # Batas global playbook yang berjalan bersamaan
+JOB_DEFAULT_TIMEOUT = 3600  # Timeout default per job (detik)
+JOB_LIMITS = {
+    # nama file playbook: batas per playbook
+    "install_common_software_fixed.yml": {"max_concurrent": 2, "timeout": 2400},  # 40 menit
+}
+
+# Histori metric per host (/trend), diisi callback lab_metrics dari hasil playbook
+METRICS_DB_PATH = f"{PROJECT_PATH}/data/metrics.db"
+METRICS_COMPACT_INTERVAL = 3600  # Rollup per jam + retention (detik)
+
+# Profil waktu per run playbook (/profile), diisi callback lab_profile
+PROFILE_DIR = f"{PROJECT_PATH}/data/profiles"
+
+# Artifact cache + feed Chocolatey untuk PC lab (scripts/artifact_cache.py), dijalankan bot
+ARTIFACT_CACHE_URL = ""  # URL yang dipakai PC lab, mis. "http://192.168.100.1:8081"; kosong = nonaktif
+ARTIFACT_CACHE_PORT = 8081
+ARTIFACT_CACHE_DIR = f"{PROJECT_PATH}/data/artifacts"
+
+# Registry status PC (scripts/host_registry.py): PC lab mengirim heartbeat (Playbooks/setup_heartbeat.yml),
+# PC tanpa heartbeat di-probe di background. /lab_status, /windows_ping dan /install_software menjawab dari sini.
+HEARTBEAT_UDP_PORT = 8082    # 0 = nonaktif
+HEARTBEAT_HTTP_PORT = 8083   # POST /heartbeat; 0 = nonaktif
+HEARTBEAT_TOKEN = ""         # Token bersama di heartbeat PC (heartbeat_token di playbook); kosong = tanpa token
+HEARTBEAT_TTL = 90           # PC offline jika tidak ada heartbeat/probe sukses selama ini (detik)
+REGISTRY_PROBE_INTERVAL = 60  # Probe cadangan untuk PC tanpa heartbeat segar (detik)
+INSTALL_QUEUE_DELAY = 30      # PC antrian yang online dalam jendela ini digabung jadi satu job install (detik)
+INSTALL_QUEUE_MAX_AGE = 7 * 86400  # Antrian install kedaluwarsa (detik)
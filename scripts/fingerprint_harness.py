@@ -0,0 +1,232 @@
+# File: scripts/fingerprint_harness.py
+# ============================
+# HARNESS: FINGERPRINT DESIRED STATE DENGAN RUN BERULANG DI HOST LOKAL
+# ============================
+# N host ansible_connection=local, masing-masing dengan root sendiri (etc/, home/, var/)
+# di direktori sementara. Playbook sintetis meniru basic_config.yml (timezone, sshd_config,
+# authorized_keys, paket + biaya "apt update") dan memakai Playbooks/tasks/fingerprint_*.yml
+# yang sama dengan playbook asli. Skenario berurutan:
+#   dingin   : belum ada record -> semua host di-apply
+#   hangat   : tidak ada perubahan -> semua host dilewati, waktu hemat dilaporkan
+#   drift    : sshd_config satu host diubah manual -> hanya host itu di-apply (dan diperbaiki)
+#   input    : -e system_timezone=UTC -> semua host di-apply
+#   force    : -e fingerprint_force=true -> semua host di-apply walau cocok
+#   hangat   : setelah force, semua host kembali dilewati
+#
+#   python scripts/fingerprint_harness.py [--hosts 4] [--apply-delay 2]
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+from playbook_results import PlaybookResult, event_env  # noqa: E402
+
+TASKS_DIR = os.path.join(PROJECT_ROOT, 'Playbooks', 'tasks')
+CHECK_TASK = 'Check desired-state fingerprint'
+RECORD_TASK = 'Record desired-state fingerprint'
+
+SIM_PLAYBOOK = """---
+# Simulasi basic_config.yml untuk fingerprint_harness (root per host, tanpa become)
+- name: Simulated basic configuration
+  hosts: targets
+  gather_facts: no
+  become: no
+
+  vars:
+    root: "{{{{ lab_root }}}}/{{{{ inventory_hostname }}}}"
+    system_timezone: Asia/Jakarta
+    basic_packages: [htop, curl, vim]
+    fingerprint_name: basic_config
+    fingerprint_inputs:
+      timezone: "{{{{ system_timezone }}}}"
+      packages: "{{{{ basic_packages }}}}"
+    fingerprint_files:
+      - "{{{{ playbook_dir }}}}/basic_config.yml"
+    fingerprint_paths:
+      - "{{{{ root }}}}/etc/timezone"
+      - "{{{{ root }}}}/etc/ssh/sshd_config"
+      - "{{{{ root }}}}/home/ansible_user/.ssh/authorized_keys"
+      - "{{{{ root }}}}/var/lib/packages"
+    fingerprint_store: "{{{{ root }}}}/fingerprint"
+
+  pre_tasks:
+    - name: Skip node if nothing changed since last successful apply
+      ansible.builtin.import_tasks: {tasks}/fingerprint_check.yml
+
+  tasks:
+    - name: Update package cache (simulated)
+      ansible.builtin.command: sleep {{{{ apply_delay }}}}
+      changed_when: false
+
+    - name: Set timezone
+      ansible.builtin.copy:
+        content: "{{{{ system_timezone }}}}\\n"
+        dest: "{{{{ root }}}}/etc/timezone"
+
+    - name: Disable root login in SSH config
+      ansible.builtin.lineinfile:
+        path: "{{{{ root }}}}/etc/ssh/sshd_config"
+        regexp: '^PermitRootLogin'
+        line: 'PermitRootLogin no'
+        create: yes
+
+    - name: Copy SSH authorized key for ansible_user
+      ansible.builtin.copy:
+        content: "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIL4b control-node\\n"
+        dest: "{{{{ root }}}}/home/ansible_user/.ssh/authorized_keys"
+
+    - name: Install basic utilities (simulated)
+      ansible.builtin.copy:
+        content: "{{{{ basic_packages | join('\\n') }}}}\\n"
+        dest: "{{{{ root }}}}/var/lib/packages"
+
+  post_tasks:
+    - name: Record fingerprint of this apply
+      ansible.builtin.import_tasks: {tasks}/fingerprint_record.yml
+"""
+
+
+def write_workdir(hosts):
+    workdir = tempfile.mkdtemp(prefix='fingerprint_harness_')
+    lab_root = os.path.join(workdir, 'hosts')
+    names = [f'local{i:02d}' for i in range(1, hosts + 1)]
+    for name in names:
+        for sub in ('etc/ssh', 'home/ansible_user/.ssh', 'var/lib'):
+            os.makedirs(os.path.join(lab_root, name, sub))
+        with open(os.path.join(lab_root, name, 'etc/ssh/sshd_config'), 'w') as f:
+            f.write('Port 22\nPermitRootLogin yes\n')
+
+    with open(os.path.join(workdir, 'basic_config.yml'), 'w') as f:
+        f.write(SIM_PLAYBOOK.format(tasks=TASKS_DIR))
+    with open(os.path.join(workdir, 'hosts.ini'), 'w') as f:
+        f.write('[targets]\n' + '\n'.join(names) + '\n\n[targets:vars]\nansible_connection=local\n'
+                f'ansible_python_interpreter={sys.executable}\nlab_root={lab_root}\n')
+    return workdir, lab_root, names
+
+
+def run_scenario(workdir, forks, apply_delay, extra=()):
+    """Satu ansible-playbook dengan callback lab_events; hasil dibaca lewat PlaybookResult"""
+    env = dict(
+        event_env(PROJECT_ROOT),
+        ANSIBLE_CONFIG=os.path.join(PROJECT_ROOT, 'ansible.cfg'),
+        ANSIBLE_BECOME_ASK_PASS='False',
+        ANSIBLE_FORKS=str(forks),
+        LAB_PROFILE_DIR=os.path.join(workdir, 'profiles'),
+        LAB_METRICS_DB=os.path.join(workdir, 'metrics.db'),
+        TELEGRAM_TOKEN='',
+    )
+    cmd = ['ansible-playbook', '-i', os.path.join(workdir, 'hosts.ini'), os.path.join(workdir, 'basic_config.yml'),
+           '-e', f'apply_delay={apply_delay}']
+    for var in extra:
+        cmd += ['-e', var]
+
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, text=True, env=env, cwd=PROJECT_ROOT)
+    wall = time.perf_counter() - start
+    result = PlaybookResult()
+    for line in proc.stdout.splitlines():
+        result.feed(line)
+
+    checks = result.task_reports(CHECK_TASK)
+    return {
+        'rc': proc.returncode,
+        'wall': wall,
+        'applied': sorted(result.task_results(RECORD_TASK)),
+        'skipped': sorted(host for host, fp in checks.items() if fp.get('matched')),
+        'reasons': {host: fp.get('reason') for host, fp in checks.items()},
+        'drift': {host: fp.get('drift') for host, fp in checks.items() if fp.get('drift')},
+        'saved': sum(fp.get('saved_seconds') or 0 for fp in checks.values() if fp.get('matched')),
+        'stderr': proc.stderr.strip(),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run berulang playbook dengan fingerprint di host lokal')
+    parser.add_argument('--hosts', type=int, default=4)
+    parser.add_argument('--forks', type=int, default=10)
+    parser.add_argument('--apply-delay', type=float, default=2.0,
+                        help='Biaya simulasi "apt update" per host (detik)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir, lab_root, hosts = write_workdir(args.hosts)
+    drifted = hosts[0]
+    sshd_config = os.path.join(lab_root, drifted, 'etc/ssh/sshd_config')
+    failures = []
+    skipped_total = 0
+
+    def drift():
+        with open(sshd_config, 'a') as f:
+            f.write('PermitRootLogin yes\n')
+
+    scenarios = [
+        ('dingin', (), None, {'applied': hosts, 'reason': 'new'}),
+        ('hangat', (), None, {'skipped': hosts}),
+        ('drift', (), drift, {'applied': [drifted], 'reason': 'host_state'}),
+        ('input', ('system_timezone=UTC',), None, {'applied': hosts, 'reason': 'inputs'}),
+        ('force', ('system_timezone=UTC', 'fingerprint_force=true'), None, {'applied': hosts, 'reason': 'forced'}),
+        ('hangat', ('system_timezone=UTC',), None, {'skipped': hosts}),
+    ]
+
+    print(f'🖥️ {len(hosts)} host lokal, biaya apply simulasi {args.apply_delay:.1f}s/host | workdir {workdir}\n')
+    # Hemat = jumlah durasi apply terakhir host yang dilewati (detik-host, host jalan paralel)
+    print(f"{'Skenario':<9} {'Wall':>7} {'Apply':>6} {'Lewat':>6} {'Hemat':>7}  Cek")
+    walls = {}
+    for name, extra, before, expect in scenarios:
+        if before:
+            before()
+        run = run_scenario(workdir, args.forks, args.apply_delay, extra)
+        walls.setdefault(name, run['wall'])
+        problems = []
+        if run['rc'] != 0:
+            problems.append(f"rc {run['rc']}: {run['stderr'][-300:]}")
+        if 'applied' in expect and run['applied'] != sorted(expect['applied']):
+            problems.append(f"apply {run['applied']}, diharapkan {sorted(expect['applied'])}")
+        if 'skipped' in expect and run['skipped'] != sorted(expect['skipped']):
+            problems.append(f"dilewati {run['skipped']}, diharapkan {sorted(expect['skipped'])}")
+        if 'reason' in expect:
+            wrong = {h: r for h, r in run['reasons'].items() if h in expect['applied'] and r != expect['reason']}
+            if wrong:
+                problems.append(f"alasan {wrong}, diharapkan {expect['reason']}")
+        if name == 'drift':
+            if run['drift'].get(drifted) != [f'{sshd_config}']:
+                problems.append(f"drift {run['drift']}")
+            with open(sshd_config) as f:
+                if 'PermitRootLogin yes' in f.read():
+                    problems.append('sshd_config tidak diperbaiki')
+        if 'skipped' in expect and not run['saved'] > 0:
+            problems.append('waktu hemat tidak dilaporkan')
+
+        print(f"{name:<9} {run['wall']:>6.1f}s {len(run['applied']):>6} {len(run['skipped']):>6} "
+              f"{run['saved']:>6.1f}s  {'✅' if not problems else '❌'}")
+        failures += [f'{name}: {problem}' for problem in problems]
+        skipped_total += len(run['skipped'])
+
+    # Metric hemat waktu per host masuk ke metrics store (callback lab_metrics, /trend)
+    with sqlite3.connect(os.path.join(workdir, 'metrics.db')) as db:
+        samples = db.execute("SELECT COUNT(*) FROM samples JOIN metrics ON metrics.id = samples.metric_id "
+                             "WHERE metrics.name = 'fingerprint_saved_seconds'").fetchone()[0]
+    if samples != skipped_total:
+        failures.append(f'lab_metrics: {samples} sample fingerprint_saved_seconds, diharapkan {skipped_total}')
+
+    print(f"\n⏱️ Run hangat {walls['hangat']:.1f}s vs dingin {walls['dingin']:.1f}s "
+          f"({(1 - walls['hangat'] / walls['dingin']) * 100:.0f}% lebih cepat); "
+          f"metric fingerprint_saved_seconds: {samples} sample")
+    if failures:
+        print('\n❌ GAGAL:')
+        for failure in failures:
+            print(f'  - {failure}')
+        return 1
+    print('\n✅ Semua cek lolos')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
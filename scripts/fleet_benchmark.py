@@ -0,0 +1,534 @@
+# File: scripts/fleet_benchmark.py
+# ============================
+# BENCHMARK FLEET SIMULASI: BOT + PLAYBOOK DENGAN N PC PALSU
+# ============================
+# Inventory N host palsu memakai connection plugin lab_stub (eksekusi lokal +
+# latency/kegagalan simulasi per round trip, host offline = unreachable).
+# Module Windows (win_ping, lab_choco) diganti stub Python di library sementara
+# supaya playbook Windows bisa jalan di control node Linux.
+#
+# Suite:
+#   playbooks : wall time playbook vs forks x strategy + CPU/RSS control node
+#   bot       : handler telegram_bot lewat Application asli terhadap fake Telegram
+#               API lokal; latency tiap command, job /install_software sampai
+#               laporan akhir, dan command saat job berjalan
+#
+# Hasil disimpan di data/benchmarks/<timestamp>_<commit>.json lalu dibandingkan
+# dengan run terakhir ber-parameter sama, supaya regresi antar commit terlihat.
+#
+#   python scripts/fleet_benchmark.py --hosts 40 --offline 3 --latency 0.05 --forks 5,20
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import yaml
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+from fleet_probe import start_fake_hosts  # noqa: E402
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'data', 'benchmarks')
+REAL_INSTALL_PLAYBOOK = os.path.join(PROJECT_ROOT, 'Playbooks', 'install_common_software_fixed.yml')
+REGRESSION_FLOOR = 0.05  # Selisih absolut minimum (detik/MB) sebelum dianggap regresi
+
+# ---------- Stub module Windows ----------
+STUB_WIN_PING = """#!/usr/bin/python
+# Stub win_ping (fleet_benchmark)
+from ansible.module_utils.basic import AnsibleModule
+
+module = AnsibleModule(argument_spec=dict(data=dict(type='str', default='pong')), supports_check_mode=True)
+module.exit_json(changed=False, ping=module.params['data'])
+"""
+
+STUB_LAB_CHOCO = """#!/usr/bin/python
+# Stub lab_choco (fleet_benchmark): hasil berformat sama dengan library/lab_choco.ps1
+import random
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+
+def main():
+    module = AnsibleModule(argument_spec=dict(
+        packages=dict(type='list', elements='dict', required=True),
+        source=dict(type='str'),
+        execution_timeout=dict(type='int', default=3600),
+        install_seconds=dict(type='float', default=1.0),   # Per paket yang di-install
+        installed_share=dict(type='float', default=0.5),   # Peluang paket sudah terpasang
+        failure_rate=dict(type='float', default=0.0),      # Peluang install paket gagal
+    ), supports_check_mode=True)
+    params = module.params
+    result = dict(changed=False, packages={}, present=[], installed=[], failed_packages=[], reboot_required=False)
+    pending = []
+    for spec in params['packages']:
+        package = spec['package']
+        entry = dict(name=spec.get('name') or package, package=package, desired=spec.get('version'),
+                     version_before=None, version=None, status='missing', msg=None)
+        if random.random() < params['installed_share']:
+            entry.update(version_before='1.0.0', version='1.0.0', status='present')
+            result['present'].append(package)
+        else:
+            pending.append(entry)
+        result['packages'][package] = entry
+
+    if pending and not module.check_mode:
+        # Satu choco install untuk semua paket yang belum ada
+        time.sleep(params['install_seconds'] * len(pending))
+        result['rc'] = 0
+        for entry in pending:
+            if random.random() < params['failure_rate']:
+                entry.update(status='failed', msg='simulated install failure')
+                result['failed_packages'].append(entry['package'])
+                result['rc'] = 1
+            else:
+                entry.update(status='installed', version=entry['desired'] or '1.0.0')
+                result['installed'].append(entry['package'])
+        result['changed'] = bool(result['installed'])
+
+    if result['failed_packages']:
+        module.fail_json(msg='Gagal install: ' + ', '.join(result['failed_packages']), **result)
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
+"""
+
+# Struktur sama dengan install_common_software_fixed.yml (nama task install dipakai bot)
+SIM_INSTALL_PLAYBOOK = """---
+# Simulasi install_common_software_fixed.yml untuk fleet_benchmark (module Windows = stub)
+- name: Verify and Install Common Software on Windows PCs (simulasi)
+  hosts: windows
+  gather_facts: no
+  vars:
+    software_list: {software_list}
+  pre_tasks:
+    - name: Verify Chocolatey installation
+      win_ping:
+  tasks:
+    - name: Install missing software
+      lab_choco:
+        packages: "{{{{ software_list }}}}"
+        install_seconds: {install_seconds}
+        failure_rate: {package_failure_rate}
+      register: install_results
+      retries: 2
+      delay: 1
+      until: install_results is succeeded
+      ignore_errors: yes
+  post_tasks:
+    - name: Display final installation summary
+      ansible.builtin.debug:
+        msg: "{{{{ install_results.installed | default([]) }}}}"
+"""
+
+
+def write_workdir(args):
+    """Direktori kerja: library stub + playbook install simulasi"""
+    workdir = tempfile.mkdtemp(prefix='fleet_bench_')
+    library = os.path.join(workdir, 'library')
+    os.makedirs(library)
+    for name, source in (('win_ping.py', STUB_WIN_PING), ('lab_choco.py', STUB_LAB_CHOCO)):
+        with open(os.path.join(library, name), 'w') as f:
+            f.write(source)
+    with open(REAL_INSTALL_PLAYBOOK) as f:
+        software_list = yaml.safe_load(f)[0]['vars']['software_list']
+    # Nama file sama dengan playbook asli supaya JOB_LIMITS berlaku
+    with open(os.path.join(workdir, 'install_common_software_fixed.yml'), 'w') as f:
+        f.write(SIM_INSTALL_PLAYBOOK.format(software_list=json.dumps(software_list),
+                                            install_seconds=args.install_seconds,
+                                            package_failure_rate=args.package_failure_rate))
+    return workdir
+
+
+def write_inventory(path, args, ports=None):
+    """N host palsu di windows_lab (juga windows dan targets); host offline di akhir"""
+    lines = ['[windows_lab]']
+    for i in range(args.hosts):
+        line = f'sim{i + 1:03d}'
+        if ports:
+            line += f' ansible_port={ports[i]}'
+        if i >= args.hosts - args.offline:
+            line += ' lab_stub_offline=true'
+        lines.append(line)
+    lines += [
+        '', '[windows_lab:vars]',
+        'ansible_connection=lab_stub',
+        'ansible_host=127.0.0.1',
+        f'ansible_python_interpreter={sys.executable}',
+        f'lab_stub_latency={args.latency}',
+        f'lab_stub_failure_rate={args.failure_rate}',
+        '', '[windows:children]', 'windows_lab',
+        '', '[targets:children]', 'windows_lab', '',
+    ]
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+def ansible_env(workdir):
+    """Environment ansible: transport lab_stub, library stub di depan, data callback di workdir"""
+    return dict(
+        os.environ,
+        ANSIBLE_CONFIG=os.path.join(PROJECT_ROOT, 'ansible.cfg'),
+        ANSIBLE_CONNECTION_PLUGINS=os.path.join(PROJECT_ROOT, 'connection_plugins'),
+        ANSIBLE_LIBRARY=os.pathsep.join([os.path.join(workdir, 'library'), os.path.join(PROJECT_ROOT, 'library')]),
+        ANSIBLE_BECOME_ASK_PASS='False',
+        ANSIBLE_STDOUT_CALLBACK='default',  # Bot tetap memakai lab_events (event_env)
+        LAB_PROFILE_DIR=os.path.join(workdir, 'profiles'),
+        LAB_METRICS_DB=os.path.join(workdir, 'metrics.db'),
+        TELEGRAM_TOKEN='',
+    )
+
+
+# ---------- Suite playbook ----------
+def run_playbook(playbook, inventory, env):
+    """Jalankan ansible-playbook; wall time + CPU/RSS proses ansible beserta worker fork-nya"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(['ansible-playbook', '-i', inventory, playbook], stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env, cwd=PROJECT_ROOT)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        'wall': round(time.perf_counter() - start, 3),
+        'cpu': round(usage.ru_utime + usage.ru_stime, 3),
+        'rss_mb': round(usage.ru_maxrss / 1024, 1),
+        'rc': proc.returncode,
+    }
+
+
+def playbook_suite(args, workdir, metrics):
+    inventory = write_inventory(os.path.join(workdir, 'hosts_playbooks.ini'), args)
+    playbooks = [os.path.join(PROJECT_ROOT, p) for p in args.playbooks]
+    playbooks.append(os.path.join(workdir, 'install_common_software_fixed.yml'))
+    for playbook in playbooks:
+        stem = os.path.splitext(os.path.basename(playbook))[0]
+        for strategy in args.strategies:
+            for forks in args.forks:
+                key = f'playbook.{stem}.{strategy}.f{forks}'
+                runs = []
+                for _ in range(args.rounds):
+                    env = dict(ansible_env(workdir),
+                               ANSIBLE_FORKS=str(forks), ANSIBLE_STRATEGY=strategy)
+                    runs.append(run_playbook(playbook, inventory, env))
+                best = min(runs, key=lambda r: r['wall'])
+                for name in ('wall', 'cpu', 'rss_mb'):
+                    metrics[f'{key}.{name}'] = best[name]
+                print(f'  {stem:<36} {strategy:<6} forks {forks:>3}: {best["wall"]:7.2f}s '
+                      f'CPU {best["cpu"]:6.2f}s RSS {best["rss_mb"]:6.1f} MB (rc {best["rc"]})')
+
+
+# ---------- Fake Telegram API ----------
+class FakeTelegramAPI:
+    """Bot API minimal (getMe, sendMessage, lain-lain ok) yang mencatat setiap pesan keluar"""
+
+    def __init__(self):
+        self.messages = []  # (waktu monotonic, chat_id, text)
+        self.lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *a):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode(errors='replace')
+                if self.headers.get('Content-Type', '').startswith('application/json'):
+                    params = json.loads(body or '{}')
+                else:
+                    params = {k: v[0] for k, v in parse_qs(body).items()}
+                method = self.path.rstrip('/').rsplit('/', 1)[-1]
+                payload = json.dumps({'ok': True, 'result': api.handle(method, params)}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def handle(self, method, params):
+        if method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'LabBench', 'username': 'lab_bench_bot'}
+        if method == 'sendMessage':
+            chat_id = int(params.get('chat_id', 0))
+            with self.lock:
+                self.messages.append((time.monotonic(), chat_id, params.get('text', '')))
+                message_id = len(self.messages)
+            return {'message_id': message_id, 'date': int(time.time()),
+                    'chat': {'id': chat_id, 'type': 'private'}, 'text': params.get('text', '')}
+        return True
+
+    def since(self, started):
+        with self.lock:
+            return [m for m in self.messages if m[0] >= started]
+
+    async def wait_for(self, text, started, timeout):
+        """Tunggu pesan berisi `text` setelah `started`; waktu pesan atau None jika timeout"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for at, _, message in self.since(started):
+                if text in message:
+                    return at
+            await asyncio.sleep(0.05)
+        return None
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def command_update(update_id, text, chat_id):
+    command = text.split()[0]
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id, 'date': int(time.time()), 'text': text,
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Bench'},
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(command)}],
+        },
+    }
+
+
+# ---------- Suite bot ----------
+async def bot_suite(args, workdir, metrics):
+    try:
+        from telegram import Update
+    except ImportError:
+        print('  ⚠️ python-telegram-bot tidak terpasang, suite bot dilewati')
+        return
+
+    chat_id = 1000
+    api = FakeTelegramAPI()
+    api.start()
+    # Listener TCP per host untuk probe /lab_status (host offline = port ditutup)
+    delays = [args.latency] * (args.hosts - args.offline) + [None] * args.offline
+    fake_hosts, servers = await start_fake_hosts(delays)
+    ports = [entry['vars']['ansible_port'] for entry in fake_hosts.values()]
+    inventory = write_inventory(os.path.join(workdir, 'hosts_bot.ini'), args, ports=ports)
+
+    # Config bot diarahkan ke fleet simulasi sebelum telegram_bot di-import
+    import config
+    config.TELEGRAM_TOKEN = '123456:FLEET-BENCHMARK'
+    config.CHAT_ID = str(chat_id)
+    config.PROJECT_PATH = PROJECT_ROOT
+    config.WINDOWS_INVENTORY_PATH = inventory
+    config.WINDOWS_GROUP = 'windows_lab'
+    config.WINDOWS_SOFTWARE_PLAYBOOK = os.path.join(workdir, 'install_common_software_fixed.yml')
+    config.PROBE_FULL_CHECK = args.full_check
+    config.METRICS_DB_PATH = os.path.join(workdir, 'metrics.db')
+    config.PROFILE_DIR = os.path.join(workdir, 'profiles')
+    config.ARTIFACT_CACHE_URL = ''
+    # Registry: tanpa listener heartbeat (PC simulasi di-probe), antrian install langsung di-dispatch
+    config.HEARTBEAT_UDP_PORT = 0
+    config.HEARTBEAT_HTTP_PORT = 0
+    config.INSTALL_QUEUE_DELAY = 1
+    # Worker ansible dan job playbook mewarisi environment proses ini
+    os.environ.update(ansible_env(workdir), ANSIBLE_FORKS=str(max(args.forks)))
+    import telegram_bot
+
+    application = telegram_bot.build_application(config.TELEGRAM_TOKEN, base_url=f'{api.url}/bot')
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    update_ids = iter(range(1, 1000000))
+
+    async def send(text, label=None):
+        label = label or text.split()[0].lstrip('/')
+        mark = time.monotonic()
+        update = Update.de_json(command_update(next(update_ids), text, chat_id), application.bot)
+        await application.process_update(update)
+        done = time.monotonic()
+        replies = api.since(mark)
+        metrics[f'bot.{label}.total'] = round(done - mark, 3)
+        if replies:
+            metrics[f'bot.{label}.first_reply'] = round(replies[0][0] - mark, 3)
+        print(f'  {text:<24} selesai {done - mark:6.2f}s, balasan pertama '
+              f'{(replies[0][0] - mark) if replies else float("nan"):6.2f}s ({len(replies)} pesan)')
+        return mark
+
+    try:
+        await application.initialize()
+        await telegram_bot.post_init(application)
+        # Putaran probe pertama registry (dasar jawaban /lab_status dan /install_software)
+        mark = time.monotonic()
+        registry = telegram_bot.registry
+        while not registry.hosts or any(status == 'unknown' for _, status, _, _ in registry.snapshot()):
+            if time.monotonic() - mark > args.job_timeout:
+                break
+            await asyncio.sleep(0.05)
+        metrics['bot.registry.first_probe'] = round(time.monotonic() - mark, 3)
+        print(f'  registry siap setelah {time.monotonic() - mark:.2f}s')
+        await send('/start')
+        await send('/lab_status')
+        await send('/windows_ping')
+        mark = await send('/install_software')
+        # Handler harus tetap responsif selama job playbook berjalan
+        await send('/jobs', 'jobs_during_install')
+        await send('/lab_status', 'lab_status_during_install')
+        finished = await api.wait_for('HASIL INSTALASI', mark, args.job_timeout)
+        if finished is None:
+            print(f'  ⏰ job install belum selesai setelah {args.job_timeout}s')
+        else:
+            metrics['bot.install_software.job'] = round(finished - mark, 3)
+            print(f'  job install selesai setelah {finished - mark:.2f}s')
+        await send('/jobs')
+        await send('/job 1', 'job')
+        await send('/profile')
+    finally:
+        await telegram_bot.post_shutdown(application)
+        await application.shutdown()
+        for server in servers:
+            server.close()
+        api.stop()
+
+    after_self = resource.getrusage(resource.RUSAGE_SELF)
+    after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    metrics['bot.suite.wall'] = round(time.perf_counter() - started, 3)
+    metrics['bot.suite.cpu_bot'] = round(after_self.ru_utime + after_self.ru_stime
+                                         - usage_self.ru_utime - usage_self.ru_stime, 3)
+    metrics['bot.suite.cpu_ansible'] = round(after_children.ru_utime + after_children.ru_stime
+                                             - usage_children.ru_utime - usage_children.ru_stime, 3)
+    metrics['bot.suite.rss_mb'] = round(after_self.ru_maxrss / 1024, 1)
+
+
+# ---------- Simpan + bandingkan ----------
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def save_results(directory, results):
+    os.makedirs(directory, exist_ok=True)
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}_{results['commit']}{'-dirty' if results['dirty'] else ''}.json"
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1)
+    return path
+
+
+def previous_results(directory, params, exclude):
+    """Run terakhir dengan parameter yang sama (None jika belum ada)"""
+    try:
+        names = sorted((n for n in os.listdir(directory) if n.endswith('.json')), reverse=True)
+    except OSError:
+        return None
+    for name in names:
+        if name == exclude:
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data.get('params') == params:
+            return data
+    return None
+
+
+def compare(current, previous, threshold):
+    """Cetak perbandingan per metric; semua metric 'lebih kecil lebih baik'. Mengembalikan daftar regresi"""
+    print(f"\n📊 Dibanding {previous['commit']}{'-dirty' if previous.get('dirty') else ''} "
+          f"({time.strftime('%d-%m %H:%M', time.localtime(previous['created']))}):")
+    regressions = []
+    for key in sorted(current['metrics']):
+        new, old = current['metrics'][key], previous['metrics'].get(key)
+        if old is None:
+            print(f'  {key:<58} {new:9.3f}  (baru)')
+            continue
+        change = (new - old) / old if old else 0.0
+        flag = ''
+        if change > threshold and new - old > REGRESSION_FLOOR:
+            flag = '  ⚠️ REGRESI'
+            regressions.append(key)
+        print(f'  {key:<58} {old:9.3f} -> {new:9.3f} ({change * 100:+6.1f}%){flag}')
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark bot + playbook terhadap fleet PC simulasi')
+    parser.add_argument('--hosts', type=int, default=20)
+    parser.add_argument('--offline', type=int, default=2, help='Host yang selalu unreachable')
+    parser.add_argument('--latency', type=float, default=0.05, help='Round trip simulasi per operasi (detik)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Peluang koneksi gagal per task')
+    parser.add_argument('--forks', default='5,20', help='Daftar forks, dipisah koma')
+    parser.add_argument('--strategies', default='linear,free')
+    parser.add_argument('--playbooks', default='Playbooks/health_check.yml',
+                        help='Playbook repo (relatif ke project), dipisah koma; install simulasi selalu ikut')
+    parser.add_argument('--rounds', type=int, default=1, help='Ulangan per kombinasi (diambil yang tercepat)')
+    parser.add_argument('--suites', default='playbooks,bot')
+    parser.add_argument('--install-seconds', type=float, default=1.0, help='Durasi install stub per paket')
+    parser.add_argument('--package-failure-rate', type=float, default=0.1)
+    parser.add_argument('--full-check', action='store_true', help='Probe /lab_status dengan win_ping (lambat)')
+    parser.add_argument('--job-timeout', type=float, default=900)
+    parser.add_argument('--threshold', type=float, default=0.2, help='Kenaikan relatif yang dianggap regresi')
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+    args.forks = [int(f) for f in args.forks.split(',') if f]
+    args.strategies = [s for s in args.strategies.split(',') if s]
+    args.playbooks = [p for p in args.playbooks.split(',') if p]
+    args.suites = [s for s in args.suites.split(',') if s]
+    args.offline = min(args.offline, args.hosts)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+    workdir = write_workdir(args)
+    params = {key: value for key, value in vars(args).items()
+              if key not in ('results_dir', 'fail_on_regression', 'threshold', 'job_timeout', 'seed')}
+    commit, dirty = git_revision()
+    metrics = {}
+
+    print(f'🖥️ Fleet simulasi: {args.hosts} host ({args.offline} offline), latency {args.latency * 1000:.0f} ms, '
+          f'gagal koneksi {args.failure_rate * 100:.0f}% | workdir {workdir}')
+    if 'playbooks' in args.suites:
+        print('\n▶️ Suite playbook')
+        playbook_suite(args, workdir, metrics)
+    if 'bot' in args.suites:
+        print('\n▶️ Suite bot (fake Telegram API)')
+        asyncio.run(bot_suite(args, workdir, metrics))
+
+    results = {'commit': commit, 'dirty': dirty, 'created': int(time.time()), 'params': params,
+               'host': os.uname().nodename, 'metrics': metrics}
+    path = save_results(args.results_dir, results)
+    print(f'\n💾 Hasil: {path}')
+    previous = previous_results(args.results_dir, params, os.path.basename(path))
+    regressions = compare(results, previous, args.threshold) if previous else []
+    if not previous:
+        print('ℹ️ Belum ada run sebelumnya dengan parameter sama untuk dibandingkan')
+    if regressions:
+        print(f'\n⚠️ {len(regressions)} metric regresi > {args.threshold * 100:.0f}%')
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# File: scripts/fleet_probe.py
+# ============================
+# PROBE PARALEL UNTUK SEMUA PC LAB
+# ============================
+import asyncio
+import random
+import time
+
+WINRM_PORT = 5985
+WINRM_HTTPS_PORT = 5986
+SSH_PORT = 22
+
+
+def probe_port(host_vars):
+    """Tentukan port yang dicek dari host vars inventory (ansible_port/connection)"""
+    host_vars = host_vars or {}
+    if host_vars.get('ansible_port'):
+        return int(host_vars['ansible_port'])
+    connection = host_vars.get('ansible_connection', 'winrm')
+    if connection == 'ssh':
+        return SSH_PORT
+    if host_vars.get('ansible_winrm_transport') == 'https' or host_vars.get('ansible_winrm_scheme') == 'https':
+        return WINRM_HTTPS_PORT
+    return WINRM_PORT
+
+
+async def tcp_check(address, port, timeout):
+    """Cek murah: buka koneksi TCP ke port WinRM/SSH lalu tutup lagi"""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+
+def win_ping_check(inventory_path, cwd=None):
+    """Buat check lengkap yang menjalankan `ansible <host> -m win_ping`"""
+    async def check(host_name, address, port, timeout):
+        proc = await asyncio.create_subprocess_exec(
+            "ansible", host_name, "-i", inventory_path, "-m", "win_ping", "--one-line",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=cwd,
+        )
+        try:
+            return await asyncio.wait_for(proc.wait(), timeout) == 0
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+    return check
+
+
+async def probe_host(host_name, address, port, timeout, check=None):
+    """Probe satu host: TCP dulu, lalu check lengkap hanya kalau port terbuka"""
+    start = time.monotonic()
+    result = {
+        "host": host_name,
+        "ip": address,
+        "port": port,
+        "online": False,
+        "stage": "tcp",
+        "error": None,
+        "tcp_latency": None,
+        "latency": None,
+    }
+
+    try:
+        await tcp_check(address, port, timeout)
+        result["tcp_latency"] = time.monotonic() - start
+
+        if check is None:
+            result["online"] = True
+        else:
+            result["stage"] = "check"
+            remaining = max(timeout - result["tcp_latency"], 0.001)
+            result["online"] = await asyncio.wait_for(check(host_name, address, port, remaining), remaining)
+            if not result["online"]:
+                result["error"] = "Check gagal"
+    except asyncio.TimeoutError:
+        result["error"] = "Timeout"
+    except OSError as e:
+        result["error"] = e.strerror or str(e)
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["latency"] = time.monotonic() - start
+    return result
+
+
+async def probe_fleet(hosts, concurrency=20, timeout=10, check=None, port=None):
+    """Probe semua host sekaligus, dibatasi `concurrency` probe yang berjalan.
+
+    `hosts` berisi {nama: ip} atau {nama: {"ip": ..., "vars": {...}}}.
+    Hasil dikembalikan urut nama host.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(host_name, entry):
+        if isinstance(entry, dict):
+            address = entry.get("ip") or host_name
+            host_port = port or probe_port(entry.get("vars"))
+        else:
+            address = entry if entry and entry != "N/A" else host_name
+            host_port = port or WINRM_PORT
+        async with semaphore:
+            return await probe_host(host_name, address, host_port, timeout, check)
+
+    tasks = [bounded(name, entry) for name, entry in sorted(hosts.items())]
+    return list(await asyncio.gather(*tasks))
+
+
+# ============================
+# HARNESS: FAKE HOST LOKAL
+# ============================
+async def start_fake_hosts(delays, host="127.0.0.1"):
+    """Jalankan listener lokal; tiap listener membalas 'pong' setelah delay tertentu.
+
+    Delay `None` berarti host mati (port ditutup). Mengembalikan (hosts, servers).
+    """
+    hosts = {}
+    servers = []
+    for i, delay in enumerate(delays):
+        name = f"fake{i + 1:02d}"
+        if delay is None:
+            # Ambil port kosong lalu tutup lagi supaya koneksi ditolak
+            server = await asyncio.start_server(lambda r, w: None, host, 0)
+            port = server.sockets[0].getsockname()[1]
+            server.close()
+            await server.wait_closed()
+        else:
+            async def handle(reader, writer, delay=delay):
+                try:
+                    await reader.readline()
+                    await asyncio.sleep(delay)
+                    writer.write(b"pong\n")
+                    await writer.drain()
+                finally:
+                    writer.close()
+            server = await asyncio.start_server(handle, host, 0)
+            port = server.sockets[0].getsockname()[1]
+            servers.append(server)
+        hosts[name] = {"ip": host, "vars": {"ansible_port": port}}
+    return hosts, servers
+
+
+async def fake_ping_check(host_name, address, port, timeout):
+    """Check lengkap untuk fake host: kirim 'ping', tunggu 'pong'"""
+    reader, writer = await asyncio.open_connection(address, port)
+    try:
+        writer.write(b"ping\n")
+        await writer.drain()
+        return (await reader.readline()).strip() == b"pong"
+    finally:
+        writer.close()
+
+
+async def run_harness(count=40, offline=5, max_delay=2.0, concurrency=20, timeout=3.0):
+    """Probe `count` fake host dengan delay acak dan bandingkan wall time vs total serial"""
+    delays = [round(random.uniform(0.05, max_delay), 2) for _ in range(count - offline)]
+    delays += [None] * offline
+    hosts, servers = await start_fake_hosts(delays)
+
+    start = time.monotonic()
+    results = await probe_fleet(hosts, concurrency=concurrency, timeout=timeout, check=fake_ping_check)
+    wall = time.monotonic() - start
+
+    for server in servers:
+        server.close()
+
+    online = [r for r in results if r["online"]]
+    print(f"Host: {count} | Online: {len(online)} | Offline: {count - len(online)}")
+    print(f"Wall time      : {wall:.2f}s")
+    print(f"Host terlambat : {max(d for d in delays if d is not None):.2f}s")
+    print(f"Total serial   : {sum(r['latency'] for r in results):.2f}s")
+    return results, wall
+
+
+if __name__ == "__main__":
+    asyncio.run(run_harness())
@@ -0,0 +1,85 @@
+# File: scripts/health_benchmark.py
+# ============================
+# BENCHMARK: HEALTH CHECK LAMA vs lab_health TANPA GATHER FACTS
+# ============================
+# Bandingkan runtime per host antara cara lama health_check.yml (gather_facts penuh,
+# setup mounts, setup cpu/mem, service_facts) dan module lab_health tanpa koleksi
+# fakta sama sekali, di target local-connection.
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OLD_PLAYBOOK = """
+- name: Health check (lama, 4x koleksi fakta)
+  hosts: targets
+  gather_facts: yes
+  tasks:
+    - ansible.builtin.setup:
+        filter: ansible_mounts
+      register: disk_facts
+    - ansible.builtin.setup:
+        filter: "*cpu*|*mem*"
+      register: cpu_mem_facts
+    - ansible.builtin.service_facts:
+    - ansible.builtin.set_fact:
+        root: "{{ disk_facts.ansible_facts.ansible_mounts | selectattr('mount', 'equalto', '/') | first }}"
+        mem_total: "{{ ansible_facts.memtotal_mb | int }}"
+"""
+
+NEW_PLAYBOOK = """
+- name: Health check (lab_health, tanpa fakta)
+  hosts: targets
+  gather_facts: no
+  tasks:
+    - lab_health:
+        mounts: [/]
+        services: [ssh, nginx]
+      register: health
+"""
+
+
+def run_playbook(playbook, inventory, env, cwd):
+    start = time.perf_counter()
+    proc = subprocess.run(['ansible-playbook', '-i', inventory, playbook],
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env, cwd=cwd)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stdout.decode()[-1000:])
+    return time.perf_counter() - start
+
+
+def run_benchmark(hosts=5, rounds=3):
+    workdir = tempfile.mkdtemp()
+    inventory = os.path.join(workdir, 'hosts.ini')
+    with open(inventory, 'w') as f:
+        f.write(f"[targets]\nlocal[01:{hosts:02d}]\n\n[targets:vars]\n")
+        f.write(f"ansible_connection=local\nansible_python_interpreter={sys.executable}\n")
+    playbooks = {}
+    for name, text in (('old', OLD_PLAYBOOK), ('new', NEW_PLAYBOOK)):
+        playbooks[name] = os.path.join(workdir, f'{name}.yml')
+        with open(playbooks[name], 'w') as f:
+            f.write(text)
+
+    env = dict(os.environ,
+               ANSIBLE_CONFIG=os.path.join(PROJECT_ROOT, 'ansible.cfg'),
+               ANSIBLE_LIBRARY=os.path.join(PROJECT_ROOT, 'library'),
+               ANSIBLE_STDOUT_CALLBACK='default',
+               TELEGRAM_TOKEN='',
+               ANSIBLE_BECOME='False',
+               ANSIBLE_BECOME_ASK_PASS='False')
+
+    old = [run_playbook(playbooks['old'], inventory, env, workdir) for _ in range(rounds)]
+    new = [run_playbook(playbooks['new'], inventory, env, workdir) for _ in range(rounds)]
+
+    per_host = lambda values: sum(values) / len(values) / hosts * 1000  # noqa: E731
+    print(f"Host local      : {hosts} | Ulangan: {rounds}")
+    print(f"Lama (4x fakta) : {per_host(old):.0f} ms/host")
+    print(f"Baru (lab_health): {per_host(new):.0f} ms/host")
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,222 @@
+# File: scripts/heartbeat_harness.py
+# ============================
+# HARNESS: REGISTRY HEARTBEAT DENGAN RATUSAN PC SIMULASI
+# ============================
+# Inventory sintetis N host dengan perilaku berbeda:
+#   udp / http : agent kirim heartbeat terus (UDP datagram / HTTP POST)
+#   late       : PC menyala belakangan -> install yang diantrikan harus jalan otomatis
+#   dying      : berhenti kirim di tengah run -> harus offline setelah TTL
+#   probe_up   : tanpa agent, port terbuka -> online lewat probe cadangan
+#   probe_down : tanpa agent, port tertutup; juga jadi target heartbeat palsu (token salah)
+# Dicek status akhir tiap kelompok, install antrian (sekali per host, digabung per batch),
+# heartbeat palsu ditolak, dan waktu query registry untuk seluruh fleet.
+#
+#   python scripts/heartbeat_harness.py [jumlah_host]
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fleet_probe import start_fake_hosts  # noqa: E402
+from host_registry import HostRegistry, PendingQueue, start_http_receiver, start_udp_receiver  # noqa: E402
+from inventory import Inventory  # noqa: E402
+
+TOKEN = "lab-secret"
+TTL = 2.0
+INTERVAL = 0.5      # Interval heartbeat agent
+PROBE_INTERVAL = 1.0
+BATCH_DELAY = 0.5
+LATE_START = 2.0    # PC "late" mulai kirim heartbeat
+DYING_STOP = 1.5    # PC "dying" berhenti kirim heartbeat
+INSTALL_AT = 0.8    # "/install_software" dijalankan
+DURATION = 6.0
+
+KINDS = (("udp", 0.60), ("http", 0.10), ("late", 0.10), ("dying", 0.06), ("probe_up", 0.07), ("probe_down", 0.07))
+
+
+def plan_hosts(count):
+    kinds = {}
+    start = 0
+    for index, (kind, share) in enumerate(KINDS):
+        size = count - start if index == len(KINDS) - 1 else int(count * share)
+        kinds[kind] = [f"pc{i:04d}" for i in range(start + 1, start + size + 1)]
+        start += size
+    return kinds
+
+
+async def udp_sender(hosts, port, start_at, stop_at, started):
+    """Satu agent per host dengan fase acak, seperti PC yang mengirim sendiri-sendiri"""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=("127.0.0.1", port))
+
+    async def agent(host):
+        await asyncio.sleep(max(start_at - (time.monotonic() - started), 0) + random.uniform(0, INTERVAL))
+        while time.monotonic() - started < stop_at:
+            # COMPUTERNAME Windows huruf besar; registry harus tetap mengenali
+            transport.sendto(json.dumps({"host": host.upper(), "token": TOKEN, "uptime": 60}).encode())
+            await asyncio.sleep(INTERVAL * random.uniform(0.8, 1.0))
+
+    try:
+        await asyncio.gather(*(agent(host) for host in hosts))
+    finally:
+        transport.close()
+
+
+async def http_sender(host, port, stop_at, started, results):
+    body = json.dumps({"host": host, "token": TOKEN}).encode()
+    while time.monotonic() - started < stop_at:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /heartbeat HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        status = (await reader.readline()).split(b" ")[1]
+        results[status] = results.get(status, 0) + 1
+        writer.close()
+        await asyncio.sleep(INTERVAL * random.uniform(0.8, 1.0))
+
+
+async def run_harness(count=500):
+    kinds = plan_hosts(count)
+    # Listener TCP untuk probe cadangan; host ber-agent memakai port tertutup
+    fake, servers = await start_fake_hosts([0.0] * len(kinds["probe_up"]) + [None])
+    ports = [entry["vars"]["ansible_port"] for entry in fake.values()]
+    closed_port = ports[-1]
+    probe_ports = dict(zip(kinds["probe_up"], ports))
+
+    inventory_path = os.path.join(tempfile.mkdtemp(), "hosts.ini")
+    with open(inventory_path, "w") as f:
+        f.write("[windows_lab]\n")
+        for kind, hosts in kinds.items():
+            for host in hosts:
+                f.write(f"{host} ansible_port={probe_ports.get(host, closed_port)}\n")
+        f.write("\n[windows_lab:vars]\nansible_host=127.0.0.1\n")
+    inventory = Inventory(inventory_path)
+
+    registry = HostRegistry(ttl=TTL, token=TOKEN, probe_interval=PROBE_INTERVAL)
+    dispatched = []  # (detik sejak start, [host])
+    started = time.monotonic()
+
+    def dispatch(entries):
+        dispatched.append((time.monotonic() - started, sorted(entries)))
+
+    queue = PendingQueue(registry, dispatch=dispatch, batch_delay=BATCH_DELAY)
+    udp = await start_udp_receiver(registry, "127.0.0.1", 0)
+    udp_port = udp.get_extra_info("sockname")[1]
+    http = await start_http_receiver(registry, "127.0.0.1", 0)
+    http_port = http.sockets[0].getsockname()[1]
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    probe_task = asyncio.create_task(registry.run(lambda: inventory.probe_targets("windows_lab"), concurrency=50,
+                                                  timeout=1.0))
+    http_results = {}
+    senders = [
+        udp_sender(kinds["udp"], udp_port, 0, DURATION, started),
+        udp_sender(kinds["late"], udp_port, LATE_START, DURATION, started),
+        udp_sender(kinds["dying"], udp_port, 0, DYING_STOP, started),
+        *(http_sender(host, http_port, DURATION, started, http_results) for host in kinds["http"]),
+    ]
+
+    async def spoofer():
+        # Heartbeat palsu (token salah / token non-ASCII / JSON rusak) untuk host tanpa agent
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol,
+                                                           remote_addr=("127.0.0.1", udp_port))
+        while time.monotonic() - started < DURATION:
+            for host in kinds["probe_down"]:
+                transport.sendto(json.dumps({"host": host, "token": "salah"}).encode())
+                transport.sendto(json.dumps({"host": host, "token": "sälah"}, ensure_ascii=False).encode())
+            transport.sendto(b"{rusak")
+            await asyncio.sleep(INTERVAL)
+        transport.close()
+
+    async def install():
+        # Sama dengan /install_software: online langsung, sisanya diantrikan
+        await asyncio.sleep(INSTALL_AT)
+        online = registry.online_hosts()
+        offline = registry.offline_hosts()
+        queue.add(offline, chat_id=1)
+        return online, offline
+
+    results = await asyncio.gather(install(), spoofer(), *senders)
+    direct, queued = results[0]
+    await asyncio.sleep(BATCH_DELAY + 0.2)  # Batch terakhir
+
+    # Query registry untuk seluruh fleet (yang dilakukan setiap command bot)
+    rounds = 200
+    query_start = time.perf_counter()
+    for _ in range(rounds):
+        registry.snapshot()
+        registry.online_hosts()
+    query = (time.perf_counter() - query_start) / rounds
+    after = resource.getrusage(resource.RUSAGE_SELF)
+
+    probe_task.cancel()
+    udp.close()
+    http.close()
+    for server in servers:
+        server.close()
+
+    # ---------- Cek ----------
+    status = {host: registry.status(host) for host in registry.hosts}
+    failures = []
+
+    def expect(kind, wanted):
+        wrong = [h for h in kinds[kind] if status[h] != wanted]
+        if wrong:
+            failures.append(f"{kind}: {len(wrong)} host bukan {wanted} (mis. {wrong[0]} = {status[wrong[0]]})")
+
+    expect("udp", "online")
+    expect("http", "online")
+    expect("late", "online")
+    expect("dying", "offline")
+    expect("probe_up", "online")
+    expect("probe_down", "offline")
+
+    dispatched_hosts = [host for _, hosts in dispatched for host in hosts]
+    if len(dispatched_hosts) != len(set(dispatched_hosts)):
+        failures.append("ada host yang di-dispatch lebih dari sekali")
+    missing_late = set(kinds["late"]) - set(dispatched_hosts)
+    if missing_late:
+        failures.append(f"{len(missing_late)} PC late tidak di-install setelah online")
+    if set(dispatched_hosts) & set(direct):
+        failures.append("host online ikut diantrikan")
+    if not set(kinds["probe_down"]) <= set(queue.pending):
+        failures.append("PC yang tetap offline hilang dari antrian")
+    if registry.stats["rejected"] == 0 or any(registry.hosts[h]["source"] == "heartbeat" for h in kinds["probe_down"]):
+        failures.append("heartbeat palsu diterima")
+    rejected = registry.stats["rejected"]
+    try:
+        if registry.heartbeat({"host": kinds["probe_down"][0], "token": "sälah"}) or registry.stats["rejected"] != rejected + 1:
+            failures.append("heartbeat dengan token non-ASCII tidak dihitung ditolak")
+    except TypeError as e:
+        failures.append(f"heartbeat dengan token non-ASCII error: {e}")
+    if any(registry.hosts[h]["source"] != "probe" for h in kinds["probe_up"]):
+        failures.append("host tanpa agent tidak online lewat probe")
+
+    cpu = (after.ru_utime + after.ru_stime) - (usage.ru_utime + usage.ru_stime)
+    print(f"Host              : {count} ({', '.join(f'{k} {len(v)}' for k, v in kinds.items())})")
+    print(f"Heartbeat         : {registry.stats['heartbeats']} diterima, {registry.stats['rejected']} ditolak, "
+          f"HTTP {dict((k.decode(), v) for k, v in http_results.items())}")
+    print(f"Probe cadangan    : {registry.stats['probe_rounds']} putaran, {registry.stats['probed']} host diprobe "
+          f"(sweep penuh tiap putaran: {registry.stats['probe_rounds'] * count})")
+    print(f"Install           : {len(direct)} langsung, {len(queued)} antri -> "
+          f"{len(dispatched_hosts)} di-dispatch dalam {len(dispatched)} batch "
+          f"({', '.join(f'{t:.1f}s:{len(h)}' for t, h in dispatched)}), {len(queue.pending)} masih antri")
+    print(f"Query registry    : {query * 1000:.2f} ms (snapshot + online_hosts, {count} host)")
+    print(f"CPU control node  : {cpu:.2f}s untuk {DURATION:.0f}s simulasi")
+    if failures:
+        print("\n❌ GAGAL:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\n✅ Semua cek lolos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run_harness(int(sys.argv[1]) if len(sys.argv) > 1 else 500)))
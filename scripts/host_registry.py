@@ -0,0 +1,337 @@
+# File: scripts/host_registry.py
+# ============================
+# REGISTRY STATUS PC LAB (HEARTBEAT + PROBE CADANGAN)
+# ============================
+# PC lab mengirim heartbeat ringan ke control node (datagram UDP berisi JSON,
+# atau HTTP POST /heartbeat; lihat Playbooks/setup_heartbeat.yml). Host dianggap
+# online selama heartbeat/probe sukses terakhir belum lewat TTL. Host tanpa
+# heartbeat segar di-probe di background (fleet_probe) tiap `probe_interval`,
+# jadi /lab_status, /windows_ping dan /install_software menjawab dari registry
+# tanpa sweep win_ping ke seluruh group.
+#
+# Host yang berubah jadi online memicu callback; PendingQueue memakainya untuk
+# menjalankan aksi yang diantrikan (install untuk PC yang tadinya offline).
+import asyncio
+import hmac
+import json
+import time
+
+from fleet_probe import probe_fleet
+
+HEARTBEAT_MAX_SIZE = 2048  # Byte; heartbeat lebih besar ditolak
+INFO_KEYS = ("uptime", "user", "version")  # Field heartbeat yang disimpan untuk ditampilkan
+HTTP_TIMEOUT = 5
+
+ONLINE = "online"
+OFFLINE = "offline"
+UNKNOWN = "unknown"
+
+
+def format_age(seconds):
+    """12 dtk, 5 mnt, 3 jam, 2 hari"""
+    seconds = max(int(seconds), 0)
+    if seconds < 60:
+        return f"{seconds} dtk"
+    if seconds < 3600:
+        return f"{seconds // 60} mnt"
+    if seconds < 86400:
+        return f"{seconds // 3600} jam"
+    return f"{seconds // 86400} hari"
+
+
+class HostRegistry:
+    """Status terakhir tiap host; semua method dipanggil dari event loop bot (tanpa lock)"""
+
+    def __init__(self, ttl=90, token="", probe_interval=60):
+        self.ttl = ttl
+        self.token = token
+        self.probe_interval = probe_interval
+        self.hosts = {}       # host -> state (last_seen/checked = time.monotonic())
+        self._by_name = {}    # nama huruf kecil -> host (heartbeat memakai COMPUTERNAME)
+        self._by_address = {}  # ip -> host (heartbeat tanpa nama)
+        self._online_callbacks = []
+        self.stats = {"heartbeats": 0, "rejected": 0, "probed": 0, "probe_rounds": 0}
+
+    # ---------- Host ----------
+    def sync(self, targets):
+        """Samakan daftar host dengan inventory ({host: {"ip": ..., "vars": {...}}}, Inventory.probe_targets)"""
+        for host in [h for h in self.hosts if h not in targets]:
+            del self.hosts[host]
+        for host, entry in targets.items():
+            state = self.hosts.get(host)
+            if state is None:
+                self.hosts[host] = {
+                    "host": host, "ip": entry.get("ip") or host, "vars": entry.get("vars") or {},
+                    "last_seen": None, "checked": None, "source": None,
+                    "latency": None, "error": None, "info": {},
+                }
+            else:
+                state["ip"] = entry.get("ip") or host
+                state["vars"] = entry.get("vars") or {}
+        self._by_name = {host.lower(): host for host in self.hosts}
+        self._by_address = {state["ip"]: host for host, state in self.hosts.items()}
+
+    def resolve(self, name=None, address=None):
+        """Nama host inventory dari nama di heartbeat (tidak case-sensitive) atau IP pengirim"""
+        if name:
+            name = str(name)
+            if name in self.hosts:
+                return name
+            host = self._by_name.get(name.lower())
+            if host:
+                return host
+        return self._by_address.get(address) if address else None
+
+    def on_online(self, callback):
+        """callback(host) dipanggil saat host berubah dari offline/unknown ke online"""
+        self._online_callbacks.append(callback)
+
+    # ---------- Status ----------
+    def _fresh(self, state, now):
+        return state["last_seen"] is not None and now - state["last_seen"] <= self.ttl
+
+    def status(self, host, now=None):
+        state = self.hosts.get(host)
+        if state is None:
+            return None
+        now = now if now is not None else time.monotonic()
+        if self._fresh(state, now):
+            return ONLINE
+        if state["last_seen"] is None and state["checked"] is None:
+            return UNKNOWN
+        return OFFLINE
+
+    def online_hosts(self, hosts=None):
+        now = time.monotonic()
+        return [h for h in (hosts if hosts is not None else self.hosts) if self.status(h, now) == ONLINE]
+
+    def offline_hosts(self, hosts=None):
+        """Host yang tidak online (termasuk yang belum pernah dicek)"""
+        now = time.monotonic()
+        return [h for h in (hosts if hosts is not None else self.hosts)
+                if h in self.hosts and self.status(h, now) != ONLINE]
+
+    def snapshot(self):
+        """[(host, status, umur detik info terakhir atau None, state)] urut nama host"""
+        now = time.monotonic()
+        rows = []
+        for host in sorted(self.hosts):
+            state = self.hosts[host]
+            seen = state["last_seen"] if state["last_seen"] is not None else state["checked"]
+            rows.append((host, self.status(host, now), None if seen is None else now - seen, state))
+        return rows
+
+    # ---------- Update ----------
+    def mark_seen(self, host, source, latency=None, info=None):
+        state = self.hosts.get(host)
+        if state is None:
+            return False
+        now = time.monotonic()
+        was_online = self._fresh(state, now)
+        state.update(last_seen=now, checked=now, source=source, error=None)
+        if latency is not None:
+            state["latency"] = latency
+        if info:
+            state["info"] = info
+        if not was_online:
+            for callback in self._online_callbacks:
+                try:
+                    callback(host)
+                except Exception as e:
+                    print(f"Callback online {host} gagal: {e}")
+        return True
+
+    def mark_offline(self, host, error=None, since=None):
+        """Host gagal dicek; diabaikan jika ada heartbeat setelah `since` (cek dimulai)"""
+        state = self.hosts.get(host)
+        if state is None:
+            return
+        if since is not None and state["last_seen"] is not None and state["last_seen"] >= since:
+            return
+        state.update(last_seen=None, checked=time.monotonic(), error=error)
+
+    def _token_ok(self, token):
+        # compare_digest hanya menerima str ASCII (non-ASCII -> TypeError): bandingkan sebagai bytes
+        return hmac.compare_digest(str(token).encode("utf-8", "surrogatepass"),
+                                   self.token.encode("utf-8", "surrogatepass"))
+
+    def heartbeat(self, payload, address=None):
+        """Proses satu heartbeat: JSON {"host", "token", ...} atau nama host saja. True jika diterima"""
+        try:
+            if isinstance(payload, (bytes, bytearray)):
+                if len(payload) > HEARTBEAT_MAX_SIZE:
+                    raise ValueError("heartbeat terlalu besar")
+                payload = payload.decode("utf-8")
+            if isinstance(payload, str):
+                payload = payload.strip()
+                data = json.loads(payload) if payload.startswith("{") else {"host": payload}
+            else:
+                data = payload
+            if not isinstance(data, dict):
+                raise ValueError("heartbeat bukan object")
+        except (ValueError, UnicodeDecodeError):
+            self.stats["rejected"] += 1
+            return False
+
+        if self.token and not self._token_ok(data.get("token", "")):
+            self.stats["rejected"] += 1
+            return False
+        host = self.resolve(data.get("host"), address)
+        if host is None:
+            self.stats["rejected"] += 1
+            return False
+        self.stats["heartbeats"] += 1
+        return self.mark_seen(host, "heartbeat", info={k: data[k] for k in INFO_KEYS if k in data})
+
+    # ---------- Probe cadangan ----------
+    async def probe_stale(self, concurrency=20, timeout=10, check=None):
+        """Probe hanya host tanpa heartbeat/probe sukses dalam TTL"""
+        since = time.monotonic()
+        targets = {host: {"ip": state["ip"], "vars": state["vars"]}
+                   for host, state in self.hosts.items() if not self._fresh(state, since)}
+        if not targets:
+            return []
+        results = await probe_fleet(targets, concurrency=concurrency, timeout=timeout, check=check)
+        for probe in results:
+            if probe["online"]:
+                self.mark_seen(probe["host"], "probe", latency=probe["latency"])
+            else:
+                self.mark_offline(probe["host"], probe["error"], since=since)
+        self.stats["probed"] += len(results)
+        self.stats["probe_rounds"] += 1
+        return results
+
+    async def run(self, targets, concurrency=20, timeout=10, check=None):
+        """Loop background: sync inventory (targets() -> dict) lalu probe host yang basi"""
+        while True:
+            try:
+                self.sync(targets())
+                await self.probe_stale(concurrency=concurrency, timeout=timeout, check=check)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Probe registry gagal: {e}")
+            await asyncio.sleep(self.probe_interval)
+
+
+# ============================
+# RECEIVER HEARTBEAT (UDP + HTTP)
+# ============================
+class HeartbeatProtocol(asyncio.DatagramProtocol):
+    def __init__(self, registry):
+        self.registry = registry
+
+    def datagram_received(self, data, addr):
+        # Datagram aneh tidak boleh sampai ke exception handler event loop
+        try:
+            self.registry.heartbeat(data, addr[0])
+        except Exception:
+            self.registry.stats["rejected"] += 1
+
+
+async def start_udp_receiver(registry, host="0.0.0.0", port=8082):
+    """Listener UDP; mengembalikan transport (transport.close() untuk berhenti)"""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: HeartbeatProtocol(registry), local_addr=(host, port))
+    return transport
+
+
+async def start_http_receiver(registry, host="0.0.0.0", port=8083):
+    """HTTP minimal: POST /heartbeat (body sama dengan datagram UDP) -> 204, token salah -> 403"""
+
+    async def handle(reader, writer):
+        status = "400 Bad Request"
+        try:
+            request = await asyncio.wait_for(reader.readline(), HTTP_TIMEOUT)
+            method, path, _ = request.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), HTTP_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            length = int(headers.get("content-length") or 0)
+            if method != "POST" or path.split("?", 1)[0] != "/heartbeat":
+                status = "404 Not Found"
+            elif length > HEARTBEAT_MAX_SIZE:
+                status = "413 Payload Too Large"
+            else:
+                body = await asyncio.wait_for(reader.readexactly(length), HTTP_TIMEOUT) if length else b""
+                address = (writer.get_extra_info("peername") or (None,))[0]
+                status = "204 No Content" if registry.heartbeat(body, address) else "403 Forbidden"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, TypeError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+# ============================
+# ANTRIAN AKSI UNTUK HOST OFFLINE
+# ============================
+class PendingQueue:
+    """Host yang menunggu online untuk satu aksi (mis. install).
+
+    Host yang online dalam `batch_delay` detik digabung jadi satu dispatch,
+    jadi PC yang menyala bersamaan pagi hari cukup satu job playbook.
+    dispatch(entries) menerima {host: meta} dan boleh async.
+    """
+
+    def __init__(self, registry, dispatch=None, batch_delay=30, max_age=7 * 86400):
+        self.registry = registry
+        self.dispatch = dispatch
+        self.batch_delay = batch_delay
+        self.max_age = max_age
+        self.pending = {}  # host -> meta (+ "queued" = time.time())
+        self.ready = set()
+        self.batches = 0
+        self._flush_task = None
+        registry.on_online(self._host_online)
+
+    def add(self, hosts, **meta):
+        for host in hosts:
+            self.pending[host] = dict(meta, queued=time.time())
+            # Bisa saja sudah online lagi sebelum masuk antrian
+            if self.registry.status(host) == ONLINE:
+                self._host_online(host)
+
+    def discard(self, hosts):
+        for host in hosts:
+            self.pending.pop(host, None)
+            self.ready.discard(host)
+
+    def _host_online(self, host):
+        if host not in self.pending:
+            return
+        self.ready.add(host)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush())
+
+    def _expire(self):
+        cutoff = time.time() - self.max_age
+        for host in [h for h, meta in self.pending.items() if meta["queued"] < cutoff]:
+            self.discard([host])
+
+    async def _flush(self):
+        await asyncio.sleep(self.batch_delay)
+        self._flush_task = None  # Host yang online selama dispatch masuk batch berikutnya
+        if self.dispatch is None:
+            return
+        self._expire()
+        # Hanya host yang masih online saat batch dikirim; sisanya tetap antri
+        entries = {host: self.pending.pop(host) for host in sorted(self.ready)
+                   if host in self.pending and self.registry.status(host) == ONLINE}
+        self.ready.clear()
+        if not entries:
+            return
+        self.batches += 1
+        try:
+            result = self.dispatch(entries)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            print(f"Dispatch antrian gagal ({len(entries)} host): {e}")
@@ -0,0 +1,321 @@
+# File: scripts/inventory.py
+# ============================
+# INVENTORY SERVICE (PARSE SEKALI, CACHE + INDEX)
+# ============================
+import hashlib
+import os
+import re
+import shlex
+import string
+import sys
+import time
+
+RANGE_PATTERN = re.compile(r'\[([^\[\]:]+):([^\[\]:]+)(?::(\d+))?\]')
+# host:port (titik dua di dalam range [01:60] bukan port)
+PORT_PATTERN = re.compile(r'^((?:[^:\[\]]|\[[^\]]*\])+):(\d+)$')
+
+
+def expand_hostname(pattern):
+    """Expand range Ansible: pc[01:60] -> pc01..pc60, node[a:c] -> nodea..nodec"""
+    match = RANGE_PATTERN.search(pattern)
+    if not match:
+        return [pattern]
+
+    start, end, stride = match.group(1), match.group(2), int(match.group(3) or 1)
+    head, tail = pattern[:match.start()], pattern[match.end():]
+
+    if start.isdigit() and end.isdigit():
+        width = len(start) if start.startswith('0') else 0
+        values = [str(i).zfill(width) for i in range(int(start), int(end) + 1, stride)]
+    elif len(start) == 1 and len(end) == 1 and start.isalpha() and end.isalpha():
+        letters = string.ascii_letters
+        values = list(letters[letters.index(start):letters.index(end) + 1:stride])
+    else:
+        raise ValueError(f"Range host tidak valid: {pattern}")
+
+    hosts = []
+    for value in values:
+        hosts.extend(expand_hostname(head + value + tail))
+    return hosts
+
+
+def split_line(line):
+    """Pecah baris inventory jadi token; shlex hanya dipakai jika ada quote (lebih lambat)"""
+    if '"' in line or "'" in line:
+        return shlex.split(line, comments=True)
+    tokens = line.split()
+    for i, token in enumerate(tokens):
+        if token.startswith('#'):
+            return tokens[:i]
+    return tokens
+
+
+def parse_var_line(line):
+    """Baris [group:vars] ala Ansible: 'key = value' boleh berspasi, quote luar dibuang"""
+    if '=' not in line:
+        raise ValueError(f"Variabel inventory tidak valid: {line}")
+    key, value = (part.strip() for part in line.split('=', 1))
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        value = value[1:-1]
+    return key, value
+
+
+def split_port(pattern):
+    """'pc01:2222' -> ('pc01', '2222'); tanpa port -> (pattern, None)"""
+    match = PORT_PATTERN.match(pattern)
+    if not match:
+        return pattern, None
+    return match.group(1), match.group(2)
+
+
+def parse_assignments(tokens):
+    """['a=1', 'b="x y"'] -> {'a': '1', 'b': 'x y'}"""
+    assignments = {}
+    for token in tokens:
+        if '=' not in token:
+            raise ValueError(f"Variabel inventory tidak valid: {token}")
+        key, value = token.split('=', 1)
+        assignments[key.strip()] = value
+    return assignments
+
+
+class Inventory:
+    """Inventory INI ala Ansible: groups, :children, :vars dan range host.
+
+    File hanya di-parse ulang jika mtime berubah DAN isinya (hash) berbeda,
+    jadi setiap command bot cukup memanggil method lookup tanpa biaya parse.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        self._digest = None
+        self.host_vars = {}     # host -> vars yang didefinisikan di baris host
+        self.group_vars = {}    # group -> vars dari [group:vars]
+        self.children = {}      # group -> set child group
+        self.direct_hosts = {}  # group -> list host (urutan sesuai file)
+        self.groups = {}        # group -> list host (termasuk dari children)
+        self.host_groups = {}   # host -> set group
+        self._depths = {}
+        self.loads = 0
+
+    # ---------- Reload ----------
+    def refresh(self):
+        """Parse ulang jika file berubah; return True jika inventory dimuat ulang"""
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return False
+
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()
+        if digest == self._digest:
+            self._mtime = mtime
+            return False
+
+        # Parse ke struktur baru dulu; jika gagal (ValueError/UnicodeDecodeError) inventory lama
+        # tetap utuh dan mtime/digest tidak dicatat, jadi refresh berikutnya mencoba lagi
+        host_vars, group_vars, children, direct_hosts = self._parse(content.decode('utf-8'))
+        groups, host_groups = self._build_indexes(host_vars, children, direct_hosts)
+
+        self.host_vars = host_vars
+        self.group_vars = group_vars
+        self.children = children
+        self.direct_hosts = direct_hosts
+        self.groups = groups
+        self.host_groups = host_groups
+        self._depths = {}
+        self._mtime = mtime
+        self._digest = digest
+        self.loads += 1
+        return True
+
+    def _parse(self, text):
+        """Return (host_vars, group_vars, children, direct_hosts); state object tidak diubah"""
+        host_vars = {}
+        group_vars = {}
+        children = {'all': {'ungrouped'}, 'ungrouped': set()}  # ungrouped selalu child dari all
+        direct_hosts = {'all': [], 'ungrouped': []}
+        seen = {}  # group -> set host, untuk cek duplikat O(1)
+
+        group, kind = 'ungrouped', 'hosts'
+        for number, raw in enumerate(text.splitlines(), 1):
+            line = raw.strip()
+            if not line or line.startswith((';', '#')):
+                continue
+
+            if line.startswith('[') and line.endswith(']'):
+                group, _, kind = line[1:-1].strip().partition(':')
+                kind = kind or 'hosts'
+                if kind not in ('hosts', 'vars', 'children'):
+                    raise ValueError(f"{self.path}:{number}: section tidak dikenal [{line[1:-1]}]")
+                children.setdefault(group, set())
+                direct_hosts.setdefault(group, [])
+                continue
+
+            if kind == 'vars':
+                key, value = parse_var_line(line)
+                group_vars.setdefault(group, {})[key] = value
+            elif kind == 'children':
+                child = line.split()[0]
+                children[group].add(child)
+                children.setdefault(child, set())
+                direct_hosts.setdefault(child, [])
+            else:
+                tokens = split_line(line)
+                pattern, port = split_port(tokens[0])
+                # Port dari host:port; ansible_port eksplisit di baris yang sama menang
+                assignments = {'ansible_port': port} if port else {}
+                assignments.update(parse_assignments(tokens[1:]))
+                members = seen.setdefault(group, set())
+                for host in expand_hostname(pattern):
+                    host_vars.setdefault(host, {}).update(assignments)
+                    if host not in members:
+                        members.add(host)
+                        direct_hosts[group].append(host)
+
+        # Host yang punya group selain ungrouped/all bukan "ungrouped"
+        grouped = {h for g, hosts in direct_hosts.items() if g not in ('ungrouped', 'all') for h in hosts}
+        direct_hosts['ungrouped'] = [h for h in direct_hosts['ungrouped'] if h not in grouped]
+        for name in children:
+            if name != 'all' and not any(name in c for c in children.values()):
+                children['all'].add(name)
+
+        return host_vars, group_vars, children, direct_hosts
+
+    @staticmethod
+    def _build_indexes(host_vars, children, direct_hosts):
+        """Return (groups, host_groups) dari hasil _parse"""
+        groups = {}
+
+        def resolve(name, seen):
+            if name in groups:
+                return groups[name]
+            if name in seen:
+                raise ValueError(f"Loop di :children untuk group {name}")
+            seen.add(name)
+            hosts = list(direct_hosts.get(name, []))
+            members = set(hosts)
+            for child in sorted(children.get(name, ())):
+                for host in resolve(child, seen):
+                    if host not in members:
+                        members.add(host)
+                        hosts.append(host)
+            groups[name] = hosts
+            return hosts
+
+        for name in children:
+            resolve(name, set())
+
+        host_groups = {host: set() for host in host_vars}
+        for name, hosts in groups.items():
+            for host in hosts:
+                host_groups[host].add(name)
+        return groups, host_groups
+
+    def _depth(self, group):
+        # Kedalaman group untuk prioritas vars: all < parent < child
+        if group not in self._depths:
+            parents = [g for g, kids in self.children.items() if group in kids]
+            self._depths[group] = 1 + max((self._depth(p) for p in parents), default=-1)
+        return self._depths[group]
+
+    # ---------- Lookup ----------
+    def hosts(self, pattern='all'):
+        """Host untuk pattern Ansible sederhana: 'g1,g2', 'g1:!pc05', 'g1:&g2'"""
+        self.refresh()
+        selected = {}  # dict sebagai ordered set
+        for term in re.split(r'[,:]', pattern):
+            term = term.strip()
+            if not term:
+                continue
+            if term.startswith('!'):
+                for host in self._match(term[1:]):
+                    selected.pop(host, None)
+            elif term.startswith('&'):
+                kept = set(self._match(term[1:]))
+                selected = {h: None for h in selected if h in kept}
+            else:
+                selected.update(dict.fromkeys(self._match(term)))
+        return list(selected)
+
+    def _match(self, term):
+        if term in self.groups:
+            return self.groups[term]
+        if term in self.host_vars:
+            return [term]
+        return []
+
+    def vars(self, host):
+        """Vars efektif: all < group (berdasar kedalaman) < host"""
+        self.refresh()
+        merged = {}
+        for group in sorted(self.host_groups.get(host, ()), key=lambda g: (self._depth(g), g)):
+            merged.update(self.group_vars.get(group, {}))
+        merged.update(self.host_vars.get(host, {}))
+        return merged
+
+    def address(self, host):
+        """IP/hostname yang dipakai Ansible untuk konek (ansible_host atau nama host)"""
+        return self.vars(host).get('ansible_host', host)
+
+    def limit(self, hosts):
+        """String untuk --limit dari list host"""
+        return ",".join(hosts)
+
+    def probe_targets(self, pattern='all'):
+        """{host: {"ip": ..., "vars": {...}}} untuk fleet_probe.probe_fleet"""
+        return {host: {"ip": self.address(host), "vars": self.vars(host)} for host in self.hosts(pattern)}
+
+
+# ============================
+# BENCHMARK: INVENTORY 10K HOST
+# ============================
+def generate_inventory(path, hosts=10000, per_group=100):
+    """Tulis inventory sintetis dengan range, :children dan :vars"""
+    groups = hosts // per_group
+    with open(path, 'w') as f:
+        for g in range(groups):
+            f.write(f"[lab{g:03d}]\n")
+            if g % 2 == 0:
+                # Setengah group memakai range host
+                f.write(f"lab{g:03d}-pc[001:{per_group:03d}] ansible_user=admin\n")
+            else:
+                for h in range(1, per_group + 1):
+                    f.write(f"lab{g:03d}-pc{h:03d} ansible_host=10.{g // 250}.{g % 250}.{h} ansible_port=5985\n")
+            f.write(f"\n[lab{g:03d}:vars]\nlab_room=R{g:03d}\n\n")
+        f.write("[windows_lab:children]\n")
+        for g in range(groups):
+            f.write(f"lab{g:03d}\n")
+        f.write("\n[windows_lab:vars]\nansible_connection=winrm\nansible_winrm_transport=ntlm\n")
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    inv_path = os.path.join(tempfile.mkdtemp(), 'hosts.ini')
+    generate_inventory(inv_path, hosts=count)
+
+    inventory = Inventory(inv_path)
+    start = time.perf_counter()
+    inventory.refresh()
+    cold = time.perf_counter() - start
+
+    names = inventory.hosts('windows_lab')
+    rounds = 1000
+    start = time.perf_counter()
+    for i in range(rounds):
+        host = names[(i * 7919) % len(names)]
+        inventory.address(host)
+        inventory.hosts('lab001')
+    warm = (time.perf_counter() - start) / rounds
+
+    start = time.perf_counter()
+    limit = inventory.limit(inventory.hosts('windows_lab'))
+    full = time.perf_counter() - start
+
+    print(f"Host           : {len(names)} ({len(inventory.groups)} group)")
+    print(f"Cold parse     : {cold * 1000:.1f} ms")
+    print(f"Warm lookup    : {warm * 1e6:.1f} us (address + hosts per group)")
+    print(f"Limit 10k host : {full * 1000:.1f} ms ({len(limit)} karakter)")
@@ -0,0 +1,100 @@
+# File: scripts/inventory_harness.py
+# ============================
+# HARNESS: PARSER INVENTORY (scripts/inventory.py) VS ATURAN INI ANSIBLE
+# ============================
+# Inventory kecil dengan host sebelum section pertama (ungrouped), [all:vars],
+# baris :vars berspasi di sekitar '=', host:port, range dan :children.
+# Hasil hosts()/vars() dibandingkan dengan yang dihasilkan Ansible untuk file sama.
+#
+#   python scripts/inventory_harness.py
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from inventory import Inventory  # noqa: E402
+
+INVENTORY = """\
+# Host sebelum section pertama -> ungrouped
+jumpbox ansible_host=10.0.0.1
+printer01:9100
+
+[all:vars]
+ansible_connection = ssh
+lab_name = "Lab Jaringan"
+
+[lab1]
+pc[01:03] ansible_user=admin
+pc04:2222
+pc05:2222 ansible_port=22
+
+[lab1:vars]
+ansible_user = student
+lab_room=R101
+
+[windows_lab:children]
+lab1
+
+[windows_lab:vars]
+ansible_connection=winrm
+"""
+
+
+def run_harness():
+    failures = []
+
+    def check(name, ok, detail=''):
+        print(f"{'✅' if ok else '❌'} {name}" + (f" ({detail})" if not ok and detail else ''))
+        if not ok:
+            failures.append(name)
+
+    path = os.path.join(tempfile.mkdtemp(prefix='inventory_harness_'), 'hosts.ini')
+    with open(path, 'w') as f:
+        f.write(INVENTORY)
+    try:
+        inventory = Inventory(path)
+        inventory.refresh()
+    except ValueError as e:
+        print(f"❌ Inventory gagal di-parse: {e}")
+        return 1
+
+    lab = ['pc01', 'pc02', 'pc03', 'pc04', 'pc05']
+    check("hosts('all') memuat host ungrouped", inventory.hosts('all') == ['jumpbox', 'printer01'] + lab,
+          inventory.hosts('all'))
+    check("hosts('ungrouped')", inventory.hosts('ungrouped') == ['jumpbox', 'printer01'], inventory.hosts('ungrouped'))
+    check("host ungrouped ada di group all + ungrouped",
+          inventory.host_groups.get('jumpbox') == {'all', 'ungrouped'}, inventory.host_groups.get('jumpbox'))
+
+    jumpbox = inventory.vars('jumpbox')
+    check("all:vars sampai ke host ungrouped (spasi di sekitar '=')",
+          jumpbox == {'ansible_connection': 'ssh', 'lab_name': 'Lab Jaringan', 'ansible_host': '10.0.0.1'}, jumpbox)
+    check("host:port -> ansible_port", inventory.vars('printer01').get('ansible_port') == '9100',
+          inventory.vars('printer01'))
+    check("nama host tanpa port", 'printer01:9100' not in inventory.hosts('all'))
+
+    pc01 = inventory.vars('pc01')
+    check("prioritas vars: all < windows_lab < lab1 < host",
+          pc01 == {'ansible_connection': 'winrm', 'lab_name': 'Lab Jaringan', 'ansible_user': 'admin',
+                   'lab_room': 'R101'}, pc01)
+    check("group vars berspasi", inventory.vars('pc04').get('ansible_user') == 'student', inventory.vars('pc04'))
+    check("port dari pattern", inventory.vars('pc04').get('ansible_port') == '2222', inventory.vars('pc04'))
+    check("ansible_port eksplisit menang", inventory.vars('pc05').get('ansible_port') == '22', inventory.vars('pc05'))
+    check("windows_lab lewat :children", inventory.hosts('windows_lab') == lab, inventory.hosts('windows_lab'))
+    check("pattern all:!ungrouped", inventory.hosts('all:!ungrouped') == lab, inventory.hosts('all:!ungrouped'))
+
+    # Baris :vars tanpa '=' tetap ditolak, inventory lama dipertahankan
+    with open(path, 'a') as f:
+        f.write("\n[lab1:vars]\nrusak\n")
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)
+    try:
+        inventory.refresh()
+        check("baris :vars tanpa '=' ditolak", False)
+    except ValueError:
+        check("baris :vars tanpa '=' ditolak", inventory.groups['all'][0] == 'jumpbox')
+
+    print(f"\n{'✅ Semua cek lolos' if not failures else f'❌ GAGAL: {len(failures)} cek'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(run_harness())
@@ -0,0 +1,274 @@
+# File: scripts/metrics_store.py
+# ============================
+# METRICS STORE (TIME-SERIES PER HOST DI SQLITE)
+# ============================
+# Angka health (disk/cpu/mem %) dan CPU saat install disimpan sebagai sampel
+# (host, metric, ts, value). Tabel sampel WITHOUT ROWID dengan primary key
+# (host_id, metric_id, ts) sehingga data satu host+metric tersimpan berurutan
+# dan query rentang waktu cukup satu range scan. Sampel lama di-rollup per jam
+# lalu dihapus sesuai retention.
+import os
+import sqlite3
+import sys
+import time
+
+RAW_RETENTION_DAYS = 35       # Sampel mentah (resolusi asli, mis. per menit)
+ROLLUP_RETENTION_DAYS = 400   # Rollup per jam (avg/min/max)
+ROLLUP_STEP = 3600
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS metrics (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS samples (
+    host_id INTEGER NOT NULL,
+    metric_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (host_id, metric_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_1h (
+    host_id INTEGER NOT NULL,
+    metric_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    avg REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (host_id, metric_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def sparkline(values):
+    """[1, 5, 3] -> '▁█▄' (None ditampilkan sebagai spasi)"""
+    present = [v for v in values if v is not None]
+    if not present:
+        return ""
+    low, high = min(present), max(present)
+    span = (high - low) or 1
+    return "".join(" " if v is None else SPARK_CHARS[int((v - low) / span * (len(SPARK_CHARS) - 1))]
+                   for v in values)
+
+
+class MetricsStore:
+    """Time-series append-only untuk metric per host"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # WAL: callback ansible menulis sementara bot membaca
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._hosts = dict(self.db.execute("SELECT name, id FROM hosts"))
+        self._metrics = dict(self.db.execute("SELECT name, id FROM metrics"))
+
+    def close(self):
+        self.db.close()
+
+    def _id(self, table, cache, name, create=True):
+        ident = cache.get(name)
+        if ident is None:
+            row = self.db.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                if not create:
+                    return None
+                row = (self.db.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid,)
+            ident = cache[name] = row[0]
+        return ident
+
+    # ---------- Ingest ----------
+    def record(self, host, metric, value, ts=None):
+        self.record_many([(host, metric, value, ts)])
+
+    def record_many(self, samples):
+        """samples: iterable (host, metric, value, ts|None); satu transaksi untuk semua"""
+        now = int(time.time())
+        rows = []
+        with self.db:
+            for host, metric, value, ts in samples:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+                rows.append((self._id("hosts", self._hosts, host),
+                             self._id("metrics", self._metrics, metric),
+                             int(ts if ts is not None else now), value))
+            self.db.executemany("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # ---------- Downsampling + retention ----------
+    def compact(self, now=None):
+        """Rollup sampel mentah per jam, lalu hapus data yang melewati retention"""
+        now = int(now or time.time())
+        with self.db:
+            row = self.db.execute("SELECT value FROM meta WHERE key = 'rollup_watermark'").fetchone()
+            # Hanya jam yang sudah lengkap (sebelum jam berjalan) yang di-rollup
+            watermark = row[0] if row else 0
+            until = now - now % ROLLUP_STEP
+            self.db.execute(
+                f"""INSERT OR REPLACE INTO rollup_1h
+                    SELECT host_id, metric_id, ts - ts % {ROLLUP_STEP}, AVG(value), MIN(value), MAX(value), COUNT(*)
+                    FROM samples WHERE ts >= ? AND ts < ?
+                    GROUP BY host_id, metric_id, ts - ts % {ROLLUP_STEP}""",
+                (watermark, until),
+            )
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('rollup_watermark', ?)", (until,))
+            self.db.execute("DELETE FROM samples WHERE ts < ?", (now - RAW_RETENTION_DAYS * 86400,))
+            self.db.execute("DELETE FROM rollup_1h WHERE ts < ?", (now - ROLLUP_RETENTION_DAYS * 86400,))
+
+    # ---------- Query ----------
+    def _keys(self, host, metric):
+        return (self._id("hosts", self._hosts, host, create=False),
+                self._id("metrics", self._metrics, metric, create=False))
+
+    def hosts(self):
+        return sorted(self._refresh("hosts", self._hosts))
+
+    def host_metrics(self, host):
+        """Nama metric yang punya data untuk host"""
+        host_id = self._id("hosts", self._hosts, host, create=False)
+        if host_id is None:
+            return []
+        names = {v: k for k, v in self._refresh("metrics", self._metrics).items()}
+        rows = self.db.execute(
+            "SELECT DISTINCT metric_id FROM rollup_1h WHERE host_id = ? "
+            "UNION SELECT DISTINCT metric_id FROM samples WHERE host_id = ?", (host_id, host_id))
+        return sorted(names[r[0]] for r in rows if r[0] in names)
+
+    def _refresh(self, table, cache):
+        # Host/metric baru bisa ditulis oleh proses lain (callback ansible)
+        cache.update(self.db.execute(f"SELECT name, id FROM {table}"))
+        return cache
+
+    def series(self, host, metric, since, until=None):
+        """Sampel mentah [(ts, value), ...] dalam rentang waktu"""
+        host_id, metric_id = self._keys(host, metric)
+        if host_id is None or metric_id is None:
+            return []
+        return self.db.execute(
+            "SELECT ts, value FROM samples WHERE host_id = ? AND metric_id = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (host_id, metric_id, int(since), int(until or time.time()) + 1),
+        ).fetchall()
+
+    def summary(self, host, metric, since, until=None, buckets=24):
+        """Ringkasan untuk /trend: min/avg/max/last + rata-rata per bucket.
+
+        Agregasi dilakukan di SQLite. Jika bucket >= 1 jam, jam yang sudah di-rollup
+        dibaca dari rollup_1h (jauh lebih sedikit baris); sisanya dari sampel mentah.
+        """
+        for cache, table in ((self._hosts, "hosts"), (self._metrics, "metrics")):
+            self._refresh(table, cache)
+        host_id, metric_id = self._keys(host, metric)
+        if host_id is None or metric_id is None:
+            return None
+
+        until = int(until or time.time())
+        since = int(since)
+        width = max(1, (until - since) // buckets)
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'rollup_watermark'").fetchone()
+        watermark = row[0] if row else 0
+        raw_since = until - RAW_RETENTION_DAYS * 86400
+        split = max(watermark, raw_since) if width >= ROLLUP_STEP else raw_since
+        split = min(max(split, since), until + 1)
+
+        # Bucket: [sum, count, min, max]
+        totals = [[0.0, 0, None, None] for _ in range(buckets)]
+        queries = [(
+            "SELECT (ts - ?) / ?, SUM(value), COUNT(*), MIN(value), MAX(value) FROM samples "
+            "WHERE host_id = ? AND metric_id = ? AND ts >= ? AND ts <= ? GROUP BY 1",
+            (since, width, host_id, metric_id, split, until),
+        )]
+        if split > since:
+            queries.append((
+                "SELECT (ts - ?) / ?, SUM(avg * count), SUM(count), MIN(min), MAX(max) FROM rollup_1h "
+                "WHERE host_id = ? AND metric_id = ? AND ts >= ? AND ts < ? GROUP BY 1",
+                (since, width, host_id, metric_id, since, split),
+            ))
+        for sql, params in queries:
+            for index, total, count, low, high in self.db.execute(sql, params):
+                bucket = totals[min(int(index), buckets - 1)]
+                bucket[0] += total
+                bucket[1] += count
+                bucket[2] = low if bucket[2] is None else min(bucket[2], low)
+                bucket[3] = high if bucket[3] is None else max(bucket[3], high)
+
+        count = sum(b[1] for b in totals)
+        if not count:
+            return None
+        last = self.db.execute(
+            "SELECT ts, value FROM samples WHERE host_id = ? AND metric_id = ? AND ts <= ? ORDER BY ts DESC LIMIT 1",
+            (host_id, metric_id, until),
+        ).fetchone()
+        return {
+            "count": count,
+            "min": min(b[2] for b in totals if b[1]),
+            "max": max(b[3] for b in totals if b[1]),
+            "avg": sum(b[0] for b in totals) / count,
+            "last": last,
+            "buckets": [b[0] / b[1] if b[1] else None for b in totals],
+        }
+
+
+# ============================
+# BENCHMARK: 100 HOST x 30 HARI x PER MENIT
+# ============================
+def load_synthetic(store, hosts=100, days=30, step=60, metric="cpu_percent", now=None):
+    """Isi store dengan sampel sintetis; return jumlah sampel"""
+    import math
+
+    now = int(now or time.time())
+    start = now - days * 86400
+    total = 0
+    for h in range(hosts):
+        host = f"pc{h:03d}"
+        batch = []
+        for ts in range(start, now, step):
+            value = 40 + 30 * math.sin((ts / 86400 + h) * 2 * math.pi) + (ts // step + h) % 7
+            batch.append((host, metric, round(value, 2), ts))
+        total += store.record_many(batch)
+    return total
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    db_path = os.path.join(tempfile.mkdtemp(), "metrics.db")
+    store = MetricsStore(db_path)
+    now = int(time.time())
+
+    start = time.perf_counter()
+    samples = load_synthetic(store, hosts=hosts, days=days, now=now)
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.compact(now)
+    compact = time.perf_counter() - start
+
+    def timed(fn, rounds=20):
+        begin = time.perf_counter()
+        for i in range(rounds):
+            result = fn(i)
+        return (time.perf_counter() - begin) / rounds * 1000, result
+
+    since = now - days * 86400
+    summary_ms, summary = timed(lambda i: store.summary(f"pc{(i * 37) % hosts:03d}", "cpu_percent", since, now))
+    day_ms, day = timed(lambda i: store.series(f"pc{(i * 37) % hosts:03d}", "cpu_percent", now - 86400, now))
+    full_ms, full = timed(lambda i: store.series(f"pc{(i * 37) % hosts:03d}", "cpu_percent", since, now), rounds=5)
+
+    print(f"Sampel         : {samples:,} ({hosts} host x {days} hari x per menit)")
+    print(f"Ukuran DB      : {os.path.getsize(db_path) / 1048576:.1f} MB ({os.path.getsize(db_path) / samples:.1f} byte/sampel)")
+    print(f"Load           : {load:.1f}s ({samples / load:,.0f} sampel/s)")
+    print(f"Rollup 1 jam   : {compact:.1f}s")
+    print(f"/trend {days} hari : {summary_ms:.1f} ms (agregat {summary['count']:,} sampel, 24 bucket)")
+    print(f"Series 1 hari  : {day_ms:.1f} ms ({len(day):,} titik)")
+    print(f"Series {days} hari : {full_ms:.1f} ms ({len(full):,} titik)")
+    print(f"Sparkline      : {sparkline(summary['buckets'])}")
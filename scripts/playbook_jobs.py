@@ -0,0 +1,262 @@
+# File: scripts/playbook_jobs.py
+# ============================
+# ANTRIAN JOB PLAYBOOK (ASYNC)
+# ============================
+import asyncio
+import collections
+import itertools
+import os
+import signal
+import time
+
+# Baris output terakhir yang disimpan per job (output lengkap tidak disimpan)
+OUTPUT_TAIL = 200
+STREAM_LIMIT = 1024 * 1024
+KILL_GRACE = 5  # Detik antara SIGTERM dan SIGKILL ke process group job
+
+# Status job
+QUEUED = "queued"
+RUNNING = "running"
+SUCCESS = "success"
+FAILED = "failed"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCESS, FAILED, TIMEOUT, CANCELLED)
+
+STATUS_ICONS = {
+    QUEUED: "⏳",
+    RUNNING: "🔄",
+    SUCCESS: "✅",
+    FAILED: "❌",
+    TIMEOUT: "⏰",
+    CANCELLED: "🛑",
+}
+
+
+async def read_lines(stream, limit=STREAM_LIMIT):
+    """Baris dari stream subprocess. Baris yang lebih panjang dari `limit` (buffer
+    StreamReader) dibuang dan diganti None, jadi satu baris raksasa tidak menggagalkan job."""
+    skipping = False
+    while True:
+        try:
+            raw = await stream.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial and not skipping:
+                yield e.partial
+            return
+        except asyncio.LimitOverrunError as e:
+            # Buang isi buffer sampai (sebelum) newline, sisa baris dibuang di putaran berikutnya
+            await stream.readexactly(e.consumed)
+            if not skipping:
+                skipping = True
+                yield None
+            continue
+        if skipping:
+            skipping = False  # Akhir baris yang terlalu panjang
+            continue
+        yield raw
+
+
+class Job:
+    """Satu eksekusi ansible/ansible-playbook yang dijalankan sebagai subprocess asyncio"""
+
+    def __init__(self, job_id, name, cmd, cwd=None, env=None, timeout=None, limit_key=None, meta=None, result=None):
+        self.id = job_id
+        self.name = name
+        self.cmd = cmd
+        self.cwd = cwd
+        self.env = env
+        self.timeout = timeout
+        self.limit_key = limit_key
+        self.meta = meta or {}
+        self.result = result  # Parser streaming dengan method feed(line), mis. PlaybookResult
+        self.status = QUEUED
+        self.returncode = None
+        self.stdout_tail = collections.deque(maxlen=OUTPUT_TAIL)
+        self.stderr_tail = collections.deque(maxlen=OUTPUT_TAIL)
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.process = None
+        self.task = None
+
+    @property
+    def done(self):
+        return self.status in FINISHED_STATES
+
+    @property
+    def stdout(self):
+        return "\n".join(self.stdout_tail)
+
+    @property
+    def stderr(self):
+        return "\n".join(self.stderr_tail)
+
+    @property
+    def duration(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def summary(self):
+        """Satu baris ringkasan untuk /jobs"""
+        icon = STATUS_ICONS.get(self.status, "•")
+        return f"{icon} #{self.id} {self.name} - {self.status} ({self.duration:.0f}s)"
+
+
+class JobManager:
+    """Jalankan job playbook di background dengan batas global dan per playbook.
+
+    `limits` berisi {nama_playbook: {"max_concurrent": n, "timeout": detik}}.
+    Nama playbook adalah basename file (mis. "install_common_software_fixed.yml").
+    """
+
+    def __init__(self, max_concurrent=2, limits=None, default_timeout=3600, history=50):
+        self.max_concurrent = max_concurrent
+        self.limits = limits or {}
+        self.default_timeout = default_timeout
+        self.history = history
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._global = None
+        self._per_key = {}
+
+    def _semaphore(self, key):
+        # Semaphore dibuat saat dipakai supaya terikat ke event loop aplikasi
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrent)
+        if key not in self._per_key:
+            limit = self.limits.get(key, {}).get("max_concurrent", self.max_concurrent)
+            self._per_key[key] = asyncio.Semaphore(limit)
+        return self._per_key[key]
+
+    def submit(self, name, cmd, cwd=None, env=None, playbook=None, on_done=None, meta=None, result=None):
+        """Daftarkan job baru dan jalankan di background. `on_done(job)` berupa coroutine.
+
+        Jika `result` diberikan, setiap baris stdout langsung di-feed ke parser tersebut.
+        """
+        key = os.path.basename(playbook) if playbook else name
+        timeout = self.limits.get(key, {}).get("timeout", self.default_timeout)
+        job = Job(next(self._ids), name, cmd, cwd=cwd, env=env, timeout=timeout,
+                  limit_key=key, meta=meta, result=result)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, on_done))
+        self._prune()
+        return job
+
+    async def _run(self, job, on_done):
+        per_key = self._semaphore(job.limit_key)
+        try:
+            async with per_key, self._global:
+                job.status = RUNNING
+                job.started = time.time()
+                job.process = await asyncio.create_subprocess_exec(
+                    *job.cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=job.cwd,
+                    env=job.env,
+                    limit=STREAM_LIMIT,
+                    # Process group sendiri: worker fork ansible-playbook ikut dimatikan oleh _kill
+                    start_new_session=True,
+                )
+                try:
+                    job.returncode = await asyncio.wait_for(self._consume(job), job.timeout)
+                    job.status = SUCCESS if job.returncode == 0 else FAILED
+                except asyncio.TimeoutError:
+                    await self._kill(job)
+                    job.status = TIMEOUT
+                except Exception as e:
+                    # Proses dimatikan sebelum semaphore dilepas, supaya job berikutnya
+                    # tidak jalan bersamaan dengan ansible-playbook yang masih hidup
+                    await self._kill(job)
+                    job.stderr_tail.append(f"Error membaca output: {e!r}")
+                    job.status = FAILED
+        except asyncio.CancelledError:
+            await self._kill(job)
+            job.status = CANCELLED
+        except Exception as e:
+            await self._kill(job)
+            job.stderr_tail.append(str(e))
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+        if on_done is not None:
+            try:
+                await on_done(job)
+            except Exception as e:
+                print(f"Gagal callback job #{job.id}: {e}")
+
+    async def _consume(self, job):
+        """Baca stdout/stderr baris per baris sambil proses berjalan"""
+        async def read_stdout():
+            async for raw in read_lines(job.process.stdout):
+                if raw is None:
+                    job.stdout_tail.append(f"[baris output > {STREAM_LIMIT} byte dilewati]")
+                    continue
+                line = raw.decode(errors="replace").rstrip("\n")
+                if job.result is not None:
+                    job.result.feed(line)
+                job.stdout_tail.append(line)
+
+        async def read_stderr():
+            async for raw in read_lines(job.process.stderr):
+                if raw is not None:
+                    job.stderr_tail.append(raw.decode(errors="replace").rstrip("\n"))
+
+        readers = [asyncio.ensure_future(read_stdout()), asyncio.ensure_future(read_stderr())]
+        try:
+            await asyncio.gather(*readers)
+        finally:
+            # Reader yang tersisa (mis. pasangan reader yang error) tidak boleh tertinggal
+            for reader in readers:
+                reader.cancel()
+        return await job.process.wait()
+
+    async def _kill(self, job):
+        """SIGTERM ke seluruh process group (ansible-playbook + worker fork), SIGKILL setelah KILL_GRACE"""
+        process = job.process
+        if process is None:
+            return
+        if process.returncode is None:
+            self._signal_group(process, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(process.wait(), KILL_GRACE)
+            except asyncio.TimeoutError:
+                pass
+        # Worker yang masih hidup (atau parent yang mengabaikan SIGTERM)
+        self._signal_group(process, signal.SIGKILL)
+        await process.wait()
+        job.returncode = process.returncode
+
+    @staticmethod
+    def _signal_group(process, sig):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            pass  # Seluruh group sudah selesai
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        return sorted(self.jobs.values(), key=lambda job: job.id, reverse=True)
+
+    def running_count(self):
+        return sum(1 for job in self.jobs.values() if job.status == RUNNING)
+
+    def cancel(self, job_id):
+        """Batalkan job yang masih antri/berjalan. Return False jika tidak ada atau sudah selesai."""
+        job = self.jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.task.cancel()
+        return True
+
+    def _prune(self):
+        # Simpan hanya `history` job terakhir yang sudah selesai
+        finished = [job for job in self.list_jobs() if job.done]
+        for job in finished[self.history:]:
+            del self.jobs[job.id]
@@ -0,0 +1,246 @@
+# File: scripts/playbook_results.py
+# ============================
+# INGEST EVENT CALLBACK lab_events SECARA STREAMING
+# ============================
+import json
+import os
+import sys
+import time
+
+# Status hasil per host x task
+OK = "ok"
+CHANGED = "changed"
+FAILED = "failed"
+UNREACHABLE = "unreachable"
+SKIPPED = "skipped"
+
+# Event dari callback -> status di result model
+EVENT_STATUS = {
+    "ok": OK,
+    "failed": FAILED,
+    "ignored": FAILED,
+    "unreachable": UNREACHABLE,
+    "skipped": SKIPPED,
+    "item_ok": OK,
+    "item_failed": FAILED,
+    "item_skipped": SKIPPED,
+}
+
+# Urutan prioritas status host (yang terburuk menang)
+STATUS_RANK = {SKIPPED: 0, OK: 1, CHANGED: 2, FAILED: 3, UNREACHABLE: 4}
+
+MAX_MSG = 200
+
+
+def event_env(project_path, adhoc=False):
+    """Environment supaya ansible/ansible-playbook memakai callback lab_events.
+
+    adhoc: untuk `ansible` ad-hoc (mis. win_ping); callback di callbacks_enabled
+    (telegram_digest, lab_metrics, lab_profile) tidak dimuat, supaya ping tidak
+    mengirim digest Telegram dan tidak menulis profil yang menggeser run asli.
+    Untuk playbook, token/chat ID digest diambil dari config.py kecuali env sudah
+    menyetel TELEGRAM_TOKEN/TELEGRAM_CHAT_ID (juga string kosong = digest mati)
+    """
+    env = os.environ.copy()
+    env["ANSIBLE_STDOUT_CALLBACK"] = "lab_events"
+    env["ANSIBLE_LOAD_CALLBACK_PLUGINS"] = "1"  # Wajib untuk ad-hoc `ansible`
+    env["ANSIBLE_CALLBACK_PLUGINS"] = os.path.join(project_path, "callback_plugins")
+    if adhoc:
+        env["ANSIBLE_CALLBACKS_ENABLED"] = ""
+        return env
+
+    try:
+        import config
+    except ImportError:
+        return env
+    for name, value in (("TELEGRAM_TOKEN", getattr(config, "TELEGRAM_TOKEN", "")),
+                        ("TELEGRAM_CHAT_ID", getattr(config, "CHAT_ID", ""))):
+        if value and name not in env:
+            env[name] = str(value)
+    return env
+
+
+class PlaybookResult:
+    """Model hasil yang ringkas: status per host x task, diisi baris demi baris.
+
+    Nama task disimpan sekali (index), hasil disimpan sebagai string status
+    yang di-intern, dan hanya pesan error yang dipotong MAX_MSG yang disimpan.
+    Output mentah tidak pernah disimpan.
+    """
+
+    def __init__(self):
+        self.tasks = []
+        self._task_index = {}
+        self.results = {}   # (host, task_idx) -> status
+        self.items = {}     # (host, task_idx) -> {item_label: status}
+        self.errors = {}    # (host, task_idx) -> pesan error
+        self.reports = {}   # (host, task_idx) -> hasil terstruktur module (mis. paket lab_choco)
+        self.hosts = {}     # host -> status terburuk
+        self.stats = None   # ringkasan akhir dari ansible (ok/changed/failures/...)
+        self.events = 0
+        self.finished = False
+
+    def _task(self, name):
+        index = self._task_index.get(name)
+        if index is None:
+            index = len(self.tasks)
+            self.tasks.append(name)
+            self._task_index[name] = index
+        return index
+
+    def feed(self, line):
+        """Proses satu baris output; baris yang bukan JSON event diabaikan"""
+        if not line or line[0] != "{":
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return
+        self.feed_event(event)
+
+    def feed_event(self, event):
+        self.events += 1
+        kind = event.get("event")
+
+        if kind == "stats":
+            self.stats = event.get("hosts", {})
+            self.finished = True
+            return
+
+        status = EVENT_STATUS.get(kind)
+        if status is None:
+            if kind == "task_start":
+                self._task(event.get("task", ""))
+            return
+
+        host = event.get("host")
+        key = (host, self._task(event.get("task", "")))
+        if status == OK and event.get("changed"):
+            status = CHANGED
+
+        if kind.startswith("item_"):
+            self.items.setdefault(key, {})[sys.intern(event.get("item", ""))] = status
+        else:
+            self.results[key] = status
+
+        if event.get("report") is not None:
+            self.reports[key] = event["report"]
+
+        if status in (FAILED, UNREACHABLE) and event.get("msg"):
+            self.errors[key] = event["msg"][:MAX_MSG]
+
+        if kind != "ignored":
+            current = self.hosts.get(host)
+            if current is None or STATUS_RANK[status] > STATUS_RANK[current]:
+                self.hosts[host] = status
+
+    # ---------- Query untuk handler ----------
+    def hosts_with(self, *statuses):
+        return sorted(host for host, status in self.hosts.items() if status in statuses)
+
+    def succeeded_hosts(self):
+        return self.hosts_with(OK, CHANGED, SKIPPED)
+
+    def failed_hosts(self):
+        return self.hosts_with(FAILED)
+
+    def unreachable_hosts(self):
+        return self.hosts_with(UNREACHABLE)
+
+    def task_results(self, task_name):
+        """{host: status} untuk satu task"""
+        index = self._task_index.get(task_name)
+        if index is None:
+            return {}
+        return {host: status for (host, idx), status in self.results.items() if idx == index}
+
+    def item_results(self, task_name):
+        """{item_label: {host: status}} untuk task dengan loop"""
+        index = self._task_index.get(task_name)
+        summary = {}
+        if index is None:
+            return summary
+        for (host, idx), items in self.items.items():
+            if idx != index:
+                continue
+            for label, status in items.items():
+                summary.setdefault(label, {})[host] = status
+        return summary
+
+    def task_reports(self, task_name):
+        """{host: report} untuk task yang mengembalikan hasil terstruktur"""
+        index = self._task_index.get(task_name)
+        if index is None:
+            return {}
+        return {host: report for (host, idx), report in self.reports.items() if idx == index}
+
+    def host_errors(self, host):
+        return [(self.tasks[idx], msg) for (h, idx), msg in self.errors.items() if h == host]
+
+
+# ============================
+# BENCHMARK: REPLAY EVENT LOG
+# ============================
+def generate_event_log(path, hosts=200, tasks=50, items=8):
+    """Tulis event log sintetis (hosts x tasks, sebagian task memakai loop)"""
+    with open(path, "w") as f:
+        f.write(json.dumps({"event": "playbook_start", "playbook": "bench.yml"}) + "\n")
+        for t in range(tasks):
+            task = f"Task {t}"
+            f.write(json.dumps({"event": "task_start", "task": task}) + "\n")
+            for h in range(hosts):
+                host = f"pc{h:04d}"
+                if h % 37 == 0:
+                    f.write(json.dumps({"event": "unreachable", "host": host, "task": task,
+                                        "changed": False, "msg": "timed out"}) + "\n")
+                    continue
+                if t % 5 == 0:
+                    for i in range(items):
+                        kind = "item_failed" if (h + i) % 53 == 0 else "item_ok"
+                        f.write(json.dumps({"event": kind, "host": host, "task": task,
+                                            "changed": True, "item": f"pkg{i}"}) + "\n")
+                kind = "failed" if (h * t) % 97 == 1 else "ok"
+                f.write(json.dumps({"event": kind, "host": host, "task": task,
+                                    "changed": t % 3 == 0, "msg": "x" * 500}) + "\n")
+        f.write(json.dumps({"event": "stats", "hosts": {}}) + "\n")
+
+
+def replay(path):
+    """Replay event log ke PlaybookResult, return (result, detik, peak_bytes)"""
+    import tracemalloc
+
+    def ingest():
+        result = PlaybookResult()
+        with open(path) as f:
+            for line in f:
+                result.feed(line)
+        return result
+
+    start = time.perf_counter()
+    result = ingest()
+    elapsed = time.perf_counter() - start
+
+    # Pass kedua khusus untuk mengukur memori (tracemalloc memperlambat)
+    tracemalloc.start()
+    ingest()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    if len(sys.argv) > 1:
+        log_path = sys.argv[1]
+    else:
+        log_path = os.path.join(tempfile.mkdtemp(), "events.jsonl")
+        generate_event_log(log_path)
+
+    result, elapsed, peak = replay(log_path)
+    size = os.path.getsize(log_path)
+    print(f"Event log      : {log_path} ({size / 1e6:.1f} MB)")
+    print(f"Event          : {result.events} ({result.events / elapsed:,.0f}/s)")
+    print(f"Host x task    : {len(result.results)}")
+    print(f"Waktu ingest   : {elapsed:.2f}s")
+    print(f"Peak memori    : {peak / 1e6:.1f} MB")
@@ -0,0 +1,95 @@
+# File: scripts/profile_benchmark.py
+# ============================
+# VERIFIKASI + OVERHEAD CALLBACK lab_profile
+# ============================
+# Playbook sintetis di host local-connection (satu host sengaja lambat) dijalankan
+# dengan dan tanpa lab_profile. Dicek: setiap task x host tercatat, host lambat
+# terdeteksi, antrian fork terlihat saat host > forks, dan overhead plugin.
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'scripts'))
+from run_profiles import format_report, load_run  # noqa: E402
+
+PLAYBOOK = """
+- name: Profil sintetis
+  hosts: targets
+  gather_facts: no
+  tasks:
+    - name: Short command
+      ansible.builtin.command: sleep 0.1
+    - name: Slow on one host
+      ansible.builtin.command: "sleep {{ 2 if inventory_hostname == 'local02' else 0.2 }}"
+    - name: Module without runtime
+      ansible.builtin.ping:
+    - name: Controller only
+      ansible.builtin.set_fact:
+        done: true
+"""
+
+
+def run_playbook(playbook, inventory, env, cwd):
+    start = time.perf_counter()
+    proc = subprocess.run(['ansible-playbook', '-i', inventory, playbook],
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env, cwd=cwd)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stdout.decode()[-1000:])
+    return time.perf_counter() - start
+
+
+def run_benchmark(hosts=12, forks=4, rounds=2):
+    workdir = tempfile.mkdtemp()
+    inventory = os.path.join(workdir, 'hosts.ini')
+    with open(inventory, 'w') as f:
+        f.write(f"[targets]\nlocal[01:{hosts:02d}]\n\n[targets:vars]\n")
+        f.write(f"ansible_connection=local\nansible_python_interpreter={sys.executable}\n")
+    playbook = os.path.join(workdir, 'profile.yml')
+    with open(playbook, 'w') as f:
+        f.write(PLAYBOOK)
+    profile_dir = os.path.join(workdir, 'profiles')
+
+    env = dict(os.environ,
+               ANSIBLE_CONFIG=os.path.join(PROJECT_ROOT, 'ansible.cfg'),
+               ANSIBLE_STDOUT_CALLBACK='default',
+               ANSIBLE_FORKS=str(forks),
+               LAB_PROFILE_DIR=profile_dir,
+               LAB_METRICS_DB=os.path.join(workdir, 'metrics.db'),
+               TELEGRAM_TOKEN='',
+               ANSIBLE_BECOME='False',
+               ANSIBLE_BECOME_ASK_PASS='False')
+    without_env = dict(env, ANSIBLE_CALLBACKS_ENABLED='telegram_digest, lab_metrics')
+
+    with_profile, without_profile = [], []
+    for _ in range(rounds):
+        without_profile.append(run_playbook(playbook, inventory, without_env, workdir))
+        with_profile.append(run_playbook(playbook, inventory, env, workdir))
+
+    profile = load_run(profile_dir, 'latest')
+    summary = profile['summary']
+    recorded = sum(len(task['hosts']) for task in profile['tasks'])
+    slow = next(task for task in summary['slowest_tasks'] if task['name'] == 'Slow on one host')
+    # Host dengan wall terbesar di task lambat harus local02 (critical host task bisa beda karena antrian fork)
+    slowest_wall = max(profile['tasks'][1]['hosts'].items(), key=lambda item: item[1][1])[0]
+
+    print(format_report(profile))
+    print()
+    print(f"Host local     : {hosts}, forks {forks}, {rounds} ulangan")
+    print(f"Tercatat       : {recorded}/{hosts * 4} task x host")
+    print(f"Host lambat    : wall terbesar {slowest_wall} (critical task: {slow['critical_host']})")
+    print(f"Runtime module : {sum(1 for t in profile['tasks'] for v in t['hosts'].values() if v[2] is not None)} "
+          f"hasil dengan delta (command)")
+    print(f"Tanpa profil   : {min(without_profile):.2f}s | dengan profil: {min(with_profile):.2f}s "
+          f"| waktu di dalam plugin: {profile['profiler_seconds'] * 1000:.1f} ms "
+          f"({profile['profiler_seconds'] / profile['duration'] * 100:.2f}% run)")
+    ok = recorded == hosts * 4 and slowest_wall == 'local02' and summary['totals']['queue'] > 0
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 12,
+                           int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+                           int(sys.argv[3]) if len(sys.argv) > 3 else 2))
@@ -0,0 +1,192 @@
+# File: scripts/run_profiles.py
+# ============================
+# PROFIL WAKTU PER RUN PLAYBOOK (DIISI CALLBACK lab_profile, DIBACA /profile)
+# ============================
+# Satu file JSON per run di PROFILE_DIR. Data mentah per task x host:
+#   [antri, wall, runtime_module, status]
+#   antri   = task mulai -> worker dapat slot fork (delay karena `forks`)
+#   wall    = worker mulai -> hasil diterima (fork + koneksi + transfer + module)
+#   runtime = durasi yang dilaporkan module sendiri (delta/elapsed), None jika tidak ada
+# Ringkasan (task/host terlambat, overhead transport, critical path) dihitung
+# sekali saat run selesai dan ikut disimpan.
+import json
+import os
+import re
+import sys
+import time
+
+PROFILE_KEEP = 200  # Jumlah run yang disimpan
+
+DELTA = re.compile(r"^(\d+):(\d{2}):(\d{2}(?:\.\d+)?)$")
+
+
+def module_runtime(result):
+    """Durasi eksekusi module dari hasilnya (detik), None jika module tidak melaporkan"""
+    delta = result.get("delta")
+    if isinstance(delta, str):
+        match = DELTA.match(delta.strip())
+        if match:
+            hours, minutes, seconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    elapsed = result.get("elapsed")
+    if isinstance(elapsed, (int, float)) and not isinstance(elapsed, bool):
+        return float(elapsed)
+    return None
+
+
+def summarize(profile, top=10):
+    """Ringkasan: task & host terlambat, pemisahan overhead vs runtime, critical path"""
+    hosts = {}
+    tasks = []
+    for task in profile["tasks"]:
+        if not task["hosts"]:
+            continue
+        # Linear strategy: task selesai saat host terakhir selesai
+        finish = {host: queue + wall for host, (queue, wall, runtime, status) in task["hosts"].items()}
+        critical = max(finish, key=finish.get)
+        tasks.append({"name": task["name"], "action": task["action"], "duration": round(finish[critical], 3),
+                      "critical_host": critical, "hosts": len(task["hosts"])})
+        for host, (queue, wall, runtime, status) in task["hosts"].items():
+            entry = hosts.setdefault(host, {"wall": 0.0, "queue": 0.0, "runtime": 0.0, "overhead": 0.0,
+                                            "critical": 0.0, "tasks": 0, "slowest_task": None, "_slowest": -1.0})
+            entry["wall"] += wall
+            entry["queue"] += queue
+            entry["tasks"] += 1
+            if wall > entry["_slowest"]:
+                entry["_slowest"], entry["slowest_task"] = wall, task["name"]
+        hosts[critical]["critical"] += finish[critical]
+
+    # Overhead transport per host: wall - runtime untuk task yang melaporkan runtime;
+    # sisanya memakai baseline host (median sampel, atau task tercepat = hampir murni overhead)
+    for host, entry in hosts.items():
+        samples, walls = [], []
+        for task in profile["tasks"]:
+            values = task["hosts"].get(host)
+            if values is None or values[3] == "skipped":
+                continue
+            walls.append(values[1])
+            if values[2] is not None:
+                samples.append(max(values[1] - values[2], 0.0))
+        samples.sort()
+        baseline = samples[len(samples) // 2] if samples else (min(walls) if walls else 0.0)
+        entry["baseline_overhead"] = round(baseline, 3)
+        for task in profile["tasks"]:
+            values = task["hosts"].get(host)
+            if values is None:
+                continue
+            queue, wall, runtime, status = values
+            overhead = max(wall - runtime, 0.0) if runtime is not None else min(baseline, wall)
+            entry["overhead"] += overhead
+            entry["runtime"] += wall - overhead
+        del entry["_slowest"]
+        for key in ("wall", "queue", "runtime", "overhead", "critical"):
+            entry[key] = round(entry[key], 3)
+
+    total_wall = sum(entry["wall"] for entry in hosts.values())
+    total_overhead = sum(entry["overhead"] for entry in hosts.values())
+    critical_host = max(hosts, key=lambda h: hosts[h]["critical"]) if hosts else None
+    return {
+        "slowest_tasks": sorted(tasks, key=lambda t: t["duration"], reverse=True)[:top],
+        "slowest_hosts": sorted(hosts, key=lambda h: hosts[h]["wall"], reverse=True)[:top],
+        "hosts": hosts,
+        "critical_path": {
+            "host": critical_host,
+            "seconds": round(hosts[critical_host]["critical"], 3) if critical_host else 0.0,
+            "share": round(hosts[critical_host]["critical"] / profile["duration"], 3)
+            if critical_host and profile["duration"] else 0.0,
+        },
+        "totals": {
+            "wall": round(total_wall, 3),
+            "queue": round(sum(entry["queue"] for entry in hosts.values()), 3),
+            "overhead": round(total_overhead, 3),
+            "overhead_share": round(total_overhead / total_wall, 3) if total_wall else 0.0,
+        },
+    }
+
+
+# ---------- Store ----------
+def save_profile(directory, profile, keep=PROFILE_KEEP):
+    """Tulis <run>.json (atomic) lalu hapus run terlama di atas `keep`"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{profile['run']}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(profile, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    for run in list_runs(directory)[keep:]:
+        os.remove(os.path.join(directory, f"{run}.json"))
+    return path
+
+
+def list_runs(directory):
+    """ID run, terbaru dulu (ID diawali timestamp jadi urut secara leksikal)"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted((name[:-5] for name in names if name.endswith(".json")), reverse=True)
+
+
+def load_run(directory, run):
+    """Profil untuk ID run, nomor urut dari list_runs (1 = terbaru) atau "latest"; None jika tidak ada"""
+    runs = list_runs(directory)
+    if run in ("latest", "last"):
+        run = runs[0] if runs else None
+    elif run.isdigit() and 0 < int(run) <= len(runs) and run not in runs:
+        run = runs[int(run) - 1]
+    else:
+        # Prefix unik juga diterima (mis. tanggal saja)
+        matches = [r for r in runs if r == run] or [r for r in runs if r.startswith(run)]
+        run = matches[0] if len(matches) == 1 or run in matches else None
+    if run is None:
+        return None
+    try:
+        with open(os.path.join(directory, f"{run}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def format_report(profile, top=5):
+    """Laporan teks singkat (CLI dan /profile)"""
+    summary = profile["summary"]
+    totals = summary["totals"]
+    critical = summary["critical_path"]
+    lines = [
+        f"⏱️ PROFIL {profile['playbook']} ({profile['run']})",
+        f"🕒 {time.strftime('%d-%m %H:%M', time.localtime(profile['started']))} | durasi {profile['duration']:.1f}s | "
+        f"{len(summary['hosts'])} host | forks {profile.get('forks') or '-'}",
+        "",
+    ]
+    if critical["host"]:
+        lines.append(f"🧭 Critical path: {critical['host']} ({critical['seconds']:.1f}s, "
+                     f"{critical['share'] * 100:.0f}% dari run)")
+    lines.append(f"🔌 Overhead koneksi/transport: {totals['overhead']:.1f}s dari {totals['wall']:.1f}s "
+                 f"({totals['overhead_share'] * 100:.0f}%) | antri fork: {totals['queue']:.1f}s")
+    lines.append("")
+    lines.append("🐢 Task terlama:")
+    for task in summary["slowest_tasks"][:top]:
+        lines.append(f"• {task['duration']:.1f}s {task['name']} (terlama: {task['critical_host']})")
+    lines.append("")
+    lines.append("🖥️ Host terlama:")
+    for host in summary["slowest_hosts"][:top]:
+        entry = summary["hosts"][host]
+        lines.append(f"• {host}: {entry['wall']:.1f}s (overhead {entry['overhead']:.1f}s, "
+                     f"antri {entry['queue']:.1f}s) - {entry['slowest_task']}")
+    if profile.get("controller"):
+        controller = profile["controller"]
+        lines.append("")
+        lines.append(f"🧠 Control node: CPU {controller['cpu_user'] + controller['cpu_system']:.1f}s, "
+                     f"RSS maks {controller['max_rss_mb']:.0f} MB, profiler {profile.get('profiler_seconds', 0) * 1000:.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # python scripts/run_profiles.py [run|latest] [direktori]
+    default_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "profiles")
+    directory = sys.argv[2] if len(sys.argv) > 2 else default_dir
+    profile = load_run(directory, sys.argv[1] if len(sys.argv) > 1 else "latest")
+    if profile is None:
+        print(f"Run tidak ditemukan di {directory}")
+        sys.exit(1)
+    print(format_report(profile, top=10))
@@ -1,117 +1,174 @@
-    import os
-import subprocess
+import os
+import asyncio
 import time
 import logging
-import telegram
-from telegram import Bot
-from telegram.ext import Updater, CommandHandler
-
-# Hanya matikan logging apscheduler saja
-logging.getLogger('apscheduler').setLevel(logging.CRITICAL)
+from telegram.ext import Application, CommandHandler
+
+from fleet_probe import win_ping_check
+from inventory import Inventory
+from ansible_worker import AnsibleWorker
+from playbook_jobs import JobManager, SUCCESS, TIMEOUT, CANCELLED
+from playbook_results import PlaybookResult, event_env
+from metrics_store import MetricsStore, sparkline
+from artifact_cache import serve_in_thread
+from run_profiles import list_runs, load_run, format_report
+from host_registry import (HostRegistry, PendingQueue, start_udp_receiver, start_http_receiver,
+                           format_age, ONLINE, OFFLINE, UNKNOWN)
+
+# Hanya matikan logging httpx saja
+logging.getLogger('httpx').setLevel(logging.WARNING)
 
 try:
     from config import (
         TELEGRAM_TOKEN, CHAT_ID, PROJECT_PATH,
-        WINDOWS_INVENTORY_PATH, WINDOWS_SOFTWARE_PLAYBOOK
+        WINDOWS_INVENTORY_PATH, WINDOWS_SOFTWARE_PLAYBOOK, WINDOWS_GROUP,
+        PROBE_CONCURRENCY, PROBE_TIMEOUT, PROBE_FULL_CHECK,
+        JOB_MAX_CONCURRENT, JOB_DEFAULT_TIMEOUT, JOB_LIMITS,
+        ANSIBLE_WORKER, METRICS_DB_PATH, METRICS_COMPACT_INTERVAL, PROFILE_DIR,
+        ARTIFACT_CACHE_URL, ARTIFACT_CACHE_PORT, ARTIFACT_CACHE_DIR,
+        HEARTBEAT_UDP_PORT, HEARTBEAT_HTTP_PORT, HEARTBEAT_TOKEN, HEARTBEAT_TTL,
+        REGISTRY_PROBE_INTERVAL, INSTALL_QUEUE_DELAY, INSTALL_QUEUE_MAX_AGE
     )
 except ImportError as e:
     print(f"❌ Error: File config.py tidak ditemukan! {e}")
     exit(1)
 
-def start(update, context):
+# Inventory di-parse sekali dan hanya dimuat ulang jika file berubah
+inventory = Inventory(WINDOWS_INVENTORY_PATH)
+
+# Semua playbook panjang dijalankan lewat job manager, bukan di dalam handler
+job_manager = JobManager(
+    max_concurrent=JOB_MAX_CONCURRENT,
+    limits=JOB_LIMITS,
+    default_timeout=JOB_DEFAULT_TIMEOUT
+)
+
+# Worker ansible persisten untuk command ad-hoc cepat (tanpa fork CLI tiap command)
+ansible_worker = AnsibleWorker(WINDOWS_INVENTORY_PATH, cwd=PROJECT_PATH)
+
+# Histori metric per host dari playbook (diisi callback lab_metrics)
+metrics_store = MetricsStore(METRICS_DB_PATH)
+
+# Status PC dari heartbeat + probe background; command menjawab dari sini tanpa sweep win_ping
+registry = HostRegistry(ttl=HEARTBEAT_TTL, token=HEARTBEAT_TOKEN, probe_interval=REGISTRY_PROBE_INTERVAL)
+
+# Install untuk PC offline, dijalankan otomatis saat PC online (dispatch diisi di post_init)
+install_queue = PendingQueue(registry, batch_delay=INSTALL_QUEUE_DELAY, max_age=INSTALL_QUEUE_MAX_AGE)
+
+# Di atas jumlah ini /lab_status hanya merinci PC yang tidak online (batas panjang pesan Telegram)
+STATUS_LIST_LIMIT = 40
+
+# Nama task lab_choco di install_common_software_fixed.yml yang hasil per paketnya dilaporkan
+INSTALL_TASK = "Install missing software"
+# Task lab_win_fingerprint (Playbooks/tasks/fingerprint_check.yml): PC yang tidak berubah dilewati
+FINGERPRINT_TASK = "Check desired-state fingerprint (Windows)"
+
+async def run_ansible(cmd, timeout):
+    """Jalankan ansible ad-hoc dengan callback lab_events; hasil di-ingest sambil proses berjalan"""
+    result = PlaybookResult()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        cwd=PROJECT_PATH,
+        env=event_env(PROJECT_PATH, adhoc=True)
+    )
+
+    async def consume():
+        async for raw in proc.stdout:
+            result.feed(raw.decode(errors="replace"))
+        return await proc.wait()
+
+    try:
+        returncode = await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return returncode, result
+
+async def run_adhoc(pattern, module, timeout):
+    """Ad-hoc lewat worker persisten; fallback ke CLI jika worker tidak tersedia"""
+    if ANSIBLE_WORKER:
+        result = PlaybookResult()
+        try:
+            returncode = await ansible_worker.adhoc(pattern, module, result=result, timeout=timeout)
+            return returncode, result
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            print(f"Worker ansible error, fallback ke CLI: {e}")
+
+    return await run_ansible(["ansible", pattern, "-i", WINDOWS_INVENTORY_PATH, "-m", module], timeout)
+
+async def start(update, context):
     if update and update.message:
-        update.message.reply_text(
+        await update.message.reply_text(
             "🤖 WINDOWS LAB AUTOMATION BOT\n\n"
             "📋 PERINTAH YANG TERSEDIA:\n"
             "/start - Menu utama\n"
             "/lab_status - Status PC Lab\n"
-            "/windows_ping - Test koneksi Windows PCs\n"
-            "/install_software - Install software umum\n\n"
+            "/windows_ping [all] - Test koneksi Windows PCs\n"
+            "/install_software [force] - Install software umum\n"
+            "/jobs - Daftar job playbook\n"
+            "/job <id> - Detail job\n"
+            "/cancel <id> - Batalkan job\n"
+            "/trend <host> <metric> [hari] - Tren metric host\n"
+            "/profile [run] - Task & host terlambat per run\n\n"
             "💡 Gunakan untuk manage Windows Lab PCs"
         )
 
-def lab_status(update, context):
-    """Status semua Windows PC dengan handling PC offline"""
+def registry_targets():
+    """Host group lab dari inventory (cache) untuk registry"""
+    return inventory.probe_targets(WINDOWS_GROUP)
+
+async def lab_status(update, context):
+    """Status semua Windows PC dari registry (heartbeat + probe background), tanpa sweep"""
     if not update or not update.message:
         return
 
-    update.message.reply_text("🔍 Scanning semua PC di lab...")
-
     try:
-        # 1. GET HOSTS DARI INVENTORY (tanpa test koneksi dulu)
-        inventory_hosts = {}
-        with open(WINDOWS_INVENTORY_PATH, 'r') as f:
-            lines = f.readlines()
-            in_windows_section = False
-
-            for line in lines:
-                line = line.strip()
-                if line == '[windows_lab]':
-                    in_windows_section = True
-                    continue
-                elif line.startswith('['):
-                    in_windows_section = False
-                    continue
-
-                if in_windows_section and line and not line.startswith((';', '#')):
-                    parts = line.split()
-                    if parts:
-                        host_name = parts[0]
-                        ip = "N/A"
-                        for part in parts:
-                            if part.startswith('ansible_host='):
-                                ip = part.split('=')[1]
-                                break
-                        inventory_hosts[host_name] = ip
-
-        # 2. TEST KONEKSI DENGAN TIMEOUT LEBIH PENDEK
+        registry.sync(registry_targets())
+        rows = registry.snapshot()
+
         message = "🖥️ *WINDOWS LAB STATUS*\n"
         message += "══════════════════════════════════════\n\n"
 
-        if inventory_hosts:
-            message += f"📋 *DI INVENTORY:* {len(inventory_hosts)} PC\n\n"
-
-            # Test koneksi per PC dengan timeout pendek
-            online_pcs = []
-            offline_pcs = []
-
-            for host_name, ip in sorted(inventory_hosts.items()):
-                try:
-                    # Test individual PC dengan timeout cepat
-                    ping_result = subprocess.run(
-                        ["ansible", host_name, "-i", WINDOWS_INVENTORY_PATH, "-m", "win_ping"],
-                        capture_output=True,
-                        text=True,
-                        cwd=PROJECT_PATH,
-                        timeout=10  # Timeout pendek per PC
-                    )
-
-                    if ping_result.returncode == 0:
-                        online_pcs.append(host_name)
-                        message += f"🟢 {host_name}\n"
-                        message += f"   📡 `{ip}`\n"
-                    else:
-                        offline_pcs.append(host_name)
-                        message += f"🔴 {host_name}\n"
-                        message += f"   📡 `{ip}`\n"
-
-                except subprocess.TimeoutExpired:
-                    offline_pcs.append(host_name)
-                    message += f"🔴 {host_name} (Timeout)\n"
-                    message += f"   📡 `{ip}`\n"
-                except Exception:
-                    offline_pcs.append(host_name)
-                    message += f"🔴 {host_name} (Error)\n"
-                    message += f"   📡 `{ip}`\n"
-
-                message += "\n"
+        if rows:
+            message += f"📋 *DI INVENTORY:* {len(rows)} PC\n\n"
+
+            counts = {ONLINE: 0, OFFLINE: 0, UNKNOWN: 0}
+            detail = len(rows) <= STATUS_LIST_LIMIT
+            for host, status, age, state in rows:
+                counts[status] += 1
+                if status == ONLINE:
+                    if not detail:
+                        continue
+                    latency = f", {state['latency'] * 1000:.0f} ms" if state["source"] == "probe" else ""
+                    message += f"🟢 {host} ({state['source']} {format_age(age)} lalu{latency})\n"
+                elif status == OFFLINE:
+                    seen = "terakhir terlihat" if state["last_seen"] is not None else "dicek"
+                    reason = f" - {state['error']}" if state["error"] else ""
+                    message += f"🔴 {host} ({seen} {format_age(age)} lalu{reason})\n"
+                else:
+                    message += f"❔ {host} (belum dicek)\n"
+                if detail:
+                    message += f"   📡 `{state['ip']}`\n\n"
+            if not detail:
+                message += f"_(PC online tidak dirinci, {counts[ONLINE]} PC)_\n\n"
 
             # SUMMARY
             message += "══════════════════════════════════════\n"
-            message += f"*📊 REAL-TIME STATUS:*\n"
-            message += f"🟢 Online: `{len(online_pcs)}` PC\n"
-            message += f"🔴 Offline: `{len(offline_pcs)}` PC\n"
-            message += f"📟 Total: `{len(inventory_hosts)}` PC\n\n"
+            message += f"*📊 STATUS REGISTRY:*\n"
+            message += f"🟢 Online: `{counts[ONLINE]}` PC\n"
+            message += f"🔴 Offline: `{counts[OFFLINE]}` PC\n"
+            if counts[UNKNOWN]:
+                message += f"❔ Belum dicek: `{counts[UNKNOWN]}` PC (probe background berjalan)\n"
+            message += f"📟 Total: `{len(rows)}` PC\n"
+            message += f"💓 Heartbeat TTL `{HEARTBEAT_TTL}s`, probe cadangan tiap `{REGISTRY_PROBE_INTERVAL}s`\n"
+            if install_queue.pending:
+                message += f"📥 Antrian install: `{len(install_queue.pending)}` PC (otomatis saat online)\n"
+            message += "\n"
 
         else:
             message += "❌ *Tidak ada PC terdeteksi di inventory!*\n\n"
@@ -119,50 +176,50 @@ def lab_status(update, context):
         # QUICK ACTIONS
         message += "*🚀 QUICK ACTIONS:*\n"
         message += "`/windows_ping` - Test koneksi detail\n"
-        message += "`/install_software` - Install aplikasi (hanya PC online)\n"
+        message += "`/install_software` - Install aplikasi (PC offline diantrikan)\n"
         message += "`/start` - Menu utama"
 
-        update.message.reply_text(message, parse_mode="Markdown")
+        await update.message.reply_text(message, parse_mode="Markdown")
 
     except Exception as e:
-        update.message.reply_text(f"❌ *Error:* `{str(e)}`\n\n💡 Periksa file inventory dan koneksi network.", parse_mode="Markdown")
+        await update.message.reply_text(f"❌ *Error:* `{str(e)}`\n\n💡 Periksa file inventory dan koneksi network.", parse_mode="Markdown")
 
-def windows_ping(update, context):
-    """Test koneksi ke semua Windows PCs dengan handling PC offline"""
+async def windows_ping(update, context):
+    """Test koneksi Windows PCs: PC online di registry dijawab langsung, sisanya di-win_ping.
+
+    `/windows_ping all` memaksa win_ping ke semua PC.
+    """
     if not update or not update.message:
         return
 
-    update.message.reply_text("🔄 Testing koneksi ke Windows PCs...")
+    await update.message.reply_text("🔄 Testing koneksi ke Windows PCs...")
 
     try:
         start_time = time.time()
-
-        # Gunakan --one-line untuk output yang lebih clean
-        result = subprocess.run(
-            ["ansible", "windows_lab", "-i", WINDOWS_INVENTORY_PATH, "-m", "win_ping", "--one-line"],
-            capture_output=True,
-            text=True,
-            cwd=PROJECT_PATH,
-            timeout=60
-        )
+        registry.sync(registry_targets())
+        full = bool(context.args) and context.args[0].lower() in ("all", "semua")
+        targets = sorted(registry.hosts) if full else registry.offline_hosts()
+        pinged = set(targets)
+        online_pcs = [host for host in registry.hosts if host not in pinged]
+        offline_pcs = []
+
+        returncode = 0
+        if targets:
+            returncode, result = await run_adhoc(inventory.limit(targets), "win_ping", timeout=60)
+            if returncode in (0, 2, 4):
+                for host in result.succeeded_hosts():
+                    registry.mark_seen(host, "win_ping")
+                    online_pcs.append(host)
+                for host in result.unreachable_hosts() + result.failed_hosts():
+                    registry.mark_offline(host, "win_ping gagal")
+                    offline_pcs.append(host)
         execution_time = time.time() - start_time
 
         message = f"📡 *WINDOWS PING TEST*\n"
-        message += f"⏱️ Waktu: {execution_time:.1f}s\n\n"
-
-        if result.returncode == 0 or result.returncode == 4:  # 4 = some hosts unreachable
-            lines = result.stdout.split('\n')
-            online_pcs = []
-            offline_pcs = []
-
-            for line in lines:
-                if 'SUCCESS' in line:
-                    pc_name = line.split('|')[0].strip()
-                    online_pcs.append(pc_name)
-                elif 'UNREACHABLE' in line:
-                    pc_name = line.split('|')[0].strip()
-                    offline_pcs.append(pc_name)
+        message += f"⏱️ Waktu: {execution_time:.1f}s\n"
+        message += f"🔎 Di-ping: {len(targets)} PC | dari registry: {len(registry.hosts) - len(targets)} PC\n\n"
 
+        if returncode in (0, 2, 4):  # 2 = some hosts failed, 4 = some hosts unreachable
             message += f"✅ *ONLINE:* {len(online_pcs)} PC\n"
             for pc in sorted(online_pcs):
                 message += f"   • {pc}\n"
@@ -176,153 +233,372 @@ def windows_ping(update, context):
 
         else:
             message += "❌ *GAGAL TESTING*\n"
-            message += f"Kode Error: `{result.returncode}`\n\n"
+            message += f"Kode Error: `{returncode}`\n\n"
             message += "💡 *Solusi:*\n"
             message += "• Periksa file inventory\n"
             message += "• Pastikan beberapa PC online\n"
             message += "• Cek koneksi network"
 
-        update.message.reply_text(message, parse_mode="Markdown")
+        await update.message.reply_text(message, parse_mode="Markdown")
 
-    except subprocess.TimeoutExpired:
-        update.message.reply_text("⏰ *Timeout: Testing terlalu lama*\n\nBeberapa PC mungkin sedang booting atau offline.", parse_mode="Markdown")
+    except asyncio.TimeoutError:
+        await update.message.reply_text("⏰ *Timeout: Testing terlalu lama*\n\nBeberapa PC mungkin sedang booting atau offline.", parse_mode="Markdown")
     except Exception as e:
-        update.message.reply_text(f"❌ *Error:* `{str(e)}`", parse_mode="Markdown")
+        await update.message.reply_text(f"❌ *Error:* `{str(e)}`", parse_mode="Markdown")
+
+def summarize_install(result):
+    """{software: {installed/present/failed: [host], versions: {versi}}} dari hasil lab_choco per host"""
+    software = {}
+    for host, packages in result.task_reports(INSTALL_TASK).items():
+        for pkg in packages.values():
+            info = software.setdefault(pkg.get("name") or pkg.get("package"),
+                                       {"installed": [], "present": [], "failed": [], "versions": set()})
+            status = pkg.get("status")
+            if status == "failed":
+                info["failed"].append(host)
+            elif status == "present":
+                info["present"].append(host)
+            else:  # installed / updated
+                info["installed"].append(host)
+            if pkg.get("version") and status != "failed":
+                info["versions"].add(pkg["version"])
+    return software
+
+def unchanged_hosts(result):
+    """{host: detik yang dihemat} untuk PC yang dilewati karena fingerprint cocok"""
+    return {host: report.get("saved_seconds") or 0
+            for host, report in result.task_reports(FINGERPRINT_TASK).items() if report.get("matched")}
+
+def format_versions(versions):
+    return f"`{', '.join(sorted(versions))}`" if versions else ""
+
+def format_counts(info):
+    parts = []
+    if info["installed"]:
+        parts.append(f"{len(info['installed'])} baru")
+    if info["present"]:
+        parts.append(f"{len(info['present'])} sudah ada")
+    return f" ({', '.join(parts)})" if parts else ""
+
+def format_install_result(job):
+    """Susun laporan hasil instalasi dari job yang sudah selesai"""
+    online_pcs = job.meta.get("hosts", [])
+
+    message = f"📦 *HASIL INSTALASI SOFTWARE* (job #{job.id})\n"
+    message += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
+    message += f"⏱️ Waktu: {job.duration:.1f}s\n"
+    message += f"🖥️ PC Target: {len(online_pcs)}\n"
+    unchanged = unchanged_hosts(job.result)
+    if unchanged:
+        message += (f"⏭️ Tidak berubah sejak install terakhir: {len(unchanged)} PC dilewati "
+                    f"(hemat ~{sum(unchanged.values()):.0f}s, paksa dengan argumen force)\n")
+    message += "\n"
+
+    if job.status == TIMEOUT:
+        message += "⏰ *Timeout: Proses terlalu lama*\n\nInstalasi Chocolatey butuh waktu lebih lama di PC baru."
+        return message
+
+    if job.status == CANCELLED:
+        message += "🛑 *Instalasi dibatalkan.*"
+        return message
+
+    software = summarize_install(job.result)
+    # Task install memakai ignore_errors, jadi rc 0 belum berarti semua paket terpasang
+    any_failed = any(info["failed"] for info in software.values())
+
+    if job.returncode == 0 and not any_failed:
+        message += "✅ *SEMUA SOFTWARE BERHASIL DIINSTALL!*\n\n"
+        if software:
+            message += "📋 Software terpasang:\n"
+        for sw_name, info in sorted(software.items()):
+            message += f"• {sw_name} {format_versions(info['versions'])}{format_counts(info)}\n"
+
+    elif job.returncode in (0, 2, 4):  # Sebagian paket/host gagal atau unreachable
+        message += "⚠️ *SEBAGIAN SOFTWARE BERHASIL DIINSTALL*\n\n"
+
+        # Hasil per software x PC dari module lab_choco (via event callback, bukan scraping stdout)
+        installed_software = [f"{sw_name} {format_versions(info['versions'])}{format_counts(info)}"
+                              for sw_name, info in sorted(software.items())
+                              if info["installed"] or info["present"]]
+        failed_software = [f"{sw_name} ({', '.join(sorted(info['failed']))})"
+                           for sw_name, info in sorted(software.items()) if info["failed"]]
+
+        if installed_software:
+            message += "✅ *Berhasil:*\n"
+            for sw in installed_software:
+                message += f"• {sw}\n"
+
+        if failed_software:
+            message += "\n❌ *Gagal:*\n"
+            for sw in failed_software:
+                message += f"• {sw}\n"
+
+        # Host yang gagal sebelum module jalan (mis. Chocolatey belum ada)
+        no_report = [host for host in job.result.failed_hosts() if host not in job.result.task_reports(INSTALL_TASK)]
+        if no_report:
+            message += f"\n🍫 *Gagal sebelum instalasi:* {', '.join(no_report)}\n"
+
+        unreachable = job.result.unreachable_hosts()
+        if unreachable:
+            message += f"\n🔴 *PC terputus:* {', '.join(unreachable)}\n"
+
+        message += f"\n💡 *PC baru mungkin butuh:*\n- Install Chocolatey manual\n- Restart setelah instalasi\n- Koneksi internet stabil"
+
+    else:
+        message += "❌ *INSTALASI GAGAL!*\n\n"
+        message += f"Error Code: {job.returncode}\n\n"
+
+        # Deteksi kemungkinan penyebab
+        if "choco" in job.stderr.lower() or "chocolatey" in job.stderr.lower():
+            message += "🍫 *Kemungkinan Chocolatey belum terinstall di PC target!*\n"
+            message += "💡 Solusi:\n1. Jalankan playbook lagi (bot sudah otomatis install Chocolatey di awal)\n"
+            message += "2. Pastikan PC online dan terhubung ke internet\n\n"
+        else:
+            message += "🔧 *Kemungkinan masalah:*\n- Tidak ada koneksi internet\n- Permission issues\n\n"
+
+        message += "💡 *Solusi Umum:*\n1. Jalankan setup_chocolatey.ps1 manual di PC baru\n2. Pastikan koneksi internet\n3. Run sebagai Administrator"
 
-def install_software(update, context):
-    """Install common software dengan detailed reporting"""
+    return message
+
+def cache_vars():
+    """Extra vars supaya playbook download lewat artifact cache (kosong jika nonaktif)"""
+    return ["-e", f"artifact_cache_url={ARTIFACT_CACHE_URL}"] if ARTIFACT_CACHE_URL else []
+
+def submit_install(bot, chat_ids, hosts, queued=False, force=False):
+    """Submit job install ke `hosts`; laporan dikirim ke semua chat di `chat_ids`.
+    force: abaikan fingerprint, PC yang tidak berubah tetap diverifikasi/di-install"""
+    async def on_done(job):
+        for chat_id in chat_ids:
+            await bot.send_message(chat_id=chat_id, text=format_install_result(job), parse_mode="Markdown")
+        failed = sorted(sw for sw, info in summarize_install(job.result).items() if info["failed"])
+        if job.status == SUCCESS and failed:
+            await send_notification(bot, f"⚠️ INSTALL ISSUES - Gagal: {', '.join(failed)}")
+        elif job.status == SUCCESS:
+            await send_notification(bot, f"✅ INSTALL SUCCESS - {job.duration:.1f}s")
+        elif job.status == TIMEOUT:
+            await send_notification(bot, "INSTALL TIMEOUT")
+        elif job.status != CANCELLED:
+            await send_notification(bot, f"⚠️ INSTALL ISSUES - Code {job.returncode}")
+
+    return job_manager.submit(
+        "install_software",
+        ["ansible-playbook", "-i", WINDOWS_INVENTORY_PATH, WINDOWS_SOFTWARE_PLAYBOOK, "--limit", inventory.limit(hosts)]
+        + cache_vars() + (["-e", "fingerprint_force=true"] if force else []),
+        cwd=PROJECT_PATH,
+        playbook=WINDOWS_SOFTWARE_PLAYBOOK,
+        env=event_env(PROJECT_PATH),
+        on_done=on_done,
+        meta={"hosts": hosts, "queued": queued, "force": force},
+        result=PlaybookResult()
+    )
+
+async def install_software(update, context):
+    """Install common software ke PC online (dari registry); PC offline diantrikan sampai online.
+    `/install_software force` mengabaikan fingerprint (PC yang tidak berubah tetap diproses)"""
     if not update or not update.message:
         return
 
     try:
-        update.message.reply_text("🔍 Memulai proses instalasi...")
+        await update.message.reply_text("🔍 Memulai proses instalasi...")
 
         # Validasi file
         if not os.path.exists(WINDOWS_SOFTWARE_PLAYBOOK):
-            update.message.reply_text("❌ File playbook tidak ditemukan!", parse_mode="Markdown")
+            await update.message.reply_text("❌ File playbook tidak ditemukan!", parse_mode="Markdown")
             return
 
-        # Check PC online
-        update.message.reply_text("🌐 Checking koneksi PC...")
-        ping_result = subprocess.run(
-            ["ansible", "windows_lab", "-i", WINDOWS_INVENTORY_PATH, "-m", "win_ping", "--one-line"],
-            capture_output=True,
-            text=True,
-            cwd=PROJECT_PATH,
-            timeout=30
-        )
-
-        online_pcs = []
-        if ping_result.returncode == 0 or ping_result.returncode == 4:
-            for line in ping_result.stdout.split('\n'):
-                if 'SUCCESS' in line:
-                    pc_name = line.split('|')[0].strip()
-                    online_pcs.append(pc_name)
+        # PC online dari registry (heartbeat/probe), tanpa win_ping ke seluruh group
+        registry.sync(registry_targets())
+        online_pcs = sorted(registry.online_hosts())
+        offline_pcs = sorted(registry.offline_hosts())
+        chat_id = update.effective_chat.id
+
+        install_queue.discard(online_pcs)
+        if offline_pcs:
+            install_queue.add(offline_pcs, chat_id=chat_id)
+            await update.message.reply_text(
+                f"📥 {len(offline_pcs)} PC offline masuk antrian install.\n"
+                f"🔌 Install otomatis saat PC online (berlaku {format_age(INSTALL_QUEUE_MAX_AGE)})."
+            )
 
         if not online_pcs:
-            update.message.reply_text("❌ Tidak ada PC yang online!", parse_mode="Markdown")
+            await update.message.reply_text("❌ Tidak ada PC yang online saat ini!", parse_mode="Markdown")
             return
 
-        update.message.reply_text(f"🚀 Memulai instalasi ke {len(online_pcs)} PC...\n⏳ Proses mungkin memakan waktu 10-20 menit...")
+        force = bool(context.args) and context.args[0].lower() == "force"
+        job = submit_install(context.bot, [chat_id], online_pcs, force=force)
 
-        start_time = time.time()
-        result = subprocess.run(
-            ["ansible-playbook", "-i", WINDOWS_INVENTORY_PATH, WINDOWS_SOFTWARE_PLAYBOOK, "--limit", ",".join(online_pcs)],
-            capture_output=True,
-            text=True,
-            cwd=PROJECT_PATH,
-            timeout=2400  # 40 menit
+        await update.message.reply_text(
+            f"🚀 Job #{job.id}: instalasi ke {len(online_pcs)} PC dimulai...\n"
+            f"⏳ Proses mungkin memakan waktu 10-20 menit...\n"
+            f"💡 Cek progress dengan /job {job.id}, batalkan dengan /cancel {job.id}"
         )
-        execution_time = time.time() - start_time
 
-        # PROCESS RESULTS
-        message = f"📦 *HASIL INSTALASI SOFTWARE*\n"
-        message += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
-        message += f"⏱️ Waktu: {execution_time:.1f}s\n"
-        message += f"🖥️ PC Target: {len(online_pcs)}\n\n"
-
-        if result.returncode == 0:
-            message += "✅ *SEMUA SOFTWARE BERHASIL DIINSTALL!*\n\n"
-            message += "📋 Software yang terinstall:\n"
-            message += "• 🌐 Google Chrome\n• 🦊 Firefox\n• 💻 VS Code\n• 🎬 VLC\n• 📝 Notepad++\n• 🗜️ 7-Zip\n• 🐍 Python\n• 🔧 Git\n"
-
-        elif result.returncode == 4:  # Some failures
-            message += "⚠️ *SEBAGIAN SOFTWARE BERHASIL DIINSTALL*\n\n"
-
-            # Parse output untuk lihat apa yang berhasil/gagal
-            lines = result.stdout.split('\n')
-            installed_software = []
-            failed_software = []
-
-            software_map = {
-                'googlechrome': 'Google Chrome',
-                'firefox': 'Firefox',
-                'vscode': 'VS Code',
-                'vlc': 'VLC',
-                'notepadplusplus': 'Notepad++',
-                '7zip': '7-Zip',
-                'python': 'Python',
-                'git': 'Git'
-            }
-
-            for line in lines:
-                for sw_key, sw_name in software_map.items():
-                    if f'Install {sw_key}' in line and 'ok=' in line:
-                        if 'changed=1' in line:
-                            installed_software.append(sw_name)
-                        elif 'failed=' in line and 'failed=0' not in line:
-                            failed_software.append(sw_name)
-
-            if installed_software:
-                message += "✅ *Berhasil:*\n"
-                for sw in installed_software:
-                    message += f"• {sw}\n"
-
-            if failed_software:
-                message += "\n❌ *Gagal:*\n"
-                for sw in failed_software:
-                    message += f"• {sw}\n"
-
-            message += f"\n💡 *PC baru mungkin butuh:*\n- Install Chocolatey manual\n- Restart setelah instalasi\n- Koneksi internet stabil"
+    except Exception as e:
+        await update.message.reply_text(f"💥 *Error:* {str(e)}", parse_mode="Markdown")
+        await send_notification(context.bot, f"INSTALL ERROR: {str(e)}")
+
+async def dispatch_queued_install(bot, entries):
+    """Install untuk PC antrian yang baru online (dipanggil install_queue per batch)"""
+    hosts = sorted(entries)
+    chat_ids = sorted({meta["chat_id"] for meta in entries.values()})
+    job = submit_install(bot, chat_ids, hosts, queued=True)
+    names = ", ".join(hosts[:10]) + (f" +{len(hosts) - 10}" if len(hosts) > 10 else "")
+    for chat_id in chat_ids:
+        await bot.send_message(
+            chat_id=chat_id,
+            text=f"🔌 {len(hosts)} PC antrian sudah online: {names}\n"
+                 f"🚀 Job #{job.id}: instalasi dimulai, cek progress dengan /job {job.id}"
+        )
 
-        else:
-    message += "❌ *INSTALASI GAGAL!*\n\n"
-    message += f"Error Code: {result.returncode}\n\n"
+def parse_job_id(context):
+    """Ambil job ID dari argumen command (/job 3, /cancel #3)"""
+    if not context.args:
+        return None
+    try:
+        return int(context.args[0].lstrip('#'))
+    except ValueError:
+        return None
 
-        # Deteksi kemungkinan penyebab
-        if "choco" in result.stderr.lower() or "chocolatey" in result.stderr.lower():
-                message += "🍫 *Kemungkinan Chocolatey belum terinstall di PC target!*\n"
-                message += "💡 Solusi:\n1. Jalankan playbook lagi (bot sudah otomatis install Chocolatey di awal)\n"
-                message += "2. Pastikan PC online dan terhubung ke internet\n\n"
-        else:
-                message += "🔧 *Kemungkinan masalah:*\n- Tidak ada koneksi internet\n- Permission issues\n\n"
+async def jobs(update, context):
+    """Daftar job playbook terakhir"""
+    if not update or not update.message:
+        return
 
-        message += "💡 *Solusi Umum:*\n1. Jalankan setup_chocolatey.ps1 manual di PC baru\n2. Pastikan koneksi internet\n3. Run sebagai Administrator"
+    all_jobs = job_manager.list_jobs()
+    if not all_jobs:
+        await update.message.reply_text("📭 Belum ada job.")
+        return
+
+    message = "🗂️ *DAFTAR JOB*\n"
+    message += f"🔄 Berjalan: {job_manager.running_count()}/{job_manager.max_concurrent}\n\n"
+    for job in all_jobs[:15]:
+        message += f"{job.summary()}\n"
 
-        update.message.reply_text(message, parse_mode="Markdown")
+    await update.message.reply_text(message, parse_mode="Markdown")
 
-        # Notification
-        if result.returncode == 0:
-            send_notification(f"✅ INSTALL SUCCESS - {execution_time:.1f}s")
+async def job_detail(update, context):
+    """Detail satu job"""
+    if not update or not update.message:
+        return
+
+    job_id = parse_job_id(context)
+    job = job_manager.get(job_id) if job_id is not None else None
+    if job is None:
+        await update.message.reply_text("❌ Job tidak ditemukan. Gunakan `/job <id>`", parse_mode="Markdown")
+        return
+
+    message = f"{job.summary()}\n\n"
+    message += f"🖥️ PC Target: {len(job.meta.get('hosts', []))}\n"
+    message += f"⏱️ Timeout: {job.timeout}s\n"
+    if job.returncode is not None:
+        message += f"🔢 Return code: {job.returncode}\n"
+
+    # Progress sementara dari event yang sudah masuk
+    result = job.result
+    if result is not None and result.tasks:
+        message += f"\n📋 Task terakhir: {result.tasks[-1]}\n"
+        message += f"✅ OK: {len(result.succeeded_hosts())} | "
+        message += f"❌ Gagal: {len(result.failed_hosts())} | "
+        message += f"🔴 Unreachable: {len(result.unreachable_hosts())}\n"
+
+    await update.message.reply_text(message)
+
+async def cancel_job(update, context):
+    """Batalkan job yang masih antri/berjalan"""
+    if not update or not update.message:
+        return
+
+    job_id = parse_job_id(context)
+    if job_id is not None and job_manager.cancel(job_id):
+        await update.message.reply_text(f"🛑 Job #{job_id} dibatalkan.")
+    else:
+        await update.message.reply_text("❌ Job tidak ditemukan atau sudah selesai.")
+
+async def trend(update, context):
+    """Tren metric satu host: /trend pc01 cpu_percent 7"""
+    if not update or not update.message:
+        return
+
+    args = context.args or []
+    if not args:
+        hosts = metrics_store.hosts()
+        message = "📈 Gunakan `/trend <host> <metric> [hari]`\n\n"
+        message += f"🖥️ Host dengan data: {', '.join(hosts[:30]) or '-'}"
+        if len(hosts) > 30:
+            message += f" (+{len(hosts) - 30})"
+        await update.message.reply_text(message, parse_mode="Markdown")
+        return
+
+    host = args[0]
+    metrics = metrics_store.host_metrics(host)
+    if len(args) < 2 or args[1] not in metrics:
+        if not metrics:
+            await update.message.reply_text(f"📭 Belum ada data metric untuk {host}.")
         else:
-            send_notification(f"⚠️ INSTALL ISSUES - Code {result.returncode}")
+            await update.message.reply_text(f"📊 Metric untuk {host}: {', '.join(metrics)}")
+        return
 
-    except subprocess.TimeoutExpired:
-        update.message.reply_text("⏰ *Timeout: Proses terlalu lama*\n\nInstalasi Chocolatey butuh waktu lebih lama di PC baru.", parse_mode="Markdown")
-        send_notification("INSTALL TIMEOUT")
-    except Exception as e:
-        update.message.reply_text(f"💥 *Error:* {str(e)}", parse_mode="Markdown")
-        send_notification(f"INSTALL ERROR: {str(e)}")
+    metric = args[1]
+    try:
+        days = max(1, min(int(args[2]), 365)) if len(args) > 2 else 7
+    except ValueError:
+        days = 7
+
+    now = int(time.time())
+    summary = metrics_store.summary(host, metric, now - days * 86400, now)
+    if summary is None:
+        await update.message.reply_text(f"📭 Tidak ada data {metric} untuk {host} dalam {days} hari terakhir.")
+        return
+
+    message = f"📈 TREN {metric} - {host} ({days} hari)\n\n"
+    message += f"{sparkline(summary['buckets'])}\n\n"
+    message += f"⬇️ Min: {summary['min']:.1f} | ⬆️ Max: {summary['max']:.1f} | ➗ Rata-rata: {summary['avg']:.1f}\n"
+    if summary['last']:
+        last_ts, last_value = summary['last']
+        message += f"🕒 Terakhir: {last_value:.1f} ({time.strftime('%d-%m %H:%M', time.localtime(last_ts))})\n"
+    message += f"🔢 Sampel: {summary['count']}"
+    await update.message.reply_text(message)
+
+async def profile(update, context):
+    """Profil waktu satu run playbook: /profile, /profile 1, /profile 20250101T020000123_health_check_4242"""
+    if not update or not update.message:
+        return
+
+    runs = list_runs(PROFILE_DIR)
+    if not runs:
+        await update.message.reply_text("📭 Belum ada profil run. Pastikan callback lab_profile aktif di ansible.cfg.")
+        return
+
+    if not context.args:
+        message = "⏱️ Run terakhir (gunakan /profile <no|run>):\n\n"
+        for number, run in enumerate(runs[:10], start=1):
+            message += f"{number}. {run}\n"
+        await update.message.reply_text(message)
+        return
 
-def send_notification(message):
+    data = await asyncio.to_thread(load_run, PROFILE_DIR, context.args[0])
+    if data is None:
+        await update.message.reply_text(f"❌ Run {context.args[0]} tidak ditemukan. Gunakan /profile untuk daftar run.")
+        return
+    await update.message.reply_text(format_report(data))
+
+async def compact_metrics():
+    """Rollup per jam + retention metrics store secara berkala (di thread, tidak memblok bot)"""
+    while True:
+        try:
+            await asyncio.to_thread(metrics_store.compact)
+        except Exception as e:
+            print(f"Gagal compact metrics: {e}")
+        await asyncio.sleep(METRICS_COMPACT_INTERVAL)
+
+async def send_notification(bot, message):
     """Send notification to admin"""
     try:
-        bot = Bot(token=TELEGRAM_TOKEN)
-        bot.send_message(chat_id=CHAT_ID, text=f"🔔 {message}")
+        await bot.send_message(chat_id=CHAT_ID, text=f"🔔 {message}")
     except Exception as e:
         print(f"Gagal notifikasi: {e}")
 
-def global_error_handler(update, context):
+async def global_error_handler(update, context):
     """Handle semua error yang tidak tertangani"""
     try:
         # Log error
@@ -330,8 +606,8 @@ def global_error_handler(update, context):
         print(f"Global Error: {error_msg}")
 
         # Send user-friendly message
-        if update and update.message:
-            update.message.reply_text(
+        if update and getattr(update, "message", None):
+            await update.message.reply_text(
                 "❌ *Terjadi error sementara*\n\n"
                 "💡 *Coba solusi:*\n"
                 "• Beberapa PC mungkin offline\n"
@@ -343,6 +619,94 @@ def global_error_handler(update, context):
     except Exception as e:
         print(f"Error in error handler: {e}")
 
+async def post_init(application):
+    """Test koneksi Telegram setelah aplikasi siap"""
+    print("🔗 Testing Telegram connection...")
+    bot_info = await application.bot.get_me()
+    print(f"🤖 Bot: {bot_info.first_name} (@{bot_info.username})")
+
+    if ANSIBLE_WORKER:
+        try:
+            await ansible_worker.start()
+            print("⚙️ Worker ansible siap")
+        except Exception as e:
+            print(f"⚠️ Worker ansible tidak aktif, pakai CLI: {e}")
+
+    application.bot_data["compact_task"] = asyncio.create_task(compact_metrics())
+
+    # Registry status PC: probe cadangan di background + listener heartbeat
+    install_queue.dispatch = lambda entries: dispatch_queued_install(application.bot, entries)
+    check = win_ping_check(WINDOWS_INVENTORY_PATH, cwd=PROJECT_PATH) if PROBE_FULL_CHECK else None
+    application.bot_data["registry_task"] = asyncio.create_task(
+        registry.run(registry_targets, concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT, check=check)
+    )
+    receivers = []
+    for name, port, start_receiver in (("UDP", HEARTBEAT_UDP_PORT, start_udp_receiver),
+                                       ("HTTP", HEARTBEAT_HTTP_PORT, start_http_receiver)):
+        if not port:
+            continue
+        try:
+            receivers.append(await start_receiver(registry, port=port))
+            print(f"💓 Heartbeat {name} di port {port}")
+        except OSError as e:
+            print(f"⚠️ Heartbeat {name} tidak aktif: {e}")
+    application.bot_data["heartbeat_receivers"] = receivers
+
+    if ARTIFACT_CACHE_URL:
+        try:
+            application.bot_data["artifact_cache"] = serve_in_thread(ARTIFACT_CACHE_DIR, port=ARTIFACT_CACHE_PORT)
+            print(f"📦 Artifact cache siap di port {ARTIFACT_CACHE_PORT} ({ARTIFACT_CACHE_URL})")
+        except OSError as e:
+            print(f"⚠️ Artifact cache tidak aktif: {e}")
+
+async def post_shutdown(application):
+    """Matikan worker ansible, registry, artifact cache dan tutup metrics store saat bot berhenti"""
+    await ansible_worker.stop()
+    for key in ("compact_task", "registry_task"):
+        task = application.bot_data.pop(key, None)
+        if task:
+            task.cancel()
+    for receiver in application.bot_data.pop("heartbeat_receivers", []):
+        receiver.close()
+    cache_server = application.bot_data.pop("artifact_cache", None)
+    if cache_server:
+        cache_server.shutdown()
+        cache_server.server_close()
+    metrics_store.close()
+
+COMMANDS = {
+    "start": start,
+    "lab_status": lab_status,
+    "windows_ping": windows_ping,
+    "install_software": install_software,
+    "jobs": jobs,
+    "job": job_detail,
+    "cancel": cancel_job,
+    "trend": trend,
+    "profile": profile,
+}
+
+def build_application(token, base_url=None):
+    """Application dengan semua handler; base_url untuk Telegram API lain (mis. fake API di fleet_benchmark)"""
+    # concurrent_updates supaya handler tidak saling menunggu
+    builder = (
+        Application.builder()
+        .token(token)
+        .read_timeout(30)
+        .connect_timeout(30)
+        .concurrent_updates(True)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
+
+    for command, handler in COMMANDS.items():
+        application.add_handler(CommandHandler(command, handler))
+    application.add_error_handler(global_error_handler)
+    return application
+
 def main():
     """Main function"""
     if TELEGRAM_TOKEN == "MASUKKAN_TOKEN_ANDA_DISINI" or not TELEGRAM_TOKEN:
@@ -364,36 +728,12 @@ def main():
     print(f"📁 Project: {PROJECT_PATH}")
 
     try:
-        print("🔗 Testing Telegram connection...")
-        bot = Bot(token=TELEGRAM_TOKEN)
-        bot_info = bot.get_me()
-        print(f"🤖 Bot: {bot_info.first_name} (@{bot_info.username})")
-
-        # Setup updater
-        updater = Updater(
-            token=TELEGRAM_TOKEN,
-            use_context=True,
-            request_kwargs={
-                'read_timeout': 30,
-                'connect_timeout': 30,
-            }
-        )
-
-        dp = updater.dispatcher
-
-        # Add handlers
-        dp.add_handler(CommandHandler("start", start))
-        dp.add_handler(CommandHandler("lab_status", lab_status))
-        dp.add_handler(CommandHandler("windows_ping", windows_ping))
-        dp.add_handler(CommandHandler("install_software", install_software))
-
-        dp.add_error_handler(global_error_handler)
+        application = build_application(TELEGRAM_TOKEN)
 
         print("🚀 Bot berjalan...")
-        print("📋 Commands: /start, /lab_status, /windows_ping, /install_software")
+        print("📋 Commands: /start, /lab_status, /windows_ping, /install_software, /jobs, /job, /cancel, /trend, /profile")
 
-        updater.start_polling(drop_pending_updates=True)
-        updater.idle()
+        application.run_polling(drop_pending_updates=True)
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -0,0 +1,294 @@
+# File: scripts/telegram_gateway.py
+# ============================
+# GATEWAY NOTIFIKASI TELEGRAM (DIGEST + RATE LIMIT)
+# ============================
+# Satu koneksi HTTP keep-alive ke Bot API, token bucket untuk membatasi laju,
+# retry otomatis saat Telegram membalas 429 (retry_after) dan pesan per host
+# digabung jadi digest yang dipecah sesuai batas 4096 karakter.
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+MAX_MESSAGE_LENGTH = 4096
+DEFAULT_API_URL = "https://api.telegram.org"
+
+
+def chunk_messages(lines, header="", limit=MAX_MESSAGE_LENGTH):
+    """Gabungkan baris jadi pesan <= limit karakter; header diulang di setiap pesan"""
+    prefix = f"{header}\n" if header else ""
+    room = limit - len(prefix)
+
+    # Baris yang lebih panjang dari satu pesan dipotong
+    pieces = []
+    for line in lines:
+        while len(line) > room:
+            pieces.append(line[:room])
+            line = line[room:]
+        pieces.append(line)
+
+    messages = []
+    current, size = [], 0
+    for piece in pieces:
+        extra = len(piece) + (1 if current else 0)
+        if current and size + extra > room:
+            messages.append(prefix + "\n".join(current))
+            current, size, extra = [], 0, len(piece)
+        current.append(piece)
+        size += extra
+    if current:
+        messages.append(prefix + "\n".join(current))
+    return messages
+
+
+class TokenBucket:
+    """Token bucket sederhana: `rate` token per detik, maksimal `burst` token"""
+
+    def __init__(self, rate=1.0, burst=3):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blok sampai satu token tersedia; return lama menunggu (detik)"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class TelegramGateway:
+    """Client Bot API dengan satu koneksi yang dipakai ulang untuk semua pesan"""
+
+    def __init__(self, token, chat_id, api_url=DEFAULT_API_URL, rate=1.0, burst=3,
+                 max_retries=5, timeout=30):
+        self.token = token
+        self.chat_id = chat_id
+        self.api_url = api_url.rstrip("/")
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._connection = None
+        self._lock = threading.Lock()
+        self.stats = {"sent": 0, "requests": 0, "retries": 0, "throttled": 0, "connections": 0}
+
+    def _connect(self):
+        parts = urlsplit(self.api_url)
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._connection = cls(parts.netloc, timeout=self.timeout)
+        self._path_prefix = parts.path
+        self.stats["connections"] += 1
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _post(self, method, payload):
+        if self._connection is None:
+            self._connect()
+        body = json.dumps(payload).encode()
+        self.stats["requests"] += 1
+        self._connection.request(
+            "POST", f"{self._path_prefix}/bot{self.token}/{method}", body=body,
+            headers={"Content-Type": "application/json", "Connection": "keep-alive"},
+        )
+        response = self._connection.getresponse()
+        data = response.read()
+        try:
+            return response.status, json.loads(data or b"{}")
+        except ValueError:
+            return response.status, {}
+
+    def send(self, text, parse_mode=None):
+        """Kirim satu pesan; retry untuk 429 dan error koneksi. Return True jika terkirim."""
+        payload = {"chat_id": self.chat_id, "text": text[:MAX_MESSAGE_LENGTH]}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+
+        with self._lock:
+            for attempt in range(self.max_retries + 1):
+                self.bucket.acquire()
+                try:
+                    status, data = self._post("sendMessage", payload)
+                except (OSError, http.client.HTTPException):
+                    # Koneksi keep-alive diputus server: buka ulang lalu coba lagi
+                    self.close()
+                    self.stats["retries"] += 1
+                    time.sleep(min(2 ** attempt, 30))
+                    continue
+
+                if status == 429:
+                    retry_after = data.get("parameters", {}).get("retry_after", 1)
+                    self.stats["throttled"] += 1
+                    self.stats["retries"] += 1
+                    time.sleep(retry_after)
+                    continue
+                if status >= 500:
+                    self.stats["retries"] += 1
+                    time.sleep(min(2 ** attempt, 30))
+                    continue
+                if data.get("ok"):
+                    self.stats["sent"] += 1
+                    return True
+                print(f"Gagal notifikasi: {status} {data.get('description', '')}")
+                return False
+        print(f"Gagal notifikasi: menyerah setelah {self.max_retries + 1} percobaan")
+        return False
+
+    def send_digest(self, lines, header=""):
+        """Kirim banyak baris sebagai sesedikit mungkin pesan"""
+        return all([self.send(message) for message in chunk_messages(lines, header)])
+
+
+# ============================
+# HARNESS: FAKE BOT API LOKAL
+# ============================
+#   python scripts/telegram_gateway.py   (exit 1 jika ada cek yang gagal)
+def start_fake_bot_api(throttle_every=0, retry_after=1, errors=None):
+    """Jalankan fake Bot API di thread; setiap request ke-`throttle_every` dibalas 429.
+    `errors` = {teks: status}: pesan yang memuat teks itu selalu dibalas status tersebut.
+    state["log"] berisi (waktu monotonic, teks, status) per request."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    state = {"requests": 0, "messages": [], "connections": set(), "log": []}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            state["requests"] += 1
+            state["connections"].add(self.client_address)
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            error = next((code for text, code in (errors or {}).items() if text in payload["text"]), None)
+            if error:
+                status, body = error, {"ok": False, "error_code": error, "description": f"Fake error {error}"}
+            elif throttle_every and state["requests"] % throttle_every == 0:
+                status, body = 429, {"ok": False, "error_code": 429,
+                                     "parameters": {"retry_after": retry_after}}
+            else:
+                state["messages"].append(payload["text"])
+                status, body = 200, {"ok": True, "result": {"message_id": len(state["messages"])}}
+            state["log"].append((time.monotonic(), payload["text"], status))
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def check_rate(times, rate, burst, slack=0.02):
+    """Token bucket: di setiap jendela [t_i, t_j] paling banyak burst + rate * durasi request"""
+    for i in range(len(times)):
+        for j in range(i, len(times)):
+            allowed = burst + rate * (times[j] - times[i] + slack)
+            if j - i + 1 > allowed:
+                return f"{j - i + 1} request dalam {times[j] - times[i]:.2f}s (maks {allowed:.1f})"
+    return None
+
+
+def run_harness():
+    failures = []
+
+    def check(ok, message):
+        print(f"{'✅' if ok else '❌'} {message}")
+        if not ok:
+            failures.append(message)
+
+    # 1. Digest: 300 host + satu baris yang lebih panjang dari satu pesan, setiap request ke-4 dibalas 429
+    retry_after = 1
+    server, state = start_fake_bot_api(throttle_every=4, retry_after=retry_after)
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    gateway = TelegramGateway("TEST:TOKEN", "1", api_url=api_url, rate=20, burst=5)
+    header = "🩺 Health Check Selesai (301 host)"
+    lines = [f"✅ pc{i:03d}: Disk 41.2% | CPU 12.0% | Mem 55.3% | Net OK | Services OK" for i in range(1, 301)]
+    lines.append("❌ pc301: " + "traceback " * 1000)
+    chunks = chunk_messages(lines, header)
+    start = time.monotonic()
+    delivered = gateway.send_digest(lines, header=header)
+    elapsed = time.monotonic() - start
+    gateway.close()
+    server.shutdown()
+
+    check(delivered, f"Digest terkirim: {len(chunks)} pesan, {state['requests']} request, {elapsed:.1f}s")
+    check(all(len(m) <= MAX_MESSAGE_LENGTH for m in state["messages"]),
+          f"Setiap pesan <= {MAX_MESSAGE_LENGTH} karakter (maks {max(map(len, state['messages']))})")
+    check(all(m.startswith(header + "\n") for m in state["messages"]), "Header ada di setiap pesan")
+    bodies = [m[len(header) + 1:] for m in state["messages"]]
+    pieces = [piece for body in bodies for piece in body.split("\n")]
+    check(all(line in pieces for line in lines[:-1]) and "".join(pieces) == "".join(lines),
+          f"Semua {len(lines)} baris ada di digest, urut, baris panjang utuh setelah digabung")
+    check(state["messages"] == chunks, "Setiap pesan terkirim tepat sekali (tanpa duplikat setelah 429)")
+
+    log = state["log"]
+    throttled = [i for i, entry in enumerate(log) if entry[2] == 429]
+    check(bool(throttled) and gateway.stats["throttled"] == len(throttled),
+          f"Fake API membalas 429 sebanyak {len(throttled)} kali")
+    gaps = [log[i + 1][0] - log[i][0] for i in throttled if i + 1 < len(log)]
+    resent = all(i + 1 < len(log) and log[i + 1][1] == log[i][1] and log[i + 1][2] == 200 for i in throttled)
+    check(resent and gaps and min(gaps) >= retry_after,
+          f"Pesan yang kena 429 dikirim ulang setelah retry_after={retry_after}s "
+          f"(jeda minimum {min(gaps, default=0):.2f}s)")
+    check(len(state["connections"]) == 1 and gateway.stats["connections"] == 1,
+          f"Satu koneksi TCP untuk seluruh digest ({len(state['connections'])} koneksi)")
+
+    # 2. Laju: 20 pesan beruntun tanpa 429, rate=10/s burst=3
+    rate, burst, count = 10, 3, 20
+    server, state = start_fake_bot_api()
+    gateway = TelegramGateway("TEST:TOKEN", "1", api_url=f"http://127.0.0.1:{server.server_address[1]}",
+                              rate=rate, burst=burst)
+    start = time.monotonic()
+    sent = all([gateway.send(f"Pesan {i}") for i in range(count)])
+    elapsed = time.monotonic() - start
+    gateway.close()
+    server.shutdown()
+    violation = check_rate([entry[0] for entry in state["log"]], rate, burst)
+    check(sent and violation is None, f"Token bucket menahan laju <= {rate}/s burst {burst}"
+                                      + (f": {violation}" if violation else ""))
+    minimum = (count - burst) / rate
+    check(elapsed >= minimum * 0.95, f"{count} pesan butuh {elapsed:.2f}s (minimal {minimum:.2f}s)")
+
+    # 3. Error selain 429: 400 dilaporkan tanpa retry, 5xx berhenti setelah max_retries
+    server, state = start_fake_bot_api(errors={"TOLAK": 400, "RUSAK": 500})
+    gateway = TelegramGateway("TEST:TOKEN", "1", api_url=f"http://127.0.0.1:{server.server_address[1]}",
+                              rate=100, burst=10, max_retries=1)
+    rejected = gateway.send("TOLAK: chat tidak ditemukan")
+    attempts_400 = sum(1 for entry in state["log"] if "TOLAK" in entry[1])
+    broken = gateway.send("RUSAK: server error")
+    attempts_500 = sum(1 for entry in state["log"] if "RUSAK" in entry[1])
+    after = gateway.send("Pesan normal setelah error")
+    gateway.close()
+    server.shutdown()
+    check(rejected is False and attempts_400 == 1, f"400 dilaporkan (False) tanpa retry ({attempts_400} request)")
+    check(broken is False and attempts_500 == 2, f"500 berhenti setelah max_retries=1 ({attempts_500} request)")
+    check(after and state["messages"] == ["Pesan normal setelah error"], "Gateway tetap bisa kirim setelah error")
+
+    if failures:
+        print(f"\n❌ GAGAL: {len(failures)} cek")
+        return 1
+    print("\n✅ Semua cek lolos")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(run_harness())